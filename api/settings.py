@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
+import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'courses.middleware.MetricsMiddleware',
+    'courses.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,8 +81,18 @@ WSGI_APPLICATION = 'api.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # Backend SQLite do Django + opção transaction_mode (courses/backends/sqlite3)
+        'ENGINE': 'courses.backends.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        # Conexões persistentes, verificadas antes de serem reaproveitadas.
+        # Sob ASGI use CONN_MAX_AGE = 0 (as conexões não são reaproveitadas entre tarefas)
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Segundos que uma escrita espera pelo lock antes de "database is locked"
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -127,5 +140,142 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 12
-}
\ No newline at end of file
+    'PAGE_SIZE': 12,
+    'DEFAULT_RENDERER_CLASSES': [
+        'courses.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'courses.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+
+# Duração dos vídeos
+# Quando ativo, create_video/update_video salvam o vídeo como "pending" e o
+# worker `python manage.py process_video_jobs` busca a duração no YouTube.
+
+VIDEO_DURATION_ASYNC = True
+
+VIDEO_DURATION_JOB_MAX_ATTEMPTS = 3
+
+VIDEO_DURATION_JOB_RETRY_DELAY = 30
+
+# Segundos até um job "running" sem progresso ser retomado por outro worker
+VIDEO_DURATION_JOB_LEASE = 5 * 60
+
+YOUTUBE_WATCH_URL = 'https://www.youtube.com/watch?v={video_id}'
+
+
+# Cache de duração por ID do vídeo (LRU em memória + tabela VideoDurationCache)
+
+VIDEO_DURATION_CACHE_TTL = 7 * 24 * 60 * 60
+
+VIDEO_DURATION_CACHE_NEGATIVE_TTL = 60 * 60
+
+VIDEO_DURATION_CACHE_SIZE = 1024
+
+
+# Exportação CSV (quantidade de linhas lidas do banco por vez)
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+# Cache das respostas de listagem/detalhe de cursos
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Precisa ser compartilhado entre processos: o worker de duração, o
+# recompute_durations e o archive_courses também invalidam o cache. Com
+# REDIS_URL usa Redis (vários servidores); sem ela, arquivos em disco ao lado
+# do banco, que valem para os processos de uma mesma máquina
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_PATH', f"{DATABASES['default']['NAME']}-cache"),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+COURSES_CACHE_ALIAS = 'default'
+
+COURSES_CACHE_TIMEOUT = 60
+
+COURSES_BULK_MAX_ITEMS = 1000
+
+# Controle de concorrência otimista (courses/concurrency.py): tentativas de uma
+# escrita que colidiu com outra e espera-base (segundos) entre elas
+
+COURSES_OPTIMISTIC_RETRIES = 5
+
+COURSES_OPTIMISTIC_RETRY_BACKOFF = 0.005
+
+# manage.py archive_courses: cursos encerrados ou excluídos há mais de N dias
+# saem da tabela quente
+
+COURSES_ARCHIVE_AFTER_DAYS = 90
+
+
+# Importação de cursos (linhas validadas e gravadas por transação)
+
+IMPORT_BATCH_SIZE = 1000
+
+
+# Cliente HTTP assíncrono (views em courses/async_views.py)
+
+YOUTUBE_ASYNC_MAX_CONNECTIONS = 20
+
+YOUTUBE_ASYNC_TIMEOUT = 10
+
+
+# Cliente HTTP síncrono usado para buscar a duração dos vídeos (courses/http.py)
+
+YOUTUBE_HTTP_POOL_SIZE = 10
+
+YOUTUBE_HTTP_CONNECT_TIMEOUT = 3
+
+YOUTUBE_HTTP_READ_TIMEOUT = 5
+
+YOUTUBE_HTTP_RETRIES = 2
+
+YOUTUBE_HTTP_BACKOFF = 0.3
+
+YOUTUBE_HTTP_BREAKER_THRESHOLD = 5
+
+YOUTUBE_HTTP_BREAKER_RESET = 30
+
+
+# Cadastro de vídeos em lote (threads buscando as durações ao mesmo tempo)
+
+VIDEO_BATCH_MAX_WORKERS = 8
+
+
+# Compressão das respostas (gzip; brotli se o pacote estiver instalado)
+
+COMPRESSION_MIN_SIZE = 1024
+
+COMPRESSION_BROTLI_QUALITY = 5
+
+
+# PRAGMAs aplicadas em cada conexão SQLite nova (courses/db.py)
+# https://www.sqlite.org/pragma.html
+
+SQLITE_PRAGMAS = {
+    # Leitores não bloqueiam o escritor (e vice-versa)
+    'journal_mode': 'wal',
+    # Seguro com WAL: só uma queda de energia pode perder as últimas transações
+    'synchronous': 'normal',
+    # Valor negativo = KiB (64 MB de cache de páginas por conexão)
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
@@ -1,9 +1,28 @@
 from django.contrib import admin
 
-from .models import Course
+from .models import COUNTER_FIELDS, ArchivedCourse, Course, Video
+
+
+class VideoInline(admin.TabularInline):
+  model = Video
+  extra = 0
 
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
-  list_display = ('id', 'title', 'description', 'ends_at', 'deleted_at', 'created_at', 'updated_at', 'video_urls', 'total_duration')
-  
\ No newline at end of file
+  list_display = ('id', 'title', 'description', 'ends_at', 'deleted_at', 'created_at', 'updated_at', 'total_duration')
+  # Mantidos pelo próprio modelo: Course.save() não os grava
+  readonly_fields = COUNTER_FIELDS
+  inlines = [VideoInline]
+  
+
+@admin.register(ArchivedCourse)
+class ArchivedCourseAdmin(admin.ModelAdmin):
+  # Só consulta: restaurar é pelo endpoint bulk_restore (ou ArchivedCourse.restore())
+  list_display = ('id', 'title', 'ends_at', 'deleted_at', 'video_count', 'archived_at')
+
+  def has_add_permission(self, request):
+    return False
+
+  def has_change_permission(self, request, obj=None):
+    return False
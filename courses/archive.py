@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import invalidate_courses
+from .models import ArchivedCourse, Course, Video, VideoDurationJob
+
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+
+
+def get_archive_after_days():
+  return getattr(settings, 'COURSES_ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+
+
+def default_cutoff():
+  return timezone.now() - timezone.timedelta(days=get_archive_after_days())
+
+
+def archivable(cutoff):
+  # Encerrados ou excluídos antes do corte. A condição é separada entre ativos
+  # e excluídos para o SQLite combinar os dois índices parciais (MULTI-INDEX OR)
+  # em vez de percorrer a tabela
+  return Course.with_deleted.filter(
+    Q(deleted_at__isnull=True, ends_at__lt=cutoff) |
+    Q(deleted_at__isnull=False) & (Q(deleted_at__lt=cutoff) | Q(ends_at__lt=cutoff))
+  )
+
+
+def archive_chunk(course_ids, cutoff):
+  # Uma transação por lote: as travas duram só o tempo de copiar e apagar esses cursos
+  with transaction.atomic():
+    # O critério é conferido de novo: o curso pode ter sido restaurado ou prorrogado
+    courses = list(archivable(cutoff).filter(pk__in=course_ids).prefetch_related('videos'))
+    ArchivedCourse.objects.bulk_create([ArchivedCourse.from_course(course) for course in courses])
+    archived_ids = [course.pk for course in courses]
+    # DELETE direto por tabela: o delete() com CASCADE carregaria cada vídeo e
+    # dispararia os sinais (e a invalidação do cache) um a um. O trigger do FTS
+    # ainda tira o curso da busca
+    for queryset in (
+      VideoDurationJob.objects.filter(course_id__in=archived_ids),
+      Video.objects.filter(course_id__in=archived_ids),
+      Course.with_deleted.filter(pk__in=archived_ids),
+    ):
+      queryset._raw_delete(queryset.db)
+    transaction.on_commit(lambda: invalidate_courses(archived_ids))
+  return len(courses)
+
+
+def archive_courses(cutoff=None, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+  cutoff = cutoff or default_cutoff()
+  if dry_run:
+    return archivable(cutoff).count()
+
+  archived = 0
+  while True:
+    # Sem paginação: os cursos de cada lote saem da tabela e da consulta seguinte
+    ids = list(archivable(cutoff).values_list('pk', flat=True)[:batch_size])
+    if not ids:
+      return archived
+    archived += archive_chunk(ids, cutoff)
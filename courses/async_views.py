@@ -0,0 +1,179 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+import json
+
+from . import cache as response_cache
+from . import concurrency
+from .models import Course, Video
+from .renderers import FastJSONRenderer
+from .serializers import CourseRetrieveSerializer, select_fields
+from .views import CourseViewSet
+from .youtube import aresolve_video_duration, resolve_video_duration
+
+
+# Variantes assíncronas das ações de CourseViewSet para rodar sob ASGI
+# (api/asgi.py). O ganho está em create_video/update_video: enquanto a
+# duração é buscada no YouTube, o processo atende outras requisições.
+
+_renderer = FastJSONRenderer()
+
+
+def async_csrf_exempt(view):
+  # O csrf_exempt do Django 4.2 embrulha a view numa função síncrona; basta a marcação
+  view.csrf_exempt = True
+  return view
+
+
+def _json(data, status_code=status.HTTP_200_OK, headers=None):
+  return HttpResponse(_renderer.render(data), status=status_code, headers=headers, content_type='application/json')
+
+
+def _not_found():
+  return _json({'detail': 'Não encontrado.'}, status.HTTP_404_NOT_FOUND)
+
+
+def _request_data(request):
+  if request.content_type == 'application/json':
+    try:
+      data = json.loads(request.body or b'{}')
+    except ValueError:
+      return {}
+    return data if isinstance(data, dict) else {}
+  return request.POST
+
+
+async def _cached_json(request, key, build_data):
+  cache = response_cache.get_cache()
+  entry = await cache.aget(key)
+
+  if entry is None:
+    data, status_code = await build_data()
+    if status_code != status.HTTP_200_OK:
+      return _json(data, status_code)
+    entry = response_cache.build_entry(data)
+    await cache.aset(key, entry, response_cache.get_timeout())
+
+  if response_cache.is_not_modified(request, entry['etag']):
+    return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': entry['etag']})
+  return _json(entry['data'], headers={'ETag': entry['etag']})
+
+
+async def _course_json(course, status_code=status.HTTP_200_OK):
+  # video_urls consulta os vídeos, então a serialização roda fora do event loop
+  data = await sync_to_async(lambda: CourseRetrieveSerializer(course).data)()
+  return _json(data, status_code, headers={'ETag': response_cache.make_etag(data)})
+
+
+async def _write(operation, *args):
+  # As gravações com controle de versão (courses.concurrency) são síncronas
+  try:
+    return await sync_to_async(operation)(*args), None
+  except Http404:
+    return None, _not_found()
+  except APIException as e:
+    return None, _json({'detail': e.detail}, e.status_code)
+
+
+async def course_list(request):
+  if request.method != 'GET':
+    return HttpResponseNotAllowed(['GET'])
+
+  def build():
+    # Mesma filtragem/paginação da versão síncrona (o ORM roda numa thread)
+    viewset = CourseViewSet(action='list')
+    response = viewset._list(Request(request))
+    return response.data, response.status_code
+
+  return await _cached_json(request, await response_cache.alist_key(request), sync_to_async(build))
+
+
+async def course_detail(request, pk):
+  if request.method != 'GET':
+    return HttpResponseNotAllowed(['GET'])
+
+  viewset = CourseViewSet(action='retrieve')
+  try:
+    fields = select_fields(request.GET, CourseRetrieveSerializer.Meta.fields)
+  except ValueError as e:
+    response = viewset._invalid_fields_response(e)
+    return _json(response.data, response.status_code)
+
+  def build():
+    # Mesma consulta/serialização da versão síncrona (o ORM roda numa thread)
+    try:
+      response = viewset._retrieve(pk, fields)
+    except Course.DoesNotExist:
+      return {'detail': 'Não encontrado.'}, status.HTTP_404_NOT_FOUND
+    return response.data, response.status_code
+
+  key = await response_cache.adetail_key(pk, None if fields == CourseRetrieveSerializer.Meta.fields else fields)
+  return await _cached_json(request, key, sync_to_async(build))
+
+
+@async_csrf_exempt
+async def create_video(request, course_id):
+  if request.method != 'POST':
+    return HttpResponseNotAllowed(['POST'])
+
+  data = _request_data(request)
+  if not data.get('title') or not data.get('url'):
+    return HttpResponse(status=status.HTTP_400_BAD_REQUEST)
+
+  course = await Course.objects.filter(pk=course_id).afirst()
+  if course is None:
+    return _not_found()
+
+  duration = await aresolve_video_duration(data.get('url'))
+  result, error = await _write(concurrency.add_video, course, data.get('title'), data.get('url'), duration, concurrency.if_match_tags(request.headers))
+  if error:
+    return error
+
+  course, _ = result
+  return await _course_json(course, status.HTTP_201_CREATED)
+
+
+@async_csrf_exempt
+async def update_video(request, course_id, video_id):
+  if request.method != 'PUT':
+    return HttpResponseNotAllowed(['PUT'])
+
+  data = _request_data(request)
+  if not data.get('title') or not data.get('url'):
+    return HttpResponse(status=status.HTTP_400_BAD_REQUEST)
+
+  video = await Video.objects.lookup(course_id, video_id).afirst()
+  if video is None:
+    return _not_found()
+
+  # A duração da URL nova é buscada aqui, sem bloquear o event loop; a busca
+  # síncrona só acontece se outro escritor trocar a URL entre as tentativas
+  url = data.get('url')
+  resolved = {url: await aresolve_video_duration(url)} if url != video.url else {}
+  resolve = lambda new_url: resolved[new_url] if new_url in resolved else resolve_video_duration(new_url)
+
+  result, error = await _write(concurrency.change_video, video, data.get('title'), url, resolve, concurrency.if_match_tags(request.headers))
+  if error:
+    return error
+
+  course, _, _ = result
+  return await _course_json(course)
+
+
+@async_csrf_exempt
+async def destroy_video(request, course_id, video_id):
+  if request.method != 'DELETE':
+    return HttpResponseNotAllowed(['DELETE'])
+
+  video = await Video.objects.lookup(course_id, video_id).afirst()
+  if video is None:
+    return _not_found()
+
+  result, error = await _write(concurrency.remove_video, video, concurrency.if_match_tags(request.headers))
+  if error:
+    return error
+
+  course, video = result
+  return await _course_json(course)
@@ -0,0 +1,21 @@
+from django.db.backends.sqlite3 import base
+
+
+TRANSACTION_MODES = ('DEFERRED', 'EXCLUSIVE', 'IMMEDIATE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+  # Backend SQLite do Django com a opção transaction_mode (nativa a partir do
+  # Django 5.1). Com IMMEDIATE o lock de escrita é pedido já no BEGIN, então um
+  # atomic() que lê antes de escrever espera o busy timeout em vez de falhar
+  # na hora com "database is locked"
+
+  def get_connection_params(self):
+    params = super().get_connection_params()
+    self.transaction_mode = (params.pop('transaction_mode', None) or 'DEFERRED').upper()
+    if self.transaction_mode not in TRANSACTION_MODES:
+      raise ValueError(f'transaction_mode inválido: {self.transaction_mode}')
+    return params
+
+  def _start_transaction_under_autocommit(self):
+    self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,235 @@
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.core.servers.basehttp import WSGIRequestHandler, WSGIServer
+from django.core.wsgi import get_wsgi_application
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+import random
+import resource
+import statistics
+import string
+import threading
+import time
+import requests
+
+from . import duration_cache, metrics
+from .models import Course, Video
+from .renderers import orjson
+from .benchmark_stub import StubYouTubeServer
+
+
+ENDPOINTS = ('list', 'list_cursor', 'retrieve', 'create_video', 'export')
+TRANSPORTS = ('client', 'wsgi', 'asgi')
+
+
+def random_video_id(rng):
+  return ''.join(rng.choice(string.ascii_letters + string.digits) for _ in range(11))
+
+
+def seed(courses, videos, rng):
+  ends_at = timezone.now() + timezone.timedelta(days=365)
+  created = Course.objects.bulk_create([
+    Course(title=f'Curso {i}', description='Descrição ' * 20, ends_at=ends_at, total_duration_seconds=videos * 300)
+    for i in range(courses)
+  ], batch_size=1000)
+  Video.objects.bulk_create([
+    Video(course=course, title=f'Vídeo {j}', url=f'https://www.youtube.com/watch?v={random_video_id(rng)}', duration=300, position=j)
+    for course in created
+    for j in range(videos)
+  ], batch_size=2000)
+  return [course.pk for course in created]
+
+
+def percentile(samples, pct):
+  ordered = sorted(samples)
+  index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+  return ordered[index]
+
+
+class QuietHandler(WSGIRequestHandler):
+  def log_message(self, *args):
+    pass
+
+
+class WSGITransport:
+  # Servidor WSGI local numa thread, acessado por uma sessão HTTP com keep-alive
+
+  def __init__(self, accept_encoding=None):
+    self.accept_encoding = accept_encoding
+
+  def __enter__(self):
+    self.server = WSGIServer(('127.0.0.1', 0), QuietHandler, ipv6=False)
+    self.server.set_app(get_wsgi_application())
+    self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    self.thread.start()
+    host, port = self.server.server_address
+    self.base_url = f'http://{host}:{port}'
+    self.session = requests.Session()
+    self.session.headers['Accept-Encoding'] = self.accept_encoding or 'identity'
+    return self
+
+  def __exit__(self, *exc):
+    self.session.close()
+    self.server.shutdown()
+    self.server.server_close()
+
+  # Devolvem o status e os bytes que trafegaram (já comprimidos, se for o caso)
+  def get(self, path):
+    return self._transferred(self.session.get(self.base_url + path))
+
+  def post(self, path, data):
+    return self._transferred(self.session.post(self.base_url + path, data=data))
+
+  def _transferred(self, response):
+    # Consumir .content lê o corpo todo; raw.tell() conta os bytes antes da descompressão
+    response.content
+    return response.status_code, response.raw.tell()
+
+
+class ClientTransport:
+  def __init__(self, accept_encoding=None):
+    headers = {'HTTP_ACCEPT_ENCODING': accept_encoding} if accept_encoding else {}
+    self.client = Client(**headers)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    pass
+
+  def get(self, path):
+    response = self.client.get(path)
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    return response.status_code, len(content)
+
+  def post(self, path, data):
+    response = self.client.post(path, data=data)
+    return response.status_code, len(response.content)
+
+
+class ASGITransport:
+  # Pelo ASGIHandler (api/asgi.py), no mesmo processo; as rotas que têm variante
+  # em async_views são medidas nela
+  routes = {
+    'courses-list': 'async-courses-list',
+    'courses-detail': 'async-courses-detail',
+    'courses-create_video': 'async-courses-create_video',
+  }
+
+  def __init__(self, accept_encoding=None):
+    headers = {'HTTP_ACCEPT_ENCODING': accept_encoding} if accept_encoding else {}
+    self.client = AsyncClient(**headers)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    pass
+
+  def get(self, path):
+    return self._transferred(async_to_sync(self._request)('get', path))
+
+  def post(self, path, data):
+    return self._transferred(async_to_sync(self._request)('post', path, data=data))
+
+  async def _request(self, method, path, **kwargs):
+    return await getattr(self.client, method)(path, **kwargs)
+
+  def _transferred(self, response):
+    # Respostas em streaming com iterador síncrono (export) são lidas fora do event loop
+    if not response.streaming:
+      return response.status_code, len(response.content)
+    if response.is_async:
+      return response.status_code, len(async_to_sync(_ajoin)(response.streaming_content))
+    return response.status_code, len(b''.join(response.streaming_content))
+
+
+async def _ajoin(chunks):
+  return b''.join([chunk async for chunk in chunks])
+
+
+TRANSPORT_CLASSES = {'client': ClientTransport, 'wsgi': WSGITransport, 'asgi': ASGITransport}
+
+
+def run_benchmark(courses=200, videos=10, requests_per_endpoint=50, transport='client', endpoints=ENDPOINTS, cold_cache=True, seed_value=0, accept_encoding=None):
+  rng = random.Random(seed_value)
+  course_ids = seed(courses, videos, rng)
+  video_ids = [random_video_id(rng) for _ in range(requests_per_endpoint)]
+
+  cache_settings = {'CACHES': {**settings.CACHES, 'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}} if cold_cache else {}
+  results = {}
+
+  with StubYouTubeServer({video_id: 'PT5M' for video_id in video_ids}) as stub:
+    with override_settings(YOUTUBE_WATCH_URL=stub.watch_url, VIDEO_DURATION_ASYNC=False, **cache_settings):
+      caches['default'].clear()
+      duration_cache.clear()
+      with TRANSPORT_CLASSES[transport](accept_encoding) as http:
+        for endpoint in endpoints:
+          metrics.reset()
+          samples = []
+          sizes = []
+          for i in range(requests_per_endpoint):
+            started = time.perf_counter()
+            status_code, size = _request(http, endpoint, rng, course_ids, video_ids[i])
+            samples.append(time.perf_counter() - started)
+            sizes.append(size)
+            if status_code >= 400:
+              raise RuntimeError(f'{endpoint} respondeu {status_code}')
+          results[endpoint] = _summarize(samples, sizes)
+
+  return {
+    'config': {
+      'courses': courses,
+      'videos_per_course': videos,
+      'requests_per_endpoint': requests_per_endpoint,
+      'transport': transport,
+      'cold_cache': cold_cache,
+      'accept_encoding': accept_encoding,
+      'json_renderer': 'orjson' if orjson is not None else 'stdlib',
+    },
+    'results': results,
+    'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+  }
+
+
+def _path(http, name, **kwargs):
+  return reverse(getattr(http, 'routes', {}).get(name, name), kwargs=kwargs)
+
+
+def _request(http, endpoint, rng, course_ids, video_id):
+  if endpoint == 'list':
+    return http.get(_path(http, 'courses-list') + f'?page={rng.randint(1, max(1, len(course_ids) // 12))}')
+  if endpoint == 'list_cursor':
+    return http.get(_path(http, 'courses-list') + '?cursor=')
+  if endpoint == 'retrieve':
+    return http.get(_path(http, 'courses-detail', pk=rng.choice(course_ids)))
+  if endpoint == 'create_video':
+    return http.post(_path(http, 'courses-create_video', course_id=rng.choice(course_ids)), {
+      'title': 'Vídeo benchmark',
+      'url': f'https://www.youtube.com/watch?v={video_id}',
+    })
+  if endpoint == 'export':
+    return http.get(_path(http, 'courses-export'))
+  raise ValueError(endpoint)
+
+
+def _summarize(samples, sizes):
+  recorded = metrics.snapshot()
+  count = sum(m['count'] for m in recorded.values()) or 1
+  queries = sum(m['queries'] for m in recorded.values())
+  to_ms = lambda seconds: round(seconds * 1000, 3)
+
+  return {
+    'requests': len(samples),
+    'p50_ms': to_ms(percentile(samples, 50)),
+    'p95_ms': to_ms(percentile(samples, 95)),
+    'p99_ms': to_ms(percentile(samples, 99)),
+    'mean_ms': to_ms(statistics.fmean(samples)),
+    'queries_per_request': round(queries / count, 2),
+    'db_ms_per_request': to_ms(sum(m['db_seconds'] for m in recorded.values()) / count),
+    'http_ms_per_request': to_ms(sum(m['http_seconds'] for m in recorded.values()) / count),
+    'serialization_ms_per_request': to_ms(sum(m['serialization_seconds'] for m in recorded.values()) / count),
+    'bytes_per_response': round(statistics.fmean(sizes)),
+  }
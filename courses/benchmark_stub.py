@@ -0,0 +1,56 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import threading
+
+
+class StubYouTubeServer:
+  """Servidor HTTP local que imita a página de um vídeo do YouTube."""
+
+  def __init__(self, durations=None, fail_first=0):
+    self.durations = durations or {}
+    self.fail_first = fail_first
+    self.requests = []
+    self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+    self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+  @property
+  def watch_url(self):
+    host, port = self._server.server_address
+    return f'http://{host}:{port}/watch?v={{video_id}}'
+
+  def _handler(self):
+    stub = self
+
+    class Handler(BaseHTTPRequestHandler):
+      def do_GET(self):
+        video_id = parse_qs(urlparse(self.path).query).get('v', [''])[0]
+        stub.requests.append(video_id)
+
+        if len(stub.requests) <= stub.fail_first:
+          self.send_response(503)
+          self.send_header('Content-Length', '0')
+          self.end_headers()
+          return
+
+        duration = stub.durations.get(video_id)
+        meta = f'<meta itemprop="duration" content="{duration}">' if duration else ''
+        body = f'<html><head>{meta}</head><body></body></html>'.encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+      def log_message(self, *args):
+        pass
+
+    return Handler
+
+  def __enter__(self):
+    self._thread.start()
+    return self
+
+  def __exit__(self, *exc):
+    self._server.shutdown()
+    self._server.server_close()
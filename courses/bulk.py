@@ -0,0 +1,234 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import concurrency
+from .cache import invalidate_courses
+from .durations import to_seconds
+from .models import ArchivedCourse, Course, Video
+from .serializers import CourseBulkSerializer, CourseSerializer, VideoBulkSerializer
+from .youtube import EMPTY_DURATION, fetch_video_durations, get_video_id
+
+
+DEFAULT_MAX_ITEMS = 1000
+DUPLICATE_TITLE_ERROR = ['Já existe um curso ativo com este título.']
+
+
+class BulkError(Exception):
+  pass
+
+
+def get_max_items():
+  return getattr(settings, 'COURSES_BULK_MAX_ITEMS', DEFAULT_MAX_ITEMS)
+
+
+def validate_items(items):
+  if not isinstance(items, list) or not items:
+    raise BulkError('Envie uma lista não vazia.')
+  if len(items) > get_max_items():
+    raise BulkError(f'Envie no máximo {get_max_items()} itens por requisição.')
+
+
+def _to_int(value):
+  try:
+    return int(value)
+  except (TypeError, ValueError):
+    return None
+
+
+def validate_ids(ids):
+  validate_items(ids)
+  ids = [_to_int(course_id) for course_id in ids]
+  if None in ids:
+    raise BulkError('ids deve conter apenas inteiros.')
+  return ids
+
+
+def title_holders(titles):
+  # Uma única consulta para checar a constraint unique_title_if_not_deleted do lote inteiro
+  holders = {}
+  for title, course_id in Course.objects.filter(title__in=titles).values_list('title', 'pk'):
+    holders.setdefault(title, set()).add(course_id)
+  return holders
+
+
+def split_duplicate_titles(pending):
+  # pending: (chave, pk, título final, objeto). Um item só pode usar um título que
+  # nenhum outro curso ativo tem hoje e que nenhum item anterior do lote já pegou.
+  # A comparação é com o estado atual do banco, não com o final do lote: trocar os
+  # títulos de dois cursos no mesmo lote rejeita os dois, já que a constraint única
+  # é checada linha a linha e o UPDATE intermediário a violaria de qualquer forma
+  holders = title_holders([title for _, _, title, _ in pending])
+  seen = set()
+  accepted, rejected = [], []
+  for key, course_id, title, payload in pending:
+    if holders.get(title, set()) - {course_id} or title in seen:
+      rejected.append(key)
+      continue
+    seen.add(title)
+    accepted.append(payload)
+  return accepted, rejected
+
+
+def bulk_create_courses(items):
+  validate_items(items)
+  errors = []
+  pending = []
+
+  for index, item in enumerate(items):
+    serializer = CourseBulkSerializer(data=item)
+    if not serializer.is_valid():
+      errors.append({'index': index, 'errors': serializer.errors})
+      continue
+    pending.append((index, None, serializer.validated_data['title'], (index, Course(**serializer.validated_data))))
+
+  accepted, rejected = split_duplicate_titles(pending)
+  errors += [{'index': index, 'errors': {'title': DUPLICATE_TITLE_ERROR}} for index in rejected]
+
+  try:
+    with transaction.atomic():
+      created = Course.objects.bulk_create([course for _, course in accepted])
+  except IntegrityError:
+    # Outro escritor pegou um dos títulos entre a checagem e o INSERT: refaz item a
+    # item para que só os conflitantes virem erro
+    created, rejected = create_each(accepted)
+    errors += [{'index': index, 'errors': {'title': DUPLICATE_TITLE_ERROR}} for index in rejected]
+
+  invalidate_courses([course.pk for course in created])
+  return CourseSerializer(created, many=True).data, sorted(errors, key=lambda error: error['index'])
+
+
+def create_each(accepted):
+  # accepted: (chave, curso). Cada INSERT em um savepoint; devolve os criados e as
+  # chaves dos que bateram na constraint de título
+  created, rejected = [], []
+  with transaction.atomic():
+    for index, course in accepted:
+      try:
+        with transaction.atomic():
+          Course.objects.bulk_create([course])
+      except IntegrityError:
+        course.pk = None
+        rejected.append(index)
+        continue
+      created.append(course)
+  return created, rejected
+
+
+def bulk_update_courses(items):
+  validate_items(items)
+  errors = []
+  pending = []
+
+  items = [item if isinstance(item, dict) else {} for item in items]
+  courses = Course.objects.in_bulk([_to_int(item.get('id')) for item in items])
+
+  fields = set()
+  seen_ids = set()
+  for index, item in enumerate(items):
+    course = courses.get(_to_int(item.get('id')))
+    if course is None:
+      errors.append({'index': index, 'errors': {'id': ['Curso não encontrado.']}})
+      continue
+    if course.pk in seen_ids:
+      errors.append({'index': index, 'errors': {'id': ['Curso repetido no lote.']}})
+      continue
+    seen_ids.add(course.pk)
+
+    serializer = CourseBulkSerializer(course, data=item, partial=True)
+    if not serializer.is_valid() or not serializer.validated_data:
+      errors.append({'index': index, 'errors': serializer.errors or {'non_field_errors': ['Nenhum campo para atualizar.']}})
+      continue
+
+    for field, value in serializer.validated_data.items():
+      setattr(course, field, value)
+      fields.add(field)
+    pending.append((index, course.pk, course.title, course))
+
+  courses, rejected = split_duplicate_titles(pending)
+  errors += [{'index': index, 'errors': {'title': DUPLICATE_TITLE_ERROR}} for index in rejected]
+
+  now = timezone.now()
+  for course in courses:
+    course.updated_at = now
+    course.version = F('version') + 1
+
+  with transaction.atomic():
+    Course.objects.bulk_update(courses, sorted(fields) + ['updated_at', 'version'], batch_size=500)
+
+  invalidate_courses([course.pk for course in courses])
+  return CourseSerializer(courses, many=True).data, sorted(errors, key=lambda error: error['index'])
+
+
+def bulk_delete_courses(ids):
+  ids = validate_ids(ids)
+  found = set(Course.objects.filter(pk__in=ids).values_list('pk', flat=True))
+
+  # Um único UPDATE ... SET deleted_at em vez de um save() por curso
+  now = timezone.now()
+  Course.objects.filter(pk__in=found).update(deleted_at=now, updated_at=now, version=F('version') + 1)
+
+  invalidate_courses(found)
+  errors = [{'id': course_id, 'errors': ['Curso não encontrado.']} for course_id in ids if course_id not in found]
+  return sorted(found), errors
+
+
+def bulk_restore_courses(ids):
+  ids = validate_ids(ids)
+  deleted = dict(Course.with_deleted.filter(pk__in=ids, deleted_at__isnull=False).values_list('pk', 'title'))
+  # Cursos arquivados (manage.py archive_courses) voltam para a tabela quente
+  archived = dict(ArchivedCourse.objects.filter(pk__in=ids).values_list('pk', 'title'))
+  found = {**deleted, **archived}
+
+  errors = [{'id': course_id, 'errors': ['Curso excluído não encontrado.']} for course_id in ids if course_id not in found]
+  pending = [(course_id, course_id, title, course_id) for course_id, title in found.items()]
+  restorable, rejected = split_duplicate_titles(pending)
+  errors += [{'id': course_id, 'errors': DUPLICATE_TITLE_ERROR} for course_id in rejected]
+
+  with transaction.atomic():
+    Course.with_deleted.filter(pk__in=[course_id for course_id in restorable if course_id in deleted]).update(
+      deleted_at=None, updated_at=timezone.now(), version=F('version') + 1
+    )
+    ArchivedCourse.objects.filter(pk__in=[course_id for course_id in restorable if course_id in archived]).restore()
+
+  invalidate_courses(restorable)
+  return sorted(restorable), errors
+
+
+def bulk_create_videos(course, items, if_match=None):
+  validate_items(items)
+  errors = []
+  accepted = []
+
+  for index, item in enumerate(items):
+    serializer = VideoBulkSerializer(data=item)
+    if not serializer.is_valid():
+      errors.append({'index': index, 'errors': serializer.errors})
+      continue
+    accepted.append(serializer.validated_data)
+
+  if not accepted:
+    return [], errors
+
+  # No modo assíncrono as durações ficam pendentes para o worker; senão são
+  # buscadas em paralelo, uma vez por ID de vídeo
+  pending = getattr(settings, 'VIDEO_DURATION_ASYNC', False)
+  video_ids = [get_video_id(data['url']) for data in accepted]
+  durations = {} if pending else fetch_video_durations([video_id for video_id in video_ids if video_id])
+
+  videos = []
+  for data, video_id in zip(accepted, video_ids):
+    if video_id is None:
+      duration = to_seconds(EMPTY_DURATION)
+    elif pending:
+      duration = None
+    else:
+      duration = to_seconds(durations[video_id])
+    videos.append(Video(course=course, duration=duration, **data))
+
+  # As posições e os jobs das durações pendentes são gravados dentro do UPDATE
+  # condicional da versão do curso
+  course, videos = concurrency.add_videos(course, videos, if_match)
+
+  return [video.as_dict() for video in videos], errors
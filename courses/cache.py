@@ -0,0 +1,130 @@
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+import hashlib
+import time
+
+from .renderers import FastJSONRenderer
+
+
+DEFAULT_TIMEOUT = 60
+LIST_GENERATION_KEY = 'courses:list:generation'
+
+
+def get_cache():
+  return caches[getattr(settings, 'COURSES_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+  return getattr(settings, 'COURSES_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+  # As invalidações também vêm de outros processos (worker de duração,
+  # recompute_durations, archive_courses): um cache por processo não as veria
+  if isinstance(get_cache(), LocMemCache):
+    return [checks.Error(
+      'O cache de respostas de cursos precisa ser compartilhado entre processos.',
+      hint='Use Redis ou o cache em banco (DatabaseCache) em COURSES_CACHE_ALIAS.',
+      id='courses.E001',
+    )]
+  return []
+
+
+def new_generation():
+  # Se a chave da geração for despejada, recomeça de um valor que nunca foi
+  # usado (e não do 0), para não servir de novo páginas antigas
+  return time.time_ns()
+
+
+def get_generation():
+  # Toda escrita incrementa a geração, invalidando de uma vez todas as páginas em cache
+  return get_cache().get_or_set(LIST_GENERATION_KEY, new_generation, timeout=None)
+
+
+async def aget_generation():
+  return await get_cache().aget_or_set(LIST_GENERATION_KEY, new_generation, timeout=None)
+
+
+def detail_key(course_id, fields=None):
+  if fields is None:
+    return f'courses:detail:{course_id}'
+  return _fields_detail_key(get_generation(), course_id, fields)
+
+
+async def adetail_key(course_id, fields=None):
+  if fields is None:
+    return detail_key(course_id)
+  return _fields_detail_key(await aget_generation(), course_id, fields)
+
+
+def _fields_detail_key(generation, course_id, fields):
+  # Variantes com ?fields=/?exclude= não são apagadas uma a uma por
+  # invalidate_courses, então seguem a geração, como a listagem
+  return f'courses:detail:{generation}:{course_id}:{",".join(fields)}'
+
+
+def list_key(request):
+  return _list_key(get_generation(), request)
+
+
+async def alist_key(request):
+  return _list_key(await aget_generation(), request)
+
+
+def _list_key(generation, request):
+  query = hashlib.md5(f'{request.get_host()}{request.get_full_path()}'.encode()).hexdigest()
+  return f'courses:list:{generation}:{query}'
+
+
+def invalidate_course(course_id):
+  invalidate_courses([course_id])
+
+
+def invalidate_courses(course_ids):
+  cache = get_cache()
+  cache.delete_many([detail_key(course_id) for course_id in course_ids])
+  try:
+    cache.incr(LIST_GENERATION_KEY)
+  except ValueError:
+    cache.set(LIST_GENERATION_KEY, new_generation(), timeout=None)
+
+
+def make_etag(data):
+  return quote_etag(hashlib.md5(FastJSONRenderer().render(data)).hexdigest())
+
+
+def build_entry(data):
+  return {'data': data, 'etag': make_etag(data)}
+
+
+def strip_weak(etag):
+  return etag[2:] if etag.startswith('W/') else etag
+
+
+def is_not_modified(request, etag):
+  # Comparação fraca: a compressão devolve a ETag como W/"..." e o cliente a reenvia assim
+  if_none_match = [strip_weak(tag) for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+  return strip_weak(etag) in if_none_match or '*' in if_none_match
+
+
+def cached_response(request, key, build_response):
+  cache = get_cache()
+  entry = cache.get(key)
+
+  if entry is None:
+    response = build_response()
+    if response.status_code != status.HTTP_200_OK:
+      return response
+    entry = build_entry(response.data)
+    cache.set(key, entry, get_timeout())
+
+  if is_not_modified(request, entry['etag']):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': entry['etag']})
+
+  return Response(entry['data'], status=status.HTTP_200_OK, headers={'ETag': entry['etag']})
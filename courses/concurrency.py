@@ -0,0 +1,204 @@
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import APIException
+import random
+import time
+
+from .cache import make_etag, strip_weak
+from .jobs import enqueue_duration_job, enqueue_duration_jobs
+from .models import Course, Video, VersionConflict
+from .serializers import CourseRetrieveSerializer
+
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_BACKOFF = 0.005
+
+
+class PreconditionFailed(APIException):
+  status_code = status.HTTP_412_PRECONDITION_FAILED
+  default_detail = 'O curso foi alterado desde a versão informada em If-Match.'
+  default_code = 'precondition_failed'
+
+
+class TooManyConflicts(APIException):
+  status_code = status.HTTP_409_CONFLICT
+  default_detail = 'O curso está sendo alterado por outras requisições; tente de novo.'
+  default_code = 'conflict'
+
+
+def get_max_retries():
+  return getattr(settings, 'COURSES_OPTIMISTIC_RETRIES', DEFAULT_MAX_RETRIES)
+
+
+def get_retry_backoff():
+  return getattr(settings, 'COURSES_OPTIMISTIC_RETRY_BACKOFF', DEFAULT_RETRY_BACKOFF)
+
+
+def if_match_tags(headers):
+  header = headers.get('If-Match')
+  if header is None:
+    return None
+  return [strip_weak(tag) for tag in parse_etags(header)]
+
+
+def course_etag(course):
+  # Mesma ETag do GET /api/courses/<id>/ (representação completa)
+  return make_etag(CourseRetrieveSerializer(course).data)
+
+
+def check_if_match(if_match, course):
+  if if_match is None or '*' in if_match:
+    return
+  if course_etag(course) not in if_match:
+    raise PreconditionFailed()
+
+
+def run(load, mutate, if_match=None):
+  # load() lê o estado sem travas e fora da transação (é onde ficam as chamadas
+  # lentas, como buscar a duração no YouTube, memorizadas entre as tentativas) e
+  # devolve (curso, ...) ou None; mutate() grava dentro da transação e chama
+  # course.bump_version(), que falha se outro escritor passou na frente. Aí tudo
+  # é refeito com o estado novo, exceto com If-Match: o cliente precisa ver a
+  # mudança antes, então é 412
+  retries = get_max_retries()
+  for attempt in range(retries):
+    if attempt:
+      # Espera aleatória e crescente para os escritores que colidiram não
+      # voltarem todos ao mesmo tempo
+      time.sleep(random.uniform(0, get_retry_backoff() * 2 ** attempt))
+
+    try:
+      if attempt < retries - 1:
+        return _attempt(load, mutate, if_match)
+      # Na última tentativa a releitura entra na transação: no SQLite (BEGIN
+      # IMMEDIATE) ela já detém a trava de escrita e não colide mais. O load()
+      # de fora resolve antes as chamadas lentas, que não podem segurar a trava
+      load()
+      with transaction.atomic():
+        return _attempt(load, mutate, if_match)
+    except VersionConflict:
+      if if_match is not None:
+        raise PreconditionFailed()
+
+  raise TooManyConflicts()
+
+
+def _attempt(load, mutate, if_match):
+  loaded = load()
+  if loaded is None:
+    raise Http404()
+  check_if_match(if_match, loaded[0])
+
+  with transaction.atomic():
+    return mutate(*loaded)
+
+
+def _loader(first, reload):
+  # A primeira tentativa usa o que a view já leu; as seguintes releem do banco
+  attempts = iter([first])
+  return lambda: next(attempts, None) or reload()
+
+
+def _reload_course(course_id):
+  course = Course.objects.filter(pk=course_id).first()
+  return None if course is None else (course,)
+
+
+def _reload_video(course_id, uid):
+  video = Video.objects.lookup(course_id, uid).first()
+  return None if video is None else (video.course, video)
+
+
+# Sem If-Match, alterar os campos do próprio curso continua sendo "a última
+# escrita vence": save() já não regrava os contadores
+def save_course(serializer, if_match=None):
+  if if_match is None:
+    return serializer.save()
+
+  def mutate(course):
+    course.bump_version()
+    return serializer.save()
+
+  return run(lambda: (serializer.instance,), mutate, if_match)
+
+
+def delete_course(course, if_match=None):
+  if if_match is None:
+    return course.delete()
+
+  def mutate(course):
+    course.bump_version()
+    return course.delete()
+
+  return run(lambda: (course,), mutate, if_match)
+
+
+def add_video(course, title, url, duration, if_match=None):
+  def mutate(course):
+    course.bump_version(duration)
+    # A posição é lida depois do UPDATE condicional: nenhum outro escritor
+    # mexeu nos vídeos deste curso desde a leitura
+    video = Video.objects.create(course=course, title=title, url=url, duration=duration, position=course.next_video_position())
+    if video.duration is None:
+      enqueue_duration_job(course, video)
+    return course, video
+
+  return run(_loader((course,), lambda: _reload_course(course.pk)), mutate, if_match)
+
+
+def add_videos(course, videos, if_match=None):
+  def mutate(course):
+    course.bump_version(sum(video.duration or 0 for video in videos))
+    first_position = course.next_video_position()
+    for offset, video in enumerate(videos):
+      video.course = course
+      video.position = first_position + offset
+    created = Video.objects.bulk_create(videos)
+    # Na mesma transação: um vídeo pendente nunca fica sem job
+    enqueue_duration_jobs(course, [video for video in created if video.duration is None])
+    return course, created
+
+  return run(_loader((course,), lambda: _reload_course(course.pk)), mutate, if_match)
+
+
+def change_video(video, title, url, resolve, if_match=None):
+  # resolve(url) devolve a duração de uma URL nova (ou None, se ficar pendente)
+  durations = {}
+  reload = _loader((video.course, video), lambda: _reload_video(video.course_id, video.uid))
+
+  def load():
+    loaded = reload()
+    if loaded is not None and url != loaded[1].url and url not in durations:
+      durations[url] = resolve(url)
+    return loaded
+
+  def mutate(course, video):
+    previous_duration = video.duration
+    update_fields = ['title']
+    video.title = title
+
+    # Só uma URL nova exige buscar a duração de novo no YouTube
+    if url != video.url:
+      video.url = url
+      video.duration = durations[url]
+      update_fields += ['url', 'duration']
+
+    course.bump_version((video.duration or 0) - (previous_duration or 0))
+    video.save(update_fields=update_fields)
+    if 'url' in update_fields and video.duration is None:
+      enqueue_duration_job(course, video)
+    return course, video, 'url' in update_fields
+
+  return run(load, mutate, if_match)
+
+
+def remove_video(video, if_match=None):
+  def mutate(course, video):
+    course.bump_version(-(video.duration or 0))
+    video.delete()
+    return course, video
+
+  return run(_loader((video.course, video), lambda: _reload_video(video.course_id, video.uid)), mutate, if_match)
@@ -0,0 +1,13 @@
+# Formato compartilhado entre report/export e a importação de cursos
+
+DELIMITER = ';'
+
+HEADERS = ['ID', 'Título', 'Descrição', 'Data de Término', 'Excluído', 'Excluído em', 'Criado em', 'Vídeos', 'Duração total']
+
+# Colunas do CSV que viram campos do curso na importação; as demais são calculadas
+IMPORT_FIELDS = {
+  'Título': 'title',
+  'Descrição': 'description',
+  'Data de Término': 'ends_at',
+  'Excluído em': 'deleted_at',
+}
@@ -0,0 +1,11 @@
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+  # Executado em toda conexão nova (sinal connection_created); as PRAGMAs valem por conexão
+  if connection.vendor != 'sqlite':
+    return
+
+  with connection.cursor() as cursor:
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+      cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+import threading
+
+from .models import VideoDurationCache
+
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_NEGATIVE_TTL = 60 * 60
+DEFAULT_MAX_SIZE = 1024
+
+# Sentinela para diferenciar "não está no cache" de um cache negativo (None)
+MISS = object()
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0}
+
+
+def _ttl(negative=False):
+  if negative:
+    return getattr(settings, 'VIDEO_DURATION_CACHE_NEGATIVE_TTL', DEFAULT_NEGATIVE_TTL)
+  return getattr(settings, 'VIDEO_DURATION_CACHE_TTL', DEFAULT_TTL)
+
+
+def _remember(video_id, duration, fetched_at):
+  expires_at = fetched_at + timezone.timedelta(seconds=_ttl(duration is None))
+  max_size = getattr(settings, 'VIDEO_DURATION_CACHE_SIZE', DEFAULT_MAX_SIZE)
+
+  with _lock:
+    _entries[video_id] = (duration, expires_at)
+    _entries.move_to_end(video_id)
+    while len(_entries) > max_size:
+      _entries.popitem(last=False)
+
+
+def lookup(video_id):
+  now = timezone.now()
+
+  with _lock:
+    entry = _entries.get(video_id)
+    if entry is not None:
+      if entry[1] > now:
+        _entries.move_to_end(video_id)
+        _stats['memory_hits'] += 1
+        return entry[0]
+      del _entries[video_id]
+
+  cached = VideoDurationCache.objects.filter(video_id=video_id).first()
+  if cached is not None and cached.fetched_at + timezone.timedelta(seconds=_ttl(cached.duration is None)) > now:
+    _remember(video_id, cached.duration, cached.fetched_at)
+    with _lock:
+      _stats['db_hits'] += 1
+    return cached.duration
+
+  with _lock:
+    _stats['misses'] += 1
+  return MISS
+
+
+def store(video_id, duration):
+  fetched_at = timezone.now()
+  VideoDurationCache.objects.update_or_create(video_id=video_id, defaults={'duration': duration, 'fetched_at': fetched_at})
+  _remember(video_id, duration, fetched_at)
+
+
+def purge_expired():
+  now = timezone.now()
+  expired = (
+    models.Q(duration__isnull=False, fetched_at__lt=now - timezone.timedelta(seconds=_ttl()))
+    | models.Q(duration__isnull=True, fetched_at__lt=now - timezone.timedelta(seconds=_ttl(negative=True)))
+  )
+  return VideoDurationCache.objects.filter(expired).delete()[0]
+
+
+def clear(persistent=False):
+  with _lock:
+    _entries.clear()
+    for key in _stats:
+      _stats[key] = 0
+  if persistent:
+    VideoDurationCache.objects.all().delete()
+
+
+def stats():
+  with _lock:
+    return {**_stats, 'size': len(_entries)}
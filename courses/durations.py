@@ -0,0 +1,33 @@
+from django.utils.dateparse import parse_duration
+from datetime import timedelta
+
+
+PENDING_DURATION = 'pending'
+
+
+def is_pending(duration):
+  return duration is None or duration == PENDING_DURATION
+
+
+def to_seconds(duration):
+  # Aceita tanto "1:45:0" quanto o formato do timedelta ("0:04:30", "1 day, 2:00:00")
+  if is_pending(duration):
+    return 0
+  parsed = parse_duration(duration)
+  return int(parsed.total_seconds()) if parsed else 0
+
+
+def format_duration(seconds):
+  if seconds is None:
+    return PENDING_DURATION
+  minutes, seconds = divmod(max(int(seconds), 0), 60)
+  hours, minutes = divmod(minutes, 60)
+  return f'{hours}:{minutes}:{seconds}'
+
+
+def format_video_duration(seconds):
+  # Formato que a API sempre devolveu por vídeo: o str() do timedelta lido do
+  # YouTube ("0:04:30") e "0:0:0" para vídeos sem duração
+  if not seconds:
+    return format_duration(seconds)
+  return str(timedelta(seconds=int(seconds)))
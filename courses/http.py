@@ -0,0 +1,150 @@
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
+import httpx
+import requests
+import threading
+import time
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 3
+DEFAULT_READ_TIMEOUT = 5
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.3
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.RequestException):
+  pass
+
+
+class CircuitBreaker:
+  # Depois de `threshold` falhas seguidas o circuito abre e as chamadas falham
+  # na hora durante `reset_timeout` segundos; passado esse tempo uma única
+  # chamada de teste é liberada e, se der certo, o circuito fecha de novo
+
+  def __init__(self):
+    self.failures = 0
+    self.opened_at = None
+    self.lock = threading.Lock()
+
+  def before_call(self):
+    with self.lock:
+      if self.opened_at is None:
+        return
+      now = time.monotonic()
+      if now - self.opened_at < _setting('YOUTUBE_HTTP_BREAKER_RESET', DEFAULT_BREAKER_RESET):
+        raise CircuitOpenError('YouTube indisponível, tentando novamente mais tarde.')
+      # Meio aberto: só esta chamada passa. O circuito segue aberto (com o prazo
+      # renovado) para as demais até ela dar certo; se falhar, ou se perder, o
+      # próximo teste só sai depois de outro reset_timeout
+      self.opened_at = now
+
+  def record_success(self):
+    with self.lock:
+      self.failures = 0
+      self.opened_at = None
+
+  def record_failure(self):
+    with self.lock:
+      self.failures += 1
+      if self.failures >= _setting('YOUTUBE_HTTP_BREAKER_THRESHOLD', DEFAULT_BREAKER_THRESHOLD):
+        self.opened_at = time.monotonic()
+
+  @property
+  def is_open(self):
+    return self.opened_at is not None
+
+
+breaker = CircuitBreaker()
+
+
+def _setting(name, default):
+  return getattr(settings, name, default)
+
+
+def build_session():
+  retry = Retry(
+    total=_setting('YOUTUBE_HTTP_RETRIES', DEFAULT_RETRIES),
+    backoff_factor=_setting('YOUTUBE_HTTP_BACKOFF', DEFAULT_BACKOFF),
+    status_forcelist=RETRY_STATUSES,
+    allowed_methods=('GET',),
+  )
+  pool_size = _setting('YOUTUBE_HTTP_POOL_SIZE', DEFAULT_POOL_SIZE)
+  adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+  session = requests.Session()
+  session.mount('http://', adapter)
+  session.mount('https://', adapter)
+  return session
+
+
+def get_session():
+  # Uma sessão por processo: as conexões (TCP + TLS) ficam no pool e são reaproveitadas
+  global _session
+  if _session is None:
+    with _session_lock:
+      if _session is None:
+        _session = build_session()
+  return _session
+
+
+def get_timeout():
+  return (
+    _setting('YOUTUBE_HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+    _setting('YOUTUBE_HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT),
+  )
+
+
+def get(url, **kwargs):
+  breaker.before_call()
+  try:
+    response = get_session().get(url, timeout=get_timeout(), **kwargs)
+  except requests.RequestException:
+    breaker.record_failure()
+    raise
+  breaker.record_success()
+  return response
+
+
+async def astream(client, url):
+  # get() para o cliente httpx (youtube.afetch_video_duration): mesmo circuito e
+  # mesmas novas tentativas. A resposta vem aberta; quem chama faz aclose()
+  breaker.before_call()
+  retries = _setting('YOUTUBE_HTTP_RETRIES', DEFAULT_RETRIES)
+  try:
+    for attempt in range(retries + 1):
+      if attempt:
+        await asyncio.sleep(_setting('YOUTUBE_HTTP_BACKOFF', DEFAULT_BACKOFF) * 2 ** (attempt - 1))
+      try:
+        response = await client.send(client.build_request('GET', url), stream=True)
+      except httpx.TransportError:
+        if attempt < retries:
+          continue
+        raise
+      if response.status_code not in RETRY_STATUSES:
+        break
+      await response.aclose()
+      if attempt == retries:
+        response.raise_for_status()
+  except httpx.HTTPError:
+    breaker.record_failure()
+    raise
+  breaker.record_success()
+  return response
+
+
+def reset():
+  global _session
+  with _session_lock:
+    if _session is not None:
+      _session.close()
+    _session = None
+  breaker.record_success()
@@ -0,0 +1,161 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+import csv
+import io
+import json
+import time
+
+from . import csv_format
+from .bulk import create_each, split_duplicate_titles
+from .cache import invalidate_courses
+from .models import Course
+from .serializers import CourseBulkSerializer
+
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+FORMATS = ('csv', 'jsonl')
+
+
+class CourseImportError(Exception):
+  pass
+
+
+def detect_format(filename, fmt=None):
+  fmt = fmt or ('jsonl' if str(filename).lower().endswith(('.jsonl', '.ndjson')) else 'csv')
+  if fmt not in FORMATS:
+    raise CourseImportError(f'Formato inválido: {fmt}. Use csv ou jsonl.')
+  return fmt
+
+
+def read_csv(stream):
+  reader = csv.reader(stream, delimiter=csv_format.DELIMITER)
+  header = next(reader, None)
+  if header is None:
+    return
+  missing = [column for column in csv_format.IMPORT_FIELDS if column not in header]
+  if missing:
+    raise CourseImportError(f'Colunas ausentes no CSV: {", ".join(missing)}')
+
+  positions = {field: header.index(column) for column, field in csv_format.IMPORT_FIELDS.items()}
+  for line, row in enumerate(reader, start=2):
+    if not row:
+      continue
+    yield line, {field: row[position] if position < len(row) else '' for field, position in positions.items()}
+
+
+def read_jsonl(stream):
+  for line, raw in enumerate(stream, start=1):
+    if not raw.strip():
+      continue
+    try:
+      item = json.loads(raw)
+    except ValueError:
+      yield line, None
+      continue
+    yield line, item if isinstance(item, dict) else None
+
+
+class CourseImporter:
+  # Lê o arquivo linha a linha e grava em lotes, então o uso de memória é
+  # limitado pelo tamanho do lote e não pelo tamanho do arquivo
+
+  def __init__(self, batch_size=None):
+    self.batch_size = batch_size or getattr(settings, 'IMPORT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    self.imported = 0
+    self.rejected = 0
+    self.errors = []
+
+  def run(self, stream, fmt='csv'):
+    reader = read_jsonl if fmt == 'jsonl' else read_csv
+    started = time.monotonic()
+
+    batch = []
+    try:
+      for line, item in reader(stream):
+        batch.append((line, item))
+        if len(batch) >= self.batch_size:
+          self._import_batch(batch)
+          batch = []
+    except UnicodeDecodeError:
+      raise CourseImportError('O arquivo deve estar em UTF-8.')
+    except csv.Error as e:
+      raise CourseImportError(f'CSV inválido: {e}')
+    if batch:
+      self._import_batch(batch)
+
+    return self.report(time.monotonic() - started)
+
+  def run_file(self, binary_file, fmt='csv'):
+    stream = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    try:
+      return self.run(stream, fmt)
+    finally:
+      stream.detach()
+
+  def report(self, elapsed):
+    return {
+      'imported': self.imported,
+      'rejected': self.rejected,
+      'seconds': round(elapsed, 3),
+      'rows_per_second': round((self.imported + self.rejected) / elapsed, 1) if elapsed else None,
+      'errors': self.errors,
+    }
+
+  def _reject(self, line, errors):
+    self.rejected += 1
+    if len(self.errors) < MAX_REPORTED_ERRORS:
+      self.errors.append({'line': line, 'errors': errors})
+
+  def _parse_deleted_at(self, value):
+    # JSONL pode trazer números, listas etc.; datas fora do calendário levantam ValueError
+    if not isinstance(value, str):
+      return None
+    try:
+      return parse_datetime(value)
+    except ValueError:
+      return None
+
+  def _import_batch(self, batch):
+    active, deleted = [], []
+
+    for line, item in batch:
+      if item is None:
+        self._reject(line, {'non_field_errors': ['Linha inválida.']})
+        continue
+
+      serializer = CourseBulkSerializer(data=item)
+      if not serializer.is_valid():
+        self._reject(line, serializer.errors)
+        continue
+
+      deleted_at = item.get('deleted_at') or None
+      if deleted_at:
+        deleted_at = self._parse_deleted_at(deleted_at)
+        if deleted_at is None:
+          self._reject(line, {'deleted_at': ['Data inválida.']})
+          continue
+
+      course = Course(deleted_at=deleted_at, **serializer.validated_data)
+      if deleted_at:
+        deleted.append((line, course))
+      else:
+        active.append((line, None, course.title, (line, course)))
+
+    # Cursos excluídos não participam da constraint unique_title_if_not_deleted
+    accepted, rejected_lines = split_duplicate_titles(active)
+    for line in rejected_lines:
+      self._reject(line, {'title': ['Já existe um curso ativo com este título.']})
+
+    try:
+      with transaction.atomic():
+        created = Course.objects.bulk_create([course for _, course in accepted + deleted])
+    except IntegrityError:
+      # Um título foi ocupado por outro escritor depois da checagem
+      created, rejected_lines = create_each(accepted + deleted)
+      for line in rejected_lines:
+        self._reject(line, {'title': ['Já existe um curso ativo com este título.']})
+
+    self.imported += len(created)
+    invalidate_courses([course.pk for course in created])
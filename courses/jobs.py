@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .durations import to_seconds
+from .models import Course, Video, VideoDurationJob
+from .youtube import EMPTY_DURATION, get_video_duration
+
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = 30
+DEFAULT_LEASE = 5 * 60
+
+
+def enqueue_duration_job(course, video):
+  return VideoDurationJob.objects.create(course=course, video_id=video.uid, url=video.url)
+
+
+def enqueue_duration_jobs(course, videos):
+  return VideoDurationJob.objects.bulk_create([
+    VideoDurationJob(course=course, video_id=video.uid, url=video.url) for video in videos
+  ])
+
+
+def claimable(now):
+  # Jobs "running" há mais que o lease ficaram órfãos (worker morto no meio) e voltam para a fila
+  lease = getattr(settings, 'VIDEO_DURATION_JOB_LEASE', DEFAULT_LEASE)
+  return (
+    Q(status=VideoDurationJob.STATUS_PENDING, available_at__lte=now)
+    | Q(status=VideoDurationJob.STATUS_RUNNING, updated_at__lt=now - timezone.timedelta(seconds=lease))
+  )
+
+
+def claim_jobs(limit):
+  now = timezone.now()
+  candidates = (
+    VideoDurationJob.objects
+    .filter(claimable(now))
+    .order_by('available_at', 'id')
+    .values_list('id', flat=True)[:limit]
+  )
+
+  claimed = []
+  for job_id in list(candidates):
+    # O UPDATE condicional garante que dois workers não peguem o mesmo job
+    updated = VideoDurationJob.objects.filter(claimable(now), pk=job_id).update(
+      status=VideoDurationJob.STATUS_RUNNING,
+      attempts=F('attempts') + 1,
+      updated_at=timezone.now()
+    )
+    if updated:
+      claimed.append(VideoDurationJob.objects.get(pk=job_id))
+  return claimed
+
+
+def apply_duration(job, duration):
+  with transaction.atomic():
+    # Se a URL mudou depois do enfileiramento, um job mais novo cuida do vídeo
+    video = (
+      Video.objects.select_for_update()
+      .filter(course_id=job.course_id, uid=job.video_id, url=job.url, duration__isnull=True)
+      .first()
+    )
+    if video is None:
+      return False
+
+    video.duration = to_seconds(duration)
+    video.save(update_fields=['duration'])
+    Course.with_deleted.get(pk=job.course_id).add_duration(video.duration)
+    return True
+
+
+def process_job(job):
+  max_attempts = getattr(settings, 'VIDEO_DURATION_JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+  retry_delay = getattr(settings, 'VIDEO_DURATION_JOB_RETRY_DELAY', DEFAULT_RETRY_DELAY)
+
+  try:
+    duration = get_video_duration(job.url)
+  except Exception as e:
+    job.last_error = str(e)
+    if job.attempts < max_attempts:
+      job.status = VideoDurationJob.STATUS_PENDING
+      job.available_at = timezone.now() + timezone.timedelta(seconds=retry_delay * job.attempts)
+      job.save()
+      return False
+
+    # Esgotadas as tentativas, o vídeo fica com duração zerada para não travar o total do curso
+    job.status = VideoDurationJob.STATUS_FAILED
+    job.save()
+    apply_duration(job, EMPTY_DURATION)
+    return False
+
+  apply_duration(job, duration)
+  job.status = VideoDurationJob.STATUS_DONE
+  job.last_error = ''
+  job.save()
+  return True
+
+
+def process_pending_jobs(limit=50):
+  jobs = claim_jobs(limit)
+  for job in jobs:
+    process_job(job)
+  return len(jobs)
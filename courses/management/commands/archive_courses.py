@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from courses.archive import DEFAULT_BATCH_SIZE, archive_courses, get_archive_after_days
+
+
+class Command(BaseCommand):
+  help = 'Move para o arquivo os cursos encerrados ou excluídos há mais de N dias'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--days', type=int, default=None, help='Padrão: COURSES_ARCHIVE_AFTER_DAYS')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Cursos por transação')
+    parser.add_argument('--dry-run', action='store_true', help='Só conta os cursos, sem mover')
+
+  def handle(self, *args, **options):
+    days = get_archive_after_days() if options['days'] is None else options['days']
+    if days < 0 or options['batch_size'] < 1:
+      raise CommandError('--days não pode ser negativo e --batch-size deve ser maior que zero')
+
+    archived = archive_courses(
+      cutoff=timezone.now() - timezone.timedelta(days=days),
+      batch_size=options['batch_size'],
+      dry_run=options['dry_run'],
+    )
+
+    action = 'seriam arquivado(s)' if options['dry_run'] else 'arquivado(s)'
+    self.stdout.write(f'{archived} curso(s) {action}')
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+import json
+import subprocess
+
+from courses.benchmark import ENDPOINTS, TRANSPORTS, run_benchmark
+
+
+class Command(BaseCommand):
+  help = 'Mede latência, consultas por requisição e memória dos endpoints de cursos num banco descartável'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--courses', type=int, default=200)
+    parser.add_argument('--videos', type=int, default=10, help='Vídeos por curso')
+    parser.add_argument('--requests', type=int, default=50, help='Requisições por endpoint')
+    parser.add_argument('--transport', choices=TRANSPORTS, default='client')
+    parser.add_argument('--endpoint', action='append', choices=ENDPOINTS, help='Repetível; padrão: todos')
+    parser.add_argument('--warm-cache', action='store_true', help='Usa o cache de respostas configurado')
+    parser.add_argument('--accept-encoding', help='Cabeçalho Accept-Encoding enviado (ex.: gzip, br)')
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: stdout)')
+
+  def handle(self, *args, **options):
+    # Banco de teste descartável, como no `manage.py test`, para não tocar nos dados reais
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+      report = run_benchmark(
+        courses=options['courses'],
+        videos=options['videos'],
+        requests_per_endpoint=options['requests'],
+        transport=options['transport'],
+        endpoints=options['endpoint'] or ENDPOINTS,
+        cold_cache=not options['warm_cache'],
+        accept_encoding=options['accept_encoding'],
+      )
+    finally:
+      connection.creation.destroy_test_db(old_name, verbosity=0)
+      teardown_test_environment()
+
+    report['commit'] = self._current_commit()
+    output = json.dumps(report, indent=2)
+    if options['output']:
+      with open(options['output'], 'w') as file:
+        file.write(output + '\n')
+    else:
+      self.stdout.write(output)
+
+  def _current_commit(self):
+    try:
+      return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+      return None
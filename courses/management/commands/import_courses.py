@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.importer import CourseImporter, CourseImportError, detect_format
+
+
+class Command(BaseCommand):
+  help = 'Importa cursos de um arquivo CSV (formato do report/export) ou JSONL'
+
+  def add_arguments(self, parser):
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=['csv', 'jsonl'])
+    parser.add_argument('--batch-size', type=int)
+
+  def handle(self, *args, **options):
+    try:
+      fmt = detect_format(options['path'], options['format'])
+      with open(options['path'], 'rb') as file:
+        report = CourseImporter(batch_size=options['batch_size']).run_file(file, fmt)
+    except (OSError, CourseImportError) as e:
+      raise CommandError(e)
+
+    for error in report['errors']:
+      self.stderr.write(f"Linha {error['line']}: {error['errors']}")
+    self.stdout.write(
+      f"{report['imported']} curso(s) importado(s), {report['rejected']} rejeitado(s) "
+      f"em {report['seconds']}s ({report['rows_per_second']} linhas/s)"
+    )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+import time
+
+from courses.jobs import process_pending_jobs
+
+
+class Command(BaseCommand):
+  help = 'Processa a fila de jobs que resolvem a duração dos vídeos no YouTube'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--once', action='store_true', help='Esvazia a fila e encerra')
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--sleep', type=float, default=2.0, help='Intervalo (s) entre consultas com a fila vazia')
+
+  def handle(self, *args, **options):
+    total = 0
+    while True:
+      processed = process_pending_jobs(limit=options['batch_size'])
+      total += processed
+
+      if processed:
+        continue
+      if options['once']:
+        break
+      time.sleep(options['sleep'])
+
+    self.stdout.write(f'{total} job(s) processado(s)')
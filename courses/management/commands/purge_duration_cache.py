@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from courses import duration_cache
+
+
+class Command(BaseCommand):
+  help = 'Remove do cache persistente as durações de vídeo expiradas'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--all', action='store_true', help='Remove todas as entradas, expiradas ou não')
+
+  def handle(self, *args, **options):
+    if options['all']:
+      duration_cache.clear(persistent=True)
+      self.stdout.write('Cache de duração limpo')
+      return
+
+    removed = duration_cache.purge_expired()
+    self.stdout.write(f'{removed} entrada(s) expirada(s) removida(s)')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.recompute import DEFAULT_BATCH_SIZE, recompute_durations
+
+
+class Command(BaseCommand):
+  help = 'Recalcula a duração total dos cursos a partir dos vídeos e corrige as divergências'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=1, help='Processos em paralelo, cada um com um lote de cursos')
+    parser.add_argument('--dry-run', action='store_true', help='Só informa as divergências, sem gravar')
+
+  def handle(self, *args, **options):
+    if options['batch_size'] < 1 or options['workers'] < 1:
+      raise CommandError('--batch-size e --workers devem ser maiores que zero')
+
+    checked, out_of_sync = recompute_durations(
+      batch_size=options['batch_size'],
+      workers=options['workers'],
+      dry_run=options['dry_run'],
+    )
+
+    action = 'encontrado(s)' if options['dry_run'] else 'corrigido(s)'
+    self.stdout.write(f'{checked} curso(s) verificado(s), {out_of_sync} fora de sincronia {action}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from courses.stats import refresh_stats
+
+
+class Command(BaseCommand):
+  help = 'Recalcula o resumo do catálogo servido por /api/courses/stats/ (agende com cron)'
+
+  def handle(self, *args, **options):
+    stats = refresh_stats()
+    self.stdout.write(
+      f'{stats.active_courses} ativo(s), {stats.expired_courses} encerrado(s), '
+      f'{stats.deleted_courses} excluído(s), {stats.total_videos} vídeo(s)'
+    )
@@ -0,0 +1,151 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+TIMED_KINDS = ('db', 'http', 'serialization')
+
+_current = ContextVar('courses_request_stats', default=None)
+_lock = threading.Lock()
+_endpoints = {}
+_responses = {}
+
+
+class RequestStats:
+  def __init__(self):
+    self.queries = 0
+    self.durations = dict.fromkeys(TIMED_KINDS, 0.0)
+
+
+class EndpointMetrics:
+  def __init__(self):
+    self.buckets = [0] * len(BUCKETS)
+    self.count = 0
+    self.sum = 0.0
+    self.queries = 0
+    self.durations = dict.fromkeys(TIMED_KINDS, 0.0)
+
+  def observe(self, elapsed, stats):
+    for i, bound in enumerate(BUCKETS):
+      if elapsed <= bound:
+        self.buckets[i] += 1
+    self.count += 1
+    self.sum += elapsed
+    self.queries += stats.queries
+    for kind, duration in stats.durations.items():
+      self.durations[kind] += duration
+
+
+def bind_request(stats):
+  return _current.set(stats)
+
+
+def finish_request(token):
+  _current.reset(token)
+
+
+def current_stats():
+  return _current.get()
+
+
+@contextmanager
+def timer(kind):
+  # Fora de uma requisição (worker, shell) o tempo simplesmente não é registrado
+  stats = _current.get()
+  started = time.perf_counter()
+  try:
+    yield
+  finally:
+    if stats is not None:
+      stats.durations[kind] += time.perf_counter() - started
+
+
+def install_sql_wrapper(sender, connection, **kwargs):
+  # Instalado em toda conexão nova (sinal connection_created), inclusive nas
+  # threads usadas pelo ORM assíncrono; só registra se houver requisição ativa
+  if sql_wrapper not in connection.execute_wrappers:
+    connection.execute_wrappers.append(sql_wrapper)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+  stats = _current.get()
+  started = time.perf_counter()
+  try:
+    return execute(sql, params, many, context)
+  finally:
+    if stats is not None:
+      stats.queries += 1
+      stats.durations['db'] += time.perf_counter() - started
+
+
+def observe(endpoint, method, status_code, elapsed, stats):
+  with _lock:
+    _endpoints.setdefault((endpoint, method), EndpointMetrics()).observe(elapsed, stats)
+    key = (endpoint, method, status_code)
+    _responses[key] = _responses.get(key, 0) + 1
+
+
+def snapshot():
+  with _lock:
+    return {
+      key: {'count': m.count, 'sum': m.sum, 'queries': m.queries, **{f'{kind}_seconds': d for kind, d in m.durations.items()}}
+      for key, m in _endpoints.items()
+    }
+
+
+def reset():
+  with _lock:
+    _endpoints.clear()
+    _responses.clear()
+
+
+def _labels(**labels):
+  return ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def _format_bound(bound):
+  return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def render_prometheus(extra_gauges=None):
+  with _lock:
+    endpoints = sorted(_endpoints.items())
+    responses = sorted(_responses.items())
+
+  lines = [
+    '# HELP courses_requests_total Requisições atendidas por endpoint e status.',
+    '# TYPE courses_requests_total counter',
+  ]
+  for (endpoint, method, status_code), count in responses:
+    lines.append(f'courses_requests_total{{{_labels(endpoint=endpoint, method=method, status=status_code)}}} {count}')
+
+  lines += [
+    '# HELP courses_request_duration_seconds Latência das requisições.',
+    '# TYPE courses_request_duration_seconds histogram',
+  ]
+  for (endpoint, method), metrics in endpoints:
+    labels = _labels(endpoint=endpoint, method=method)
+    for bound, count in zip(BUCKETS, metrics.buckets):
+      lines.append(f'courses_request_duration_seconds_bucket{{{labels},le="{_format_bound(bound)}"}} {count}')
+    lines.append(f'courses_request_duration_seconds_sum{{{labels}}} {metrics.sum}')
+    lines.append(f'courses_request_duration_seconds_count{{{labels}}} {metrics.count}')
+
+  lines += [
+    '# HELP courses_db_queries_total Consultas SQL executadas.',
+    '# TYPE courses_db_queries_total counter',
+  ]
+  for (endpoint, method), metrics in endpoints:
+    lines.append(f'courses_db_queries_total{{{_labels(endpoint=endpoint, method=method)}}} {metrics.queries}')
+
+  for kind in TIMED_KINDS:
+    name = f'courses_{kind}_duration_seconds_total'
+    lines += [f'# HELP {name} Tempo acumulado em {kind}.', f'# TYPE {name} counter']
+    for (endpoint, method), metrics in endpoints:
+      lines.append(f'{name}{{{_labels(endpoint=endpoint, method=method)}}} {metrics.durations[kind]}')
+
+  for name, value in sorted((extra_gauges or {}).items()):
+    lines += [f'# TYPE {name} gauge', f'{name} {value}']
+
+  return '\n'.join(lines) + '\n'
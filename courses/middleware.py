@@ -0,0 +1,153 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from contextlib import contextmanager
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+import time
+
+from . import metrics
+
+try:
+  import brotli
+except ImportError:  # opcional: sem ele só há gzip
+  brotli = None
+
+
+DEFAULT_COMPRESSION_MIN_SIZE = 1024
+DEFAULT_BROTLI_QUALITY = 5
+
+
+@contextmanager
+def instrument(stats):
+  token = metrics.bind_request(stats)
+  try:
+    yield
+  finally:
+    metrics.finish_request(token)
+
+
+class MetricsMiddleware:
+  # Mede latência, SQL, chamadas ao YouTube e serialização de cada requisição.
+  # Suporta os dois modos para não forçar as views assíncronas a rodar em thread
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+    if iscoroutinefunction(self.get_response):
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+
+    stats = metrics.RequestStats()
+    started = time.perf_counter()
+    with instrument(stats):
+      response = self.get_response(request)
+    return self._finish(request, response, stats, started)
+
+  async def __acall__(self, request):
+    stats = metrics.RequestStats()
+    started = time.perf_counter()
+    with instrument(stats):
+      response = await self.get_response(request)
+    return self._finish(request, response, stats, started)
+
+  def _finish(self, request, response, stats, started):
+    match = request.resolver_match
+    endpoint = match.view_name if match else 'unmatched'
+
+    if response.streaming:
+      # O corpo (ex.: report/export) só é gerado depois que o middleware retorna
+      if response.is_async:
+        response.streaming_content = self._astream(response.streaming_content, stats, started, endpoint, request.method, response.status_code)
+      else:
+        response.streaming_content = self._stream(response.streaming_content, stats, started, endpoint, request.method, response.status_code)
+      return response
+
+    elapsed = time.perf_counter() - started
+    metrics.observe(endpoint, request.method, response.status_code, elapsed, stats)
+
+    if settings.DEBUG:
+      response['Server-Timing'] = ', '.join([
+        f'db;dur={stats.durations["db"] * 1000:.1f};desc="{stats.queries} queries"',
+        f'http;dur={stats.durations["http"] * 1000:.1f}',
+        f'serialization;dur={stats.durations["serialization"] * 1000:.1f}',
+        f'total;dur={elapsed * 1000:.1f}',
+      ])
+    return response
+
+  def _stream(self, content, stats, started, endpoint, method, status_code):
+    try:
+      iterator = iter(content)
+      while True:
+        with instrument(stats):
+          chunk = next(iterator, None)
+        if chunk is None:
+          break
+        yield chunk
+    finally:
+      metrics.observe(endpoint, method, status_code, time.perf_counter() - started, stats)
+
+  async def _astream(self, content, stats, started, endpoint, method, status_code):
+    try:
+      async for chunk in content:
+        yield chunk
+    finally:
+      metrics.observe(endpoint, method, status_code, time.perf_counter() - started, stats)
+
+
+def accepted_encodings(header):
+  # "gzip, br;q=0.8, identity;q=0" -> {'gzip': 1.0, 'br': 0.8, 'identity': 0.0}
+  encodings = {}
+  for item in header.split(','):
+    name, _, params = item.strip().partition(';')
+    if not name:
+      continue
+    quality = 1.0
+    key, _, value = params.strip().partition('=')
+    if key.strip() == 'q':
+      try:
+        quality = float(value)
+      except ValueError:
+        quality = 0.0
+    encodings[name.strip().lower()] = quality
+  return encodings
+
+
+class CompressionMiddleware(GZipMiddleware):
+  # Comprime respostas a partir de COMPRESSION_MIN_SIZE bytes. Usa brotli quando
+  # o pacote está instalado e o cliente prefere "br"; senão o gzip do Django
+  # (que já trata ETag, Vary, streaming e a mitigação do BREACH)
+
+  def process_response(self, request, response):
+    if not response.streaming and len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_COMPRESSION_MIN_SIZE):
+      return response
+
+    encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if brotli is not None and not response.streaming and encodings.get('br', 0) > 0 and encodings.get('br', 0) >= encodings.get('gzip', 0):
+      return self._brotli(response)
+    if encodings.get('gzip', 0) <= 0:
+      patch_vary_headers(response, ('Accept-Encoding',))
+      return response
+    return super().process_response(request, response)
+
+  def _brotli(self, response):
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if response.has_header('Content-Encoding'):
+      return response
+
+    quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY)
+    compressed = brotli.compress(response.content, quality=quality)
+    if len(compressed) >= len(response.content):
+      return response
+
+    response.content = compressed
+    response.headers['Content-Length'] = str(len(compressed))
+    response.headers['Content-Encoding'] = 'br'
+    # O corpo mudou, então a ETag passa a ser fraca (como no gzip do Django)
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+      response.headers['ETag'] = 'W/' + etag
+    return response
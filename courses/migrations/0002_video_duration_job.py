@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoDurationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=64)),
+                ('url', models.CharField(max_length=2048)),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('running', 'Em execução'), ('done', 'Concluído'), ('failed', 'Falhou')], default='pending', max_length=16)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duration_jobs', to='courses.course')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'available_at'], name='duration_job_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:01
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_video_duration_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoDurationCache',
+            fields=[
+                ('video_id', models.CharField(max_length=11, primary_key=True, serialize=False)),
+                ('duration', models.CharField(blank=True, max_length=32, null=True)),
+                ('fetched_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
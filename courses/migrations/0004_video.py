@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:03
+
+import courses.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_video_duration_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Video',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uid', models.CharField(default=courses.models.generate_video_uid, max_length=64)),
+                ('title', models.CharField(max_length=255)),
+                ('url', models.CharField(max_length=2048)),
+                ('duration', models.PositiveIntegerField(blank=True, null=True)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='videos', to='courses.course')),
+            ],
+            options={
+                'ordering': ['position', 'id'],
+                'indexes': [models.Index(fields=['course', 'position'], name='video_course_position_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='video',
+            constraint=models.UniqueConstraint(fields=('course', 'uid'), name='unique_video_uid_per_course'),
+        ),
+    ]
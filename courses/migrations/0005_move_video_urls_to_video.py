@@ -0,0 +1,71 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:03
+
+from django.db import migrations
+from django.utils.dateparse import parse_duration
+import uuid
+
+
+def parse_seconds(duration):
+    if not duration or duration == 'pending':
+        return None
+    parsed = parse_duration(duration)
+    return int(parsed.total_seconds()) if parsed else 0
+
+
+def format_seconds(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes}:{seconds}'
+
+
+def forwards(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Video = apps.get_model('courses', 'Video')
+
+    courses = Course.objects.only('id', 'video_urls').iterator(chunk_size=500)
+    for course in courses:
+        videos = [
+            Video(
+                course_id=course.id,
+                # Entradas antigas sem id ganham um, como os vídeos novos
+                uid=item.get('id') or str(uuid.uuid4()),
+                title=item.get('title', ''),
+                url=item.get('url', ''),
+                duration=parse_seconds(item.get('duration')),
+                position=position,
+            )
+            for position, item in enumerate(course.video_urls or [])
+        ]
+        if not videos:
+            continue
+        Video.objects.bulk_create(videos)
+        total = sum(video.duration or 0 for video in videos)
+        Course.objects.filter(pk=course.id).update(total_duration=format_seconds(total))
+
+
+def backwards(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Video = apps.get_model('courses', 'Video')
+
+    for course in Course.objects.filter(videos__isnull=False).distinct().iterator(chunk_size=500):
+        course.video_urls = [
+            {
+                'id': video.uid,
+                'title': video.title,
+                'url': video.url,
+                'duration': 'pending' if video.duration is None else format_seconds(video.duration),
+            }
+            for video in Video.objects.filter(course_id=course.id).order_by('position', 'id')
+        ]
+        Course.objects.filter(pk=course.id).update(video_urls=course.video_urls)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_video'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
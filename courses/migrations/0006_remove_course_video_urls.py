@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:03
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_move_video_urls_to_video'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='course',
+            name='video_urls',
+        ),
+    ]
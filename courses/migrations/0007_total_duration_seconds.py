@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_remove_course_video_urls'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='total_duration_seconds',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
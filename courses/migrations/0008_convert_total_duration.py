@@ -0,0 +1,52 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:04
+
+from django.db import migrations
+from django.utils.dateparse import parse_duration
+
+
+def parse_seconds(duration):
+    parsed = parse_duration(duration or '')
+    return int(parsed.total_seconds()) if parsed else 0
+
+
+def format_seconds(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes}:{seconds}'
+
+
+def forwards(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+
+    batch = []
+    for course in Course.objects.only('id', 'total_duration').iterator(chunk_size=1000):
+        course.total_duration_seconds = parse_seconds(course.total_duration)
+        batch.append(course)
+        if len(batch) >= 1000:
+            Course.objects.bulk_update(batch, ['total_duration_seconds'])
+            batch = []
+    Course.objects.bulk_update(batch, ['total_duration_seconds'])
+
+
+def backwards(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+
+    batch = []
+    for course in Course.objects.only('id', 'total_duration_seconds').iterator(chunk_size=1000):
+        course.total_duration = format_seconds(course.total_duration_seconds)
+        batch.append(course)
+        if len(batch) >= 1000:
+            Course.objects.bulk_update(batch, ['total_duration'])
+            batch = []
+    Course.objects.bulk_update(batch, ['total_duration'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_total_duration_seconds'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
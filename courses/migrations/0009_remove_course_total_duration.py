@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:04
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_convert_total_duration'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='course',
+            name='total_duration',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_remove_course_total_duration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['deleted_at', 'ends_at', 'created_at', 'id'], name='course_list_idx'),
+        ),
+    ]
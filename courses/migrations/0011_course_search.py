@@ -0,0 +1,68 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:06
+
+from django.db import migrations
+
+
+# Tabela FTS5 de conteúdo externo: o texto continua só em courses_course e os
+# triggers mantêm o índice em dia, inclusive em update()/bulk_create, que não
+# disparam sinais
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE courses_course_fts USING fts5("
+    "title, description, content='courses_course', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO courses_course_fts(courses_course_fts) VALUES ('rebuild')",
+    """CREATE TRIGGER courses_course_fts_ai AFTER INSERT ON courses_course BEGIN
+        INSERT INTO courses_course_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER courses_course_fts_ad AFTER DELETE ON courses_course BEGIN
+        INSERT INTO courses_course_fts(courses_course_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER courses_course_fts_au AFTER UPDATE OF title, description ON courses_course BEGIN
+        INSERT INTO courses_course_fts(courses_course_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO courses_course_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS courses_course_fts_ai',
+    'DROP TRIGGER IF EXISTS courses_course_fts_ad',
+    'DROP TRIGGER IF EXISTS courses_course_fts_au',
+    'DROP TABLE IF EXISTS courses_course_fts',
+]
+
+POSTGRES_CREATE = [
+    "ALTER TABLE courses_course ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('portuguese', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('portuguese', coalesce(description, '')), 'B')) STORED",
+    'CREATE INDEX courses_course_search_idx ON courses_course USING GIN (search_vector)',
+]
+
+POSTGRES_DROP = [
+    'DROP INDEX IF EXISTS courses_course_search_idx',
+    'ALTER TABLE courses_course DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def statements(schema_editor, sqlite, postgresql):
+    return {'sqlite': sqlite, 'postgresql': postgresql}.get(schema_editor.connection.vendor, [])
+
+
+def forwards(apps, schema_editor):
+    # Índice de busca específico de cada banco; nos demais a busca usa icontains
+    for statement in statements(schema_editor, SQLITE_CREATE, POSTGRES_CREATE):
+        schema_editor.execute(statement, params=None)
+
+
+def backwards(apps, schema_editor):
+    for statement in statements(schema_editor, SQLITE_DROP, POSTGRES_DROP):
+        schema_editor.execute(statement, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_course_list_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
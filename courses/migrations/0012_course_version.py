@@ -0,0 +1,45 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:07
+
+from django.db import migrations, models
+
+
+# O SQLite recria a tabela no AddField/RemoveField, o que apaga os triggers da
+# busca (0011_course_search): são reinstalados depois, nos dois sentidos
+SQLITE_TRIGGERS = [
+    'DROP TRIGGER IF EXISTS courses_course_fts_ai',
+    'DROP TRIGGER IF EXISTS courses_course_fts_ad',
+    'DROP TRIGGER IF EXISTS courses_course_fts_au',
+    """CREATE TRIGGER courses_course_fts_ai AFTER INSERT ON courses_course BEGIN
+        INSERT INTO courses_course_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER courses_course_fts_ad AFTER DELETE ON courses_course BEGIN
+        INSERT INTO courses_course_fts(courses_course_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER courses_course_fts_au AFTER UPDATE OF title, description ON courses_course BEGIN
+        INSERT INTO courses_course_fts(courses_course_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO courses_course_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def reinstall_sqlite_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_TRIGGERS:
+            schema_editor.execute(statement, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_course_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_sqlite_triggers),
+        migrations.AddField(
+            model_name='course',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(reinstall_sqlite_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_course_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='course',
+            name='course_list_idx',
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['ends_at', 'created_at', 'id'], name='course_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='course_deleted_idx'),
+        ),
+    ]
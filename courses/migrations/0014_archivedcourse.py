@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:09
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0013_course_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedCourse',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('ends_at', models.DateTimeField()),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('total_duration_seconds', models.PositiveIntegerField(default=0)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('video_count', models.PositiveIntegerField(default=0)),
+                ('video_urls', models.JSONField(default=list)),
+                ('archived_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
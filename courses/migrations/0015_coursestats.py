@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0014_archivedcourse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('active_courses', models.PositiveIntegerField(default=0)),
+                ('expired_courses', models.PositiveIntegerField(default=0)),
+                ('deleted_courses', models.PositiveIntegerField(default=0)),
+                ('archived_courses', models.PositiveIntegerField(default=0)),
+                ('total_videos', models.PositiveIntegerField(default=0)),
+                ('videos_per_course', models.FloatField(default=0)),
+                ('total_duration_seconds', models.PositiveBigIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
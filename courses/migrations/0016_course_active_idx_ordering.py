@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0015_coursestats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='course',
+            name='course_active_idx',
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['created_at', 'id', 'ends_at'], name='course_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['ends_at'], name='course_expiry_idx'),
+        ),
+    ]
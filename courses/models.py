@@ -1,5 +1,25 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
 from django.utils import timezone
+from collections import Counter
+import uuid
+
+from .durations import format_duration, format_video_duration
+from .cache import invalidate_course, invalidate_courses
+
+
+# Colunas que só mudam por UPDATE atômico no banco (add_duration/bump_version)
+COUNTER_FIELDS = ('version', 'total_duration_seconds')
+
+
+class DuplicateTitle(Exception):
+  pass
+
+
+class VersionConflict(Exception):
+  # Outro escritor alterou o curso entre a leitura e o UPDATE condicional
+  pass
 
 
 class CourseManager(models.Manager):
@@ -7,7 +27,20 @@ class CourseManager(models.Manager):
     return super().get_queryset().filter(deleted_at__isnull=True)
 
 
-class CourseWithDeletedManager(models.Manager):
+class CourseQuerySet(models.QuerySet):
+  def including_archived(self, *fields):
+    # Leitura das duas tabelas juntas (só valores; cada campo, ou anotação,
+    # precisa existir também em ArchivedCourse). Sem filtros no arquivo: é para
+    # relatórios. O UNION casa as colunas pela posição, então os dois lados
+    # selecionam as mesmas anotações row_<campo>, na ordem pedida; ordene por
+    # elas (ex.: .order_by('row_id'))
+    columns = {f'row_{field}': F(field) for field in fields}
+    return self.annotate(**columns).values_list(*columns).union(
+      ArchivedCourse.objects.annotate(**columns).values_list(*columns), all=True
+    )
+
+
+class CourseWithDeletedManager(models.Manager.from_queryset(CourseQuerySet)):
   def get_queryset(self):
     return super().get_queryset().filter()
 
@@ -19,12 +52,30 @@ class Course(models.Model):
   deleted_at = models.DateTimeField(null=True, blank=True)
   created_at = models.DateTimeField(auto_now_add=True)
   updated_at = models.DateTimeField(auto_now=True)
-  video_urls = models.JSONField(default=list, blank=True)
-  total_duration = models.CharField(max_length=255, default="0:0:0")
+  total_duration_seconds = models.PositiveIntegerField(default=0, db_index=True)
+  # Controle de concorrência otimista: toda escrita no curso (ou nos vídeos) incrementa
+  version = models.PositiveIntegerField(default=1)
 
   objects = CourseManager()
   with_deleted = CourseWithDeletedManager()
 
+  def save(self, *args, **kwargs):
+    if self._state.adding or kwargs.get('force_insert'):
+      return super().save(*args, **kwargs)
+
+    # Uma instância lida antes de um add_duration concorrente não pode
+    # regravar os contadores com os valores antigos
+    update_fields = kwargs.pop('update_fields', None)
+    if update_fields is None:
+      deferred = self.get_deferred_fields()
+      update_fields = [
+        field.name for field in self._meta.concrete_fields
+        if not field.primary_key and field.name not in COUNTER_FIELDS and field.attname not in deferred
+      ]
+    self.version = F('version') + 1
+    super().save(*args, update_fields=[*update_fields, 'version'], **kwargs)
+    self.refresh_from_db(fields=['version'])
+
   def delete(self, *args, **kwargs):
     self.deleted_at = timezone.now()
     self.save()
@@ -38,6 +89,218 @@ class Course(models.Model):
     constraints = [
       models.UniqueConstraint(fields=['title'], condition=models.Q(deleted_at__isnull=True), name='unique_title_if_not_deleted')
     ]
+    # Índices parciais: a listagem (CourseManager, ordenação/cursor por
+    # (created_at, id)) percorre os cursos ativos já na ordem, filtrando ends_at
+    # no próprio índice; o arquivamento busca por ends_at; e as telas de excluídos
+    # (Course.with_deleted) só os excluídos, cada uma no seu índice menor
+    indexes = [
+      models.Index(fields=['created_at', 'id', 'ends_at'], condition=models.Q(deleted_at__isnull=True), name='course_active_idx'),
+      models.Index(fields=['ends_at'], condition=models.Q(deleted_at__isnull=True), name='course_expiry_idx'),
+      models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='course_deleted_idx'),
+    ]
 
   def is_deleted(self):
-    return self.deleted_at is not None
\ No newline at end of file
+    return self.deleted_at is not None
+
+  @property
+  def video_urls(self):
+    # Mantém o formato da antiga lista JSON para os serializers
+    return [video.as_dict() for video in self.videos.all()]
+
+  @property
+  def total_duration(self):
+    # Formato legado "H:M:S" exposto pela API
+    return format_duration(self.total_duration_seconds)
+
+  def add_duration(self, seconds):
+    # Incremento atômico no banco, sem reler nem regravar o restante da linha
+    Course.with_deleted.filter(pk=self.pk).update(**self._counters_update(seconds))
+    self.refresh_from_db(fields=['total_duration_seconds', 'updated_at', 'version'])
+    # update() não dispara post_save, então o cache é invalidado aqui
+    invalidate_course(self.pk)
+
+  def bump_version(self, seconds=0):
+    # UPDATE condicional: só passa se ninguém escreveu no curso desde que esta
+    # instância foi lida. Nesse caso os contadores em memória eram os do banco
+    # e os novos valores são calculados aqui mesmo, sem reler a linha
+    values = self._counters_update(seconds)
+    if not Course.with_deleted.filter(pk=self.pk, version=self.version).update(**values):
+      raise VersionConflict(self.pk)
+    self.version += 1
+    self.total_duration_seconds = max(self.total_duration_seconds + (seconds or 0), 0)
+    self.updated_at = values['updated_at']
+    invalidate_course(self.pk)
+
+  def next_video_position(self):
+    last_position = self.videos.aggregate(last=Max('position'))['last']
+    return 0 if last_position is None else last_position + 1
+
+  def _counters_update(self, seconds):
+    return {
+      'version': F('version') + 1,
+      'total_duration_seconds': Greatest(F('total_duration_seconds') + (seconds or 0), 0),
+      'updated_at': timezone.now(),
+    }
+
+
+class VideoManager(models.Manager):
+  def lookup(self, course_id, uid):
+    # Um único SELECT pelo índice único (course, uid), já trazendo o curso ativo
+    return self.select_related('course').filter(course_id=course_id, uid=uid, course__deleted_at__isnull=True)
+
+
+def generate_video_uid():
+  return str(uuid.uuid4())
+
+
+class Video(models.Model):
+  course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='videos')
+  uid = models.CharField(max_length=64, default=generate_video_uid)
+  title = models.CharField(max_length=255)
+  url = models.CharField(max_length=2048)
+  # Segundos; nulo enquanto a duração está pendente no worker
+  duration = models.PositiveIntegerField(null=True, blank=True)
+  position = models.PositiveIntegerField(default=0)
+
+  objects = VideoManager()
+
+  class Meta:
+    ordering = ['position', 'id']
+    constraints = [
+      models.UniqueConstraint(fields=['course', 'uid'], name='unique_video_uid_per_course')
+    ]
+    indexes = [
+      models.Index(fields=['course', 'position'], name='video_course_position_idx')
+    ]
+
+  def as_dict(self):
+    return {
+      'id': self.uid,
+      'title': self.title,
+      'url': self.url,
+      'duration': format_video_duration(self.duration)
+    }
+
+
+class VideoDurationJob(models.Model):
+  STATUS_PENDING = 'pending'
+  STATUS_RUNNING = 'running'
+  STATUS_DONE = 'done'
+  STATUS_FAILED = 'failed'
+  STATUS_CHOICES = [
+    (STATUS_PENDING, 'Pendente'),
+    (STATUS_RUNNING, 'Em execução'),
+    (STATUS_DONE, 'Concluído'),
+    (STATUS_FAILED, 'Falhou'),
+  ]
+
+  course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='duration_jobs')
+  video_id = models.CharField(max_length=64)
+  url = models.CharField(max_length=2048)
+  status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+  attempts = models.PositiveSmallIntegerField(default=0)
+  last_error = models.TextField(blank=True)
+  available_at = models.DateTimeField(default=timezone.now)
+  created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    # Índice usado pelo worker para buscar a próxima leva de jobs
+    indexes = [
+      models.Index(fields=['status', 'available_at'], name='duration_job_queue_idx')
+    ]
+
+
+class ArchivedCourseQuerySet(models.QuerySet):
+  def restore(self):
+    # Devolve os cursos (com os vídeos) à tabela quente, já sem a exclusão
+    # lógica, e reenfileira as durações que estavam pendentes
+    with transaction.atomic():
+      archived = list(self)
+      # Mesma regra de unique_title_if_not_deleted, com um erro claro em vez do IntegrityError
+      titles = Counter(item.title for item in archived)
+      taken = {title for title, count in titles.items() if count > 1}
+      taken.update(Course.objects.filter(title__in=titles).values_list('title', flat=True))
+      if taken:
+        raise DuplicateTitle(f'Já existe um curso ativo com o título: {", ".join(sorted(taken))}.')
+      courses = Course.objects.bulk_create([item.to_course() for item in archived])
+      # auto_now_add sobrescreve created_at no INSERT; a data original volta aqui
+      for course, item in zip(courses, archived):
+        course.created_at = item.created_at
+      Course.objects.bulk_update(courses, ['created_at'])
+      videos = Video.objects.bulk_create([video for item in archived for video in item.to_videos()])
+      VideoDurationJob.objects.bulk_create([
+        VideoDurationJob(course_id=video.course_id, video_id=video.uid, url=video.url) for video in videos if video.duration is None
+      ])
+      ArchivedCourse.objects.filter(pk__in=[item.pk for item in archived]).delete()
+
+    invalidate_courses([course.pk for course in courses])
+    return courses
+
+
+class ArchivedCourse(models.Model):
+  # Cursos encerrados ou excluídos há muito tempo, fora da tabela quente
+  # (manage.py archive_courses). Mantém o id do curso; os vídeos vão junto em video_urls
+  id = models.BigIntegerField(primary_key=True)
+  title = models.CharField(max_length=255)
+  description = models.TextField()
+  ends_at = models.DateTimeField()
+  deleted_at = models.DateTimeField(null=True, blank=True)
+  created_at = models.DateTimeField()
+  updated_at = models.DateTimeField()
+  total_duration_seconds = models.PositiveIntegerField(default=0)
+  version = models.PositiveIntegerField(default=1)
+  video_count = models.PositiveIntegerField(default=0)
+  video_urls = models.JSONField(default=list)
+  archived_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+  objects = ArchivedCourseQuerySet.as_manager()
+
+  COURSE_FIELDS = ('id', 'title', 'description', 'ends_at', 'deleted_at', 'created_at', 'updated_at', 'total_duration_seconds', 'version')
+  VIDEO_FIELDS = ('uid', 'title', 'url', 'duration', 'position')
+
+  @classmethod
+  def from_course(cls, course):
+    videos = list(course.videos.all())
+    return cls(
+      **{field: getattr(course, field) for field in cls.COURSE_FIELDS},
+      video_count=len(videos),
+      video_urls=[{field: getattr(video, field) for field in cls.VIDEO_FIELDS} for video in videos]
+    )
+
+  def to_course(self):
+    course = Course(**{field: getattr(self, field) for field in self.COURSE_FIELDS})
+    course.deleted_at = None
+    course.version += 1
+    return course
+
+  def to_videos(self):
+    return [Video(course_id=self.pk, **{field: video[field] for field in self.VIDEO_FIELDS}) for video in self.video_urls]
+
+  def restore(self):
+    return ArchivedCourse.objects.filter(pk=self.pk).restore()[0]
+
+
+class VideoDurationCache(models.Model):
+  # duration nulo = página sem itemprop=duration (cache negativo)
+  video_id = models.CharField(max_length=11, primary_key=True)
+  duration = models.CharField(max_length=32, null=True, blank=True)
+  fetched_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+
+class CourseStats(models.Model):
+  # Resumo do catálogo numa única linha (pk=1), recalculado por
+  # manage.py refresh_course_stats; GET /api/courses/stats/ só lê esta linha
+  active_courses = models.PositiveIntegerField(default=0)
+  expired_courses = models.PositiveIntegerField(default=0)
+  deleted_courses = models.PositiveIntegerField(default=0)
+  archived_courses = models.PositiveIntegerField(default=0)
+  total_videos = models.PositiveIntegerField(default=0)
+  # Média entre os cursos do catálogo (não excluídos, inclusive arquivados)
+  videos_per_course = models.FloatField(default=0)
+  total_duration_seconds = models.PositiveBigIntegerField(default=0)
+  refreshed_at = models.DateTimeField(default=timezone.now)
+
+  @property
+  def total_duration(self):
+    return format_duration(self.total_duration_seconds)
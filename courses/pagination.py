@@ -0,0 +1,66 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+import base64
+import binascii
+
+
+class CourseCursorPagination(BasePagination):
+  # Paginação por chave (created_at, id): cada página é um range scan no
+  # índice, sem COUNT(*) e sem OFFSET crescente
+  cursor_query_param = 'cursor'
+  invalid_cursor_message = 'Cursor inválido.'
+
+  def __init__(self):
+    self.page_size = api_settings.PAGE_SIZE
+    self.next_position = None
+
+  def paginate_queryset(self, queryset, request, view=None):
+    self.request = request
+    position = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+
+    if position is not None:
+      created_at, pk = position
+      queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+
+    results = list(queryset.order_by('created_at', 'id')[:self.page_size + 1])
+    page = results[:self.page_size]
+
+    if len(results) > self.page_size:
+      self.next_position = (page[-1].created_at, page[-1].id)
+    return page
+
+  def get_paginated_response(self, data):
+    return Response({
+      'next': self.get_next_link(),
+      'results': data,
+    })
+
+  def get_next_link(self):
+    if self.next_position is None:
+      return None
+    url = self.request.build_absolute_uri()
+    return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+  def encode_cursor(self, position):
+    created_at, pk = position
+    return base64.urlsafe_b64encode(f'{created_at.isoformat()}|{pk}'.encode()).decode()
+
+  def decode_cursor(self, encoded):
+    if not encoded:
+      return None
+
+    try:
+      created_at, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split('|')
+      created_at = parse_datetime(created_at)
+      pk = int(pk)
+    except (TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+      raise NotFound(self.invalid_cursor_message)
+
+    if created_at is None:
+      raise NotFound(self.invalid_cursor_message)
+    return created_at, pk
@@ -0,0 +1,18 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import orjson
+
+
+class FastJSONParser(JSONParser):
+  # O orjson só lê UTF-8; outros encodings (raros) seguem pelo parser do DRF
+  def parse(self, stream, media_type=None, parser_context=None):
+    encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+    if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+      return super().parse(stream, media_type, parser_context)
+
+    try:
+      return orjson.loads(stream.read())
+    except orjson.JSONDecodeError as exc:
+      raise ParseError(f'JSON parse error - {exc}')
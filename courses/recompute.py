@@ -0,0 +1,76 @@
+from django.db import connections
+from django.db.models import F, OuterRef, PositiveIntegerField, Subquery, Sum
+from django.db.models.functions import Coalesce
+from functools import partial
+import django
+import multiprocessing
+
+from .cache import invalidate_courses
+from .models import Course, Video
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def course_id_chunks(batch_size=DEFAULT_BATCH_SIZE):
+  # Paginação por chave (pk > último) em vez de OFFSET, para não reler a tabela a cada lote
+  last_id = 0
+  while True:
+    ids = list(Course.with_deleted.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+    if not ids:
+      return
+    yield ids
+    last_id = ids[-1]
+
+
+def video_total():
+  # Soma feita pelo banco; vídeos pendentes (duração nula) não contam
+  total = (
+    Video.objects.filter(course_id=OuterRef('pk'))
+    .order_by()
+    .values('course_id')
+    .annotate(total=Sum('duration'))
+    .values('total')
+  )
+  return Coalesce(Subquery(total), 0, output_field=PositiveIntegerField())
+
+
+def recompute_chunk(course_ids, dry_run=False):
+  out_of_sync = list(
+    Course.with_deleted.filter(pk__in=course_ids)
+    .annotate(video_total=video_total())
+    .exclude(total_duration_seconds=F('video_total'))
+    .values_list('pk', flat=True)
+  )
+
+  if out_of_sync and not dry_run:
+    # A soma é refeita dentro do próprio UPDATE, então um vídeo alterado entre a
+    # leitura acima e a escrita não se perde, e nenhuma linha fica travada além
+    # do tempo dessa instrução
+    Course.with_deleted.filter(pk__in=out_of_sync).update(total_duration_seconds=video_total(), version=F('version') + 1)
+    invalidate_courses(out_of_sync)
+
+  return len(course_ids), len(out_of_sync)
+
+
+def recompute_durations(batch_size=DEFAULT_BATCH_SIZE, workers=1, dry_run=False):
+  chunks = course_id_chunks(batch_size)
+  recompute = partial(recompute_chunk, dry_run=dry_run)
+
+  if workers <= 1:
+    return _sum_results(map(recompute, chunks))
+
+  # Os processos filhos não podem herdar as conexões abertas pelo pai. Com
+  # spawn (padrão no macOS e no Windows, e usado aqui em todos os sistemas) eles
+  # começam do zero, então cada um configura o Django antes do primeiro lote
+  connections.close_all()
+  with multiprocessing.get_context('spawn').Pool(workers, initializer=django.setup) as pool:
+    return _sum_results(pool.imap_unordered(recompute, chunks))
+
+
+def _sum_results(results):
+  checked = out_of_sync = 0
+  for chunk_checked, chunk_out_of_sync in results:
+    checked += chunk_checked
+    out_of_sync += chunk_out_of_sync
+  return checked, out_of_sync
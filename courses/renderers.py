@@ -0,0 +1,23 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+  import orjson
+except ImportError:  # opcional: sem ele cai no JSONRenderer do DRF
+  orjson = None
+
+
+_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+  # Mesma saída compacta em UTF-8 do JSONRenderer, serializada pelo orjson quando
+  # instalado. Tipos que o orjson não conhece (Decimal, textos lazy...) passam
+  # pelo encoder do DRF
+  def render(self, data, accepted_media_type=None, renderer_context=None):
+    if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+      return super().render(data, accepted_media_type, renderer_context)
+
+    if data is None:
+      return b''
+    return orjson.dumps(data, default=_encoder.default, option=orjson.OPT_NON_STR_KEYS)
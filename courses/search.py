@@ -0,0 +1,55 @@
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+import re
+
+
+COURSE_TABLE = 'courses_course'
+SQLITE_FTS_TABLE = 'courses_course_fts'
+POSTGRES_CONFIG = 'portuguese'
+# Peso do título e da descrição no bm25 (quanto maior, mais relevante)
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+TOKEN_REGEX = re.compile(r'\w+')
+
+# O índice (tabela FTS5 no SQLite, coluna tsvector no PostgreSQL) e os triggers
+# que o mantêm em dia são criados pela migração 0011_course_search
+
+
+def sqlite_match_query(text):
+  # Cada palavra vira um termo entre aspas com busca por prefixo, então a
+  # entrada do usuário nunca é interpretada como sintaxe do FTS5
+  return ' '.join(f'"{token}"*' for token in TOKEN_REGEX.findall(text))
+
+
+def search(queryset, text):
+  # Filtra pelo texto e anota search_rank (menor = mais relevante)
+  if connection.vendor == 'sqlite':
+    match = sqlite_match_query(text)
+    if not match:
+      return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+    # Um único join com a tabela FTS: o MATCH roda uma vez e o bm25 sai da mesma
+    # varredura, em vez de uma subconsulta correlacionada por linha
+    return queryset.extra(
+      select={'search_rank': f'bm25({SQLITE_FTS_TABLE}, %s, %s)'},
+      select_params=[TITLE_WEIGHT, DESCRIPTION_WEIGHT],
+      tables=[SQLITE_FTS_TABLE],
+      where=[f'{SQLITE_FTS_TABLE}.rowid = {COURSE_TABLE}.id', f'{SQLITE_FTS_TABLE} MATCH %s'],
+      params=[match]
+    )
+
+  if connection.vendor == 'postgresql':
+    query = f"websearch_to_tsquery('{POSTGRES_CONFIG}', %s)"
+    return (
+      queryset
+      .annotate(search_match=RawSQL(f'{COURSE_TABLE}.search_vector @@ {query}', [text], output_field=BooleanField()))
+      .filter(search_match=True)
+      .annotate(search_rank=RawSQL(f'-ts_rank_cd({COURSE_TABLE}.search_vector, {query})', [text], output_field=FloatField()))
+    )
+
+  # Outros bancos: sem índice, só filtra
+  return queryset.filter(Q(title__icontains=text) | Q(description__icontains=text)).annotate(
+    search_rank=Value(0.0, output_field=FloatField())
+  )
@@ -1,20 +1,110 @@
 from rest_framework import serializers
+from operator import attrgetter
 
-from .models import Course
+from .models import Course, CourseStats, Video
+from . import metrics
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+  # Soma o tempo de serialização na métrica da requisição atual
+  def to_representation(self, instance):
+    with metrics.timer('serialization'):
+      return super().to_representation(instance)
+
+
+class SparseFieldsMixin:
+  # Recebe os campos já resolvidos de ?fields=/?exclude= (ver select_fields)
+  def __init__(self, *args, fields=None, **kwargs):
+    super().__init__(*args, **kwargs)
+    if fields is not None:
+      for name in set(self.fields) - set(fields):
+        self.fields.pop(name)
+
+
+class CourseSerializer(TimedSerializerMixin, serializers.ModelSerializer):
   class Meta:
     model = Course
     fields = ['id', 'title', 'description', 'ends_at']
 
 
-class CourseRetrieveSerializer(serializers.ModelSerializer):
+class CourseBulkSerializer(CourseSerializer):
+  # A unicidade do título é checada para o lote inteiro em courses.bulk
+  class Meta(CourseSerializer.Meta):
+    extra_kwargs = {'title': {'validators': []}}
+
+
+class VideoBulkSerializer(serializers.ModelSerializer):
+  class Meta:
+    model = Video
+    fields = ['title', 'url']
+
+
+class CourseRetrieveSerializer(SparseFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+  video_urls = serializers.ReadOnlyField()
+  total_duration = serializers.ReadOnlyField()
+
   class Meta:
     model = Course
     fields = ['id', 'title', 'description', 'ends_at', 'video_urls', 'total_duration']
 
 
+class CourseStatsSerializer(serializers.ModelSerializer):
+  total_duration = serializers.ReadOnlyField()
+
+  class Meta:
+    model = CourseStats
+    fields = [
+      'active_courses', 'expired_courses', 'deleted_courses', 'archived_courses',
+      'total_videos', 'videos_per_course', 'total_duration', 'total_duration_seconds', 'refreshed_at'
+    ]
+
+
+# Colunas do Course que cada campo da API precisa carregar (para only())
+FIELD_COLUMNS = {
+  'id': ['id'],
+  'title': ['title'],
+  'description': ['description'],
+  'ends_at': ['ends_at'],
+  'video_urls': [],
+  'total_duration': ['total_duration_seconds'],
+}
+
+_datetime_field = serializers.DateTimeField()
+
+# Listagem: mesmo formato do CourseSerializer, montado direto dos atributos
+LIST_FORMATTERS = {
+  'id': attrgetter('id'),
+  'title': attrgetter('title'),
+  'description': attrgetter('description'),
+  'ends_at': lambda course: _datetime_field.to_representation(course.ends_at),
+}
+
+
+def _split_fields(value):
+  return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def select_fields(params, available):
+  requested = _split_fields(params.get('fields')) or available
+  excluded = _split_fields(params.get('exclude'))
+
+  unknown = sorted((set(requested) | set(excluded)) - set(available))
+  if unknown:
+    raise ValueError(unknown)
+  return [name for name in available if name in requested and name not in excluded]
+
+
+def columns_for(fields):
+  return sorted({'id'} | {column for name in fields for column in FIELD_COLUMNS[name]})
+
+
+def serialize_course_list(courses, fields):
+  # Caminho só de leitura das listagens: sem o to_representation campo a campo do DRF
+  formatters = [(name, LIST_FORMATTERS[name]) for name in fields]
+  with metrics.timer('serialization'):
+    return [{name: format_field(course) for name, format_field in formatters} for course in courses]
+
+
 # class CourseCreateVideoSerializer(serializers.ModelSerializer):
 #   title = serializers.CharField(max_length=255)
 #   url = serializers.URLField()
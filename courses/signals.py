@@ -0,0 +1,24 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_course
+from .db import apply_sqlite_pragmas
+from .metrics import install_sql_wrapper
+from .models import Course, Video
+
+
+connection_created.connect(install_sql_wrapper)
+connection_created.connect(apply_sqlite_pragmas)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_cache(sender, instance, **kwargs):
+  invalidate_course(instance.pk)
+
+
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def invalidate_video_course_cache(sender, instance, **kwargs):
+  invalidate_course(instance.course_id)
@@ -0,0 +1,61 @@
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .cache import get_cache, get_timeout
+from .models import ArchivedCourse, Course, CourseStats, Video
+
+
+STATS_PK = 1
+STATS_CACHE_KEY = 'courses:stats'
+
+
+def compute_stats(now=None):
+  # Três consultas agregadas (cursos, vídeos e arquivo), sem trazer linhas.
+  # Catálogo = cursos não excluídos, estejam na tabela quente ou no arquivo
+  now = now or timezone.now()
+  catalogue = Q(deleted_at__isnull=True)
+  courses = Course.with_deleted.aggregate(
+    active=Count('pk', filter=catalogue & Q(ends_at__gte=now)),
+    expired=Count('pk', filter=catalogue & Q(ends_at__lt=now)),
+    deleted=Count('pk', filter=~catalogue),
+    duration=Sum('total_duration_seconds', filter=catalogue, default=0),
+  )
+  videos = Video.objects.filter(course__deleted_at__isnull=True).count()
+  # Os arquivados já passaram do término: contam como encerrados ou excluídos
+  archived = ArchivedCourse.objects.aggregate(
+    total=Count('pk'),
+    expired=Count('pk', filter=catalogue),
+    duration=Sum('total_duration_seconds', filter=catalogue, default=0),
+    videos=Sum('video_count', filter=catalogue, default=0),
+  )
+
+  catalogue_courses = courses['active'] + courses['expired'] + archived['expired']
+  total_videos = videos + archived['videos']
+  return {
+    'active_courses': courses['active'],
+    'expired_courses': courses['expired'] + archived['expired'],
+    'deleted_courses': courses['deleted'] + archived['total'] - archived['expired'],
+    'archived_courses': archived['total'],
+    'total_videos': total_videos,
+    'videos_per_course': round(total_videos / catalogue_courses, 2) if catalogue_courses else 0,
+    'total_duration_seconds': courses['duration'] + archived['duration'],
+  }
+
+
+def refresh_stats():
+  now = timezone.now()
+  stats, _ = CourseStats.objects.update_or_create(pk=STATS_PK, defaults={**compute_stats(now), 'refreshed_at': now})
+  get_cache().delete(STATS_CACHE_KEY)
+  return stats
+
+
+def get_stats():
+  # Tempo constante: a linha pronta (em cache por COURSES_CACHE_TIMEOUT, já que
+  # o comando roda em outro processo); o cálculo completo só roda aqui se o
+  # comando ainda nunca tiver sido executado
+  cache = get_cache()
+  stats = cache.get(STATS_CACHE_KEY)
+  if stats is None:
+    stats = CourseStats.objects.filter(pk=STATS_PK).first() or refresh_stats()
+    cache.set(STATS_CACHE_KEY, stats, get_timeout())
+  return stats
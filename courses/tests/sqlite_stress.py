@@ -0,0 +1,116 @@
+# Escritas concorrentes de várias threads num SQLite em arquivo (WAL), pelas
+# views reais. Executado em subprocesso por test_sqlite_profile, já que o banco
+# de teste em memória não tem WAL nem busy timeout:
+#
+#   SQLITE_PATH=/tmp/stress.sqlite3 python -m courses.tests.sqlite_stress
+#
+import os
+import sys
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+
+import django
+django.setup()
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+import json
+import threading
+
+from courses.jobs import process_pending_jobs
+from courses.models import Course, Video, VideoDurationJob
+from courses.benchmark_stub import StubYouTubeServer
+
+
+THREADS = int(os.environ.get('STRESS_THREADS', 8))
+ROUNDS = int(os.environ.get('STRESS_ROUNDS', 15))
+
+
+def writer(course_id, thread):
+  client = Client()
+  statuses = []
+  try:
+    for i in range(ROUNDS):
+      response = client.post(reverse('courses-create_video', kwargs={'course_id': course_id}), data={
+        'title': f'Vídeo {thread}-{i}',
+        'url': f'https://www.youtube.com/watch?v=t{thread:02d}r{i:02d}xxxxx',
+      })
+      statuses.append(response.status_code)
+      response = client.post(reverse('courses-create_videos', kwargs={'course_id': course_id}), data=json.dumps([
+        {'title': f'Lote {thread}-{i}', 'url': 'https://example.com/video.mp4'},
+      ]), content_type='application/json')
+      statuses.append(response.status_code)
+      Course.objects.get(pk=course_id).add_duration(1)
+    return statuses
+  finally:
+    connections.close_all()
+
+
+def worker():
+  processed = 0
+  try:
+    for _ in range(ROUNDS * 2):
+      processed += process_pending_jobs(limit=5)
+    return processed
+  finally:
+    connections.close_all()
+
+
+def conditional_writer(course_id, video_id, etag, barrier, thread):
+  # Todos partem da mesma ETag: só um PUT com If-Match pode passar
+  client = Client()
+  try:
+    barrier.wait()
+    response = client.put(
+      reverse('courses-update_video', kwargs={'course_id': course_id, 'video_id': video_id}),
+      data=json.dumps({'title': f'Condicional {thread}', 'url': 'https://example.com/video.mp4'}),
+      content_type='application/json',
+      HTTP_IF_MATCH=etag
+    )
+    return response.status_code
+  finally:
+    connections.close_all()
+
+
+def main():
+  call_command('migrate', verbosity=0)
+  journal_mode = connection.cursor().execute('PRAGMA journal_mode').fetchone()[0]
+  course = Course.objects.create(title='Curso', description='Stress', ends_at=timezone.now() + timezone.timedelta(days=1))
+
+  durations = {f't{thread:02d}r{i:02d}xxxxx': 'PT1S' for thread in range(THREADS) for i in range(ROUNDS)}
+  with StubYouTubeServer(durations) as stub:
+    with override_settings(YOUTUBE_WATCH_URL=stub.watch_url, VIDEO_DURATION_ASYNC=True, VIDEO_DURATION_JOB_RETRY_DELAY=0):
+      with ThreadPoolExecutor(THREADS + 2) as executor:
+        writers = [executor.submit(writer, course.pk, thread) for thread in range(THREADS)]
+        workers = [executor.submit(worker) for _ in range(2)]
+        statuses = [status for future in writers for status in future.result()]
+        for future in workers:
+          future.result()
+      process_pending_jobs(limit=THREADS * ROUNDS)
+
+      video = Video.objects.filter(course=course, url='https://example.com/video.mp4').first()
+      etag = Client().get(reverse('courses-detail', kwargs={'pk': course.pk}))['ETag']
+      barrier = threading.Barrier(THREADS)
+      with ThreadPoolExecutor(THREADS) as executor:
+        conditional = list(executor.map(lambda thread: conditional_writer(course.pk, video.uid, etag, barrier, thread), range(THREADS)))
+
+  course.refresh_from_db()
+  positions = Video.objects.filter(course=course).values_list('position', flat=True)
+  print(json.dumps({
+    'journal_mode': journal_mode,
+    'statuses': sorted(set(statuses)),
+    'videos': len(positions),
+    'unique_positions': len(set(positions)),
+    'if_match_statuses': dict(Counter(conditional)),
+    'pending_jobs': VideoDurationJob.objects.exclude(status=VideoDurationJob.STATUS_DONE).count(),
+    'total_duration_seconds': course.total_duration_seconds,
+  }))
+
+
+if __name__ == '__main__':
+  sys.exit(main())
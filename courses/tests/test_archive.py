@@ -0,0 +1,136 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from io import StringIO
+from unittest.mock import patch
+import csv
+import json
+
+from courses import archive, csv_format, search
+from courses import cache as response_cache
+from courses.models import ArchivedCourse, Course, DuplicateTitle, Video, VideoDurationJob
+
+
+@override_settings(COURSES_ARCHIVE_AFTER_DAYS=30)
+class ArchiveCoursesTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    now = timezone.now()
+    self.active = Course.objects.create(title="Python ativo", description="Descrição", ends_at=now + timezone.timedelta(days=30))
+    self.recently_expired = Course.objects.create(title="Python recente", description="Descrição", ends_at=now - timezone.timedelta(days=5))
+    self.expired = Course.objects.create(title="Python encerrado", description="Descrição", ends_at=now - timezone.timedelta(days=60), total_duration_seconds=300)
+    Video.objects.create(course=self.expired, uid="abc", title="Vídeo 1", url="https://example.com/1", duration=300, position=0)
+    Video.objects.create(course=self.expired, uid="def", title="Vídeo 2", url="https://www.youtube.com/watch?v=dQw4w9WgXcQ", duration=None, position=1)
+    VideoDurationJob.objects.create(course=self.expired, video_id="def", url="https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+
+    self.deleted = Course.objects.create(title="Python excluído", description="Descrição", ends_at=now + timezone.timedelta(days=30))
+    self.deleted.delete()
+    Course.with_deleted.filter(pk=self.deleted.pk).update(deleted_at=now - timezone.timedelta(days=45))
+
+  def _call(self, *args):
+    out = StringIO()
+    call_command('archive_courses', *args, stdout=out)
+    return out.getvalue()
+
+  def test_dry_run_only_counts(self):
+    output = self._call('--dry-run')
+
+    self.assertIn('2 curso(s) seriam arquivado(s)', output)
+    self.assertEqual(ArchivedCourse.objects.count(), 0)
+
+  def test_moves_expired_and_deleted_courses_with_videos(self):
+    output = self._call('--batch-size', '1')
+
+    self.assertIn('2 curso(s) arquivado(s)', output)
+    self.assertEqual(set(Course.with_deleted.values_list('pk', flat=True)), {self.active.pk, self.recently_expired.pk})
+    self.assertFalse(Video.objects.filter(course_id=self.expired.pk).exists())
+    self.assertFalse(VideoDurationJob.objects.exists())
+
+    archived = ArchivedCourse.objects.get(pk=self.expired.pk)
+    self.assertEqual(archived.video_count, 2)
+    self.assertEqual(archived.total_duration_seconds, 300)
+    self.assertEqual([video['uid'] for video in archived.video_urls], ['abc', 'def'])
+    self.assertIsNotNone(ArchivedCourse.objects.get(pk=self.deleted.pk).deleted_at)
+
+  def test_chunk_deletes_without_loading_videos(self):
+    Video.objects.bulk_create([
+      Video(course=self.expired, uid=f"v{i}", title=f"Vídeo {i}", url=f"https://example.com/v{i}", duration=1, position=i + 2)
+      for i in range(50)
+    ])
+    self.client.get(reverse('courses-detail', kwargs={'pk': self.expired.pk}))
+    self.assertIsNotNone(cache.get(response_cache.detail_key(self.expired.pk)))
+
+    with patch('courses.signals.invalidate_course') as per_row, patch('courses.archive.invalidate_courses', wraps=archive.invalidate_courses) as invalidate:
+      with self.captureOnCommitCallbacks(execute=True) as callbacks:
+        with self.assertNumQueries(8):
+          archive.archive_chunk([self.expired.pk, self.deleted.pk], archive.default_cutoff())
+        invalidate.assert_not_called()
+
+    self.assertEqual(len(callbacks), 1)
+    per_row.assert_not_called()
+    invalidate.assert_called_once()
+    self.assertEqual(sorted(invalidate.call_args.args[0]), sorted([self.expired.pk, self.deleted.pk]))
+    self.assertEqual(Video.objects.filter(course_id=self.expired.pk).count(), 0)
+    self.assertEqual(ArchivedCourse.objects.get(pk=self.expired.pk).video_count, 52)
+    self.assertIsNone(cache.get(response_cache.detail_key(self.expired.pk)))
+
+  def test_archived_courses_leave_the_search_index(self):
+    self._call()
+
+    found = search.search(Course.with_deleted.all(), 'python')
+    self.assertEqual(set(found.values_list('pk', flat=True)), {self.active.pk, self.recently_expired.pk})
+
+  def test_export_reads_both_tables(self):
+    self._call()
+    request = self.client.get(reverse('courses-export'))
+
+    rows = list(csv.reader(b''.join(request.streaming_content).decode().splitlines(), delimiter=csv_format.DELIMITER))
+    self.assertEqual(rows[0], csv_format.HEADERS)
+    self.assertEqual([int(row[0]) for row in rows[1:]], sorted([self.active.pk, self.recently_expired.pk, self.expired.pk, self.deleted.pk]))
+    expired_row = next(row for row in rows[1:] if int(row[0]) == self.expired.pk)
+    active_row = next(row for row in rows[1:] if int(row[0]) == self.active.pk)
+    self.assertEqual(len(expired_row[3]), len(active_row[3]))
+    self.assertEqual(expired_row[7:], ['2', '0:5:0'])
+
+  def test_restore_pulls_rows_back(self):
+    created_at = self.expired.created_at
+    self._call()
+
+    course = ArchivedCourse.objects.get(pk=self.expired.pk).restore()
+
+    self.assertFalse(ArchivedCourse.objects.filter(pk=self.expired.pk).exists())
+    self.assertEqual(course.created_at, Course.objects.get(pk=self.expired.pk).created_at)
+    self.assertEqual(Course.objects.get(pk=self.expired.pk).created_at, created_at)
+    self.assertEqual(list(Video.objects.filter(course=course).values_list('uid', 'position', 'duration')), [('abc', 0, 300), ('def', 1, None)])
+    # A duração pendente volta para a fila do worker
+    self.assertEqual(list(VideoDurationJob.objects.values_list('course_id', 'video_id')), [(course.pk, 'def')])
+    self.assertIn(course.pk, search.search(Course.objects.all(), 'encerrado').values_list('pk', flat=True))
+
+  def test_restore_refuses_a_taken_title(self):
+    self._call()
+    Course.objects.create(title="Python encerrado", description="Outro", ends_at=timezone.now())
+
+    with self.assertRaisesMessage(DuplicateTitle, 'Python encerrado'):
+      ArchivedCourse.objects.get(pk=self.expired.pk).restore()
+
+    self.assertTrue(ArchivedCourse.objects.filter(pk=self.expired.pk).exists())
+    self.assertFalse(Video.objects.filter(course_id=self.expired.pk).exists())
+
+  def test_bulk_restore_includes_archived_courses(self):
+    self._call()
+    Course.objects.create(title="Python encerrado", description="Outro", ends_at=timezone.now())
+
+    request = self.client.post(
+      reverse('courses-bulk_restore'),
+      data=json.dumps({'ids': [self.expired.pk, self.deleted.pk, 0]}),
+      content_type='application/json'
+    )
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.data['restored'], [self.deleted.pk])
+    self.assertEqual(sorted(error['id'] for error in request.data['errors']), [0, self.expired.pk])
+    self.assertIsNone(Course.objects.get(pk=self.deleted.pk).deleted_at)
+    self.assertTrue(ArchivedCourse.objects.filter(pk=self.expired.pk).exists())
@@ -0,0 +1,121 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+import json
+
+from courses.models import Course, Video
+from courses.benchmark_stub import StubYouTubeServer
+from courses import duration_cache, http
+
+
+class AsyncCourseViewTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    duration_cache.clear()
+    http.reset()
+    self.course = Course.objects.create(title="Curso 1", description="Descrição do curso 1", ends_at=timezone.now() + timezone.timedelta(days=30), total_duration_seconds=270)
+    self.video = Video.objects.create(course=self.course, uid="QH2-TGUlwu4", url="https://www.youtube.com/watch?v=QH2-TGUlwu4", title="Trailer", duration=270)
+
+  async def test_list_matches_sync_endpoint(self):
+    request = await self.async_client.get(reverse('async-courses-list'))
+    sync_request = await sync_to_async(self.client.get)(reverse('courses-list'))
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.json()['count'], 1)
+    self.assertEqual(request.json()['results'], json.loads(sync_request.content)['results'])
+
+  async def test_retrieve(self):
+    request = await self.async_client.get(reverse('async-courses-detail', kwargs={'pk': self.course.id}))
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.json()['title'], 'Curso 1')
+    self.assertEqual(request.json()['total_duration'], '0:4:30')
+
+    not_modified = await self.async_client.get(reverse('async-courses-detail', kwargs={'pk': self.course.id}), headers={'If-None-Match': request['ETag']})
+    self.assertEqual(not_modified.status_code, 304)
+
+  async def test_retrieve_sparse_fields(self):
+    request = await self.async_client.get(reverse('async-courses-detail', kwargs={'pk': self.course.id}), {'fields': 'id,title'})
+    invalid = await self.async_client.get(reverse('async-courses-detail', kwargs={'pk': self.course.id}), {'fields': 'nope'})
+
+    self.assertEqual(request.json(), {'id': self.course.id, 'title': 'Curso 1'})
+    self.assertEqual(invalid.status_code, 400)
+
+  async def test_retrieve_not_found(self):
+    request = await self.async_client.get(reverse('async-courses-detail', kwargs={'pk': 0}))
+
+    self.assertEqual(request.status_code, 404)
+
+  @override_settings(VIDEO_DURATION_ASYNC=False)
+  async def test_create_video_resolves_duration_with_async_client(self):
+    with StubYouTubeServer({'dQw4w9WgXcQ': 'PT1H30M10S'}) as stub:
+      with override_settings(YOUTUBE_WATCH_URL=stub.watch_url):
+        request = await self.async_client.post(
+          reverse('async-courses-create_video', kwargs={'course_id': self.course.id}),
+          data={'title': 'Vídeo 1', 'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'},
+          content_type='application/json'
+        )
+
+    self.assertEqual(request.status_code, 201)
+    self.assertEqual(stub.requests, ['dQw4w9WgXcQ'])
+    self.assertEqual(request.json()['video_urls'][1]['duration'], '1:30:10')
+    self.assertEqual(request.json()['total_duration'], '1:34:40')
+
+  async def test_create_video_without_url(self):
+    request = await self.async_client.post(reverse('async-courses-create_video', kwargs={'course_id': self.course.id}), data={'title': 'Vídeo 1'})
+
+    self.assertEqual(request.status_code, 400)
+
+  async def test_update_and_destroy_video(self):
+    request = await self.async_client.put(
+      reverse('async-courses-update_video', kwargs={'course_id': self.course.id, 'video_id': self.video.uid}),
+      data={'title': 'Atualizado', 'url': 'https://www.youtube.com/watch?v=123456789'},
+      content_type='application/json'
+    )
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.json()['video_urls'][0]['title'], 'Atualizado')
+    self.assertEqual(request.json()['total_duration'], '0:0:0')
+
+    request = await self.async_client.delete(reverse('async-courses-destroy_video', kwargs={'course_id': self.course.id, 'video_id': self.video.uid}))
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.json()['video_urls'], [])
+    self.assertEqual(await Video.objects.acount(), 0)
+
+  async def test_destroy_video_with_invalid_video_id(self):
+    request = await self.async_client.delete(reverse('async-courses-destroy_video', kwargs={'course_id': self.course.id, 'video_id': '0'}))
+
+    self.assertEqual(request.status_code, 404)
+
+  async def _create_youtube_video(self, stub):
+    with override_settings(YOUTUBE_WATCH_URL=stub.watch_url):
+      return await self.async_client.post(
+        reverse('async-courses-create_video', kwargs={'course_id': self.course.id}),
+        data={'title': 'Vídeo 1', 'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'},
+        content_type='application/json'
+      )
+
+  @override_settings(VIDEO_DURATION_ASYNC=False, YOUTUBE_HTTP_BACKOFF=0)
+  async def test_async_client_retries_like_the_sync_session(self):
+    with StubYouTubeServer({'dQw4w9WgXcQ': 'PT2M'}, fail_first=1) as stub:
+      request = await self._create_youtube_video(stub)
+
+    self.assertEqual(stub.requests, ['dQw4w9WgXcQ', 'dQw4w9WgXcQ'])
+    self.assertEqual(request.json()['video_urls'][1]['duration'], '0:02:00')
+    self.assertFalse(http.breaker.is_open)
+
+  @override_settings(VIDEO_DURATION_ASYNC=False, YOUTUBE_HTTP_BACKOFF=0, YOUTUBE_HTTP_RETRIES=0, YOUTUBE_HTTP_BREAKER_THRESHOLD=1)
+  async def test_async_client_respects_the_circuit_breaker(self):
+    with StubYouTubeServer({'dQw4w9WgXcQ': 'PT2M'}, fail_first=10) as stub:
+      failed = await self._create_youtube_video(stub)
+      await sync_to_async(duration_cache.clear)()
+      skipped = await self._create_youtube_video(stub)
+
+    # A primeira falha abre o circuito; a segunda requisição nem chega ao YouTube
+    self.assertEqual(stub.requests, ['dQw4w9WgXcQ'])
+    self.assertEqual((failed.status_code, skipped.status_code), (201, 201))
+    self.assertEqual(skipped.json()['video_urls'][2]['duration'], '0:0:0')
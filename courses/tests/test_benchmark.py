@@ -0,0 +1,37 @@
+from django.test import TestCase
+
+from courses.benchmark import ENDPOINTS, run_benchmark
+from courses.models import Course, Video
+
+
+class BenchmarkTestCase(TestCase):
+
+  def test_run_benchmark_reports_every_endpoint(self):
+    report = run_benchmark(courses=15, videos=2, requests_per_endpoint=3)
+
+    self.assertEqual(Course.objects.count(), 15)
+    self.assertEqual(Video.objects.count(), 30 + 3)
+    self.assertEqual(set(report['results']), set(ENDPOINTS))
+    for result in report['results'].values():
+      self.assertEqual(result['requests'], 3)
+      self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+      self.assertGreater(result['queries_per_request'], 0)
+    self.assertGreater(report['results']['create_video']['http_ms_per_request'], 0)
+    self.assertGreater(report['peak_rss_kb'], 0)
+
+  def test_run_benchmark_reports_transferred_bytes(self):
+    plain = run_benchmark(courses=15, videos=20, requests_per_endpoint=2, endpoints=['retrieve'])
+    Course.objects.all().delete()
+    with self.settings(COMPRESSION_MIN_SIZE=200):
+      compressed = run_benchmark(courses=15, videos=20, requests_per_endpoint=2, endpoints=['retrieve'], accept_encoding='gzip')
+
+    self.assertEqual(compressed['config']['accept_encoding'], 'gzip')
+    self.assertLess(compressed['results']['retrieve']['bytes_per_response'], plain['results']['retrieve']['bytes_per_response'])
+
+  def test_run_benchmark_over_asgi(self):
+    report = run_benchmark(courses=15, videos=2, requests_per_endpoint=2, transport='asgi')
+
+    self.assertEqual(report['config']['transport'], 'asgi')
+    self.assertEqual(set(report['results']), set(ENDPOINTS))
+    self.assertEqual(Video.objects.count(), 30 + 2)
+    self.assertGreater(report['results']['create_video']['http_ms_per_request'], 0)
@@ -0,0 +1,112 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse_lazy
+from django.utils import timezone
+from unittest.mock import patch
+import json
+
+from courses.models import Course
+
+
+class BulkCourseTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    self.ends_at = (timezone.now() + timezone.timedelta(days=30)).isoformat()
+    self.course1 = Course.objects.create(title="Curso 1", description="Descrição do curso 1", ends_at=self.ends_at)
+    self.course2 = Course.objects.create(title="Curso 2", description="Descrição do curso 2", ends_at=self.ends_at)
+
+  def _send(self, method, url, data):
+    return getattr(self.client, method)(url, data=json.dumps(data), content_type='application/json')
+
+  def test_bulk_create(self):
+    request = self._send('post', reverse_lazy('courses-bulk'), [
+      {'title': 'Curso 3', 'description': 'Descrição', 'ends_at': self.ends_at},
+      {'title': 'Curso 4', 'description': 'Descrição', 'ends_at': self.ends_at},
+    ])
+
+    self.assertEqual(request.status_code, 201)
+    self.assertEqual(len(request.data.get('created')), 2)
+    self.assertEqual(request.data.get('errors'), [])
+    self.assertEqual(Course.objects.count(), 4)
+
+  def test_bulk_create_reports_errors_per_item(self):
+    with self.assertNumQueries(4):
+      request = self._send('post', reverse_lazy('courses-bulk'), [
+        {'title': 'Curso 3', 'description': 'Descrição', 'ends_at': self.ends_at},
+        {'title': 'Curso 1', 'description': 'Descrição', 'ends_at': self.ends_at},
+        {'title': 'Curso 3', 'description': 'Descrição', 'ends_at': self.ends_at},
+        {'description': 'Descrição', 'ends_at': self.ends_at},
+      ])
+
+    self.assertEqual(request.status_code, 201)
+    self.assertEqual([c['title'] for c in request.data.get('created')], ['Curso 3'])
+    self.assertEqual([e['index'] for e in request.data.get('errors')], [1, 2, 3])
+    self.assertIn('title', request.data.get('errors')[2]['errors'])
+    self.assertEqual(Course.objects.count(), 3)
+
+  def test_bulk_create_rejects_non_list(self):
+    request = self._send('post', reverse_lazy('courses-bulk'), {'title': 'Curso 3'})
+
+    self.assertEqual(request.status_code, 400)
+
+  def test_bulk_create_title_taken_after_check(self):
+    # Simula outro escritor inserindo "Curso 1" depois da checagem de títulos
+    with patch('courses.bulk.title_holders', return_value={}):
+      request = self._send('post', reverse_lazy('courses-bulk'), [
+        {'title': 'Curso 1', 'description': 'Descrição', 'ends_at': self.ends_at},
+        {'title': 'Curso 3', 'description': 'Descrição', 'ends_at': self.ends_at},
+      ])
+
+    self.assertEqual(request.status_code, 201)
+    self.assertEqual([c['title'] for c in request.data.get('created')], ['Curso 3'])
+    self.assertEqual(request.data.get('errors'), [{'index': 0, 'errors': {'title': ['Já existe um curso ativo com este título.']}}])
+    self.assertEqual(Course.objects.count(), 3)
+
+  def test_bulk_update(self):
+    request = self._send('patch', reverse_lazy('courses-bulk'), [
+      {'id': self.course1.id, 'title': 'Curso 1 - Atualizado'},
+      {'id': self.course2.id, 'description': 'Nova descrição'},
+      {'id': 0, 'title': 'Inexistente'},
+      {'id': self.course2.id, 'title': 'Curso 1'},
+    ])
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(len(request.data.get('updated')), 2)
+    self.assertEqual([e['index'] for e in request.data.get('errors')], [2, 3])
+    self.assertEqual(Course.objects.get(pk=self.course1.id).title, 'Curso 1 - Atualizado')
+    self.assertEqual(Course.objects.get(pk=self.course2.id).description, 'Nova descrição')
+
+  def test_bulk_update_title_swap_is_rejected(self):
+    # Limitação conhecida: os títulos são comparados com o estado atual, não com o final do lote
+    request = self._send('patch', reverse_lazy('courses-bulk'), [
+      {'id': self.course1.id, 'title': 'Curso 2'},
+      {'id': self.course2.id, 'title': 'Curso 1'},
+    ])
+
+    self.assertEqual(request.status_code, 400)
+    self.assertEqual([e['index'] for e in request.data.get('errors')], [0, 1])
+    self.assertEqual(Course.objects.get(pk=self.course1.id).title, 'Curso 1')
+
+  def test_bulk_destroy_and_restore(self):
+    with self.assertNumQueries(2):
+      request = self._send('delete', reverse_lazy('courses-bulk'), {'ids': [self.course1.id, self.course2.id, 0]})
+
+    self.assertEqual(request.data.get('deleted'), [self.course1.id, self.course2.id])
+    self.assertEqual(request.data.get('errors')[0]['id'], 0)
+    self.assertEqual(Course.objects.count(), 0)
+
+    Course.objects.create(title="Curso 1", description="Outro curso 1", ends_at=self.ends_at)
+    request = self._send('post', reverse_lazy('courses-bulk_restore'), {'ids': [self.course1.id, self.course2.id]})
+
+    self.assertEqual(request.data.get('restored'), [self.course2.id])
+    self.assertEqual(request.data.get('errors'), [{'id': self.course1.id, 'errors': ['Já existe um curso ativo com este título.']}])
+    self.assertTrue(Course.objects.filter(pk=self.course2.id).exists())
+
+  def test_bulk_destroy_and_restore_reject_list_body(self):
+    destroy = self._send('delete', reverse_lazy('courses-bulk'), [self.course1.id])
+    restore = self._send('post', reverse_lazy('courses-bulk_restore'), [self.course1.id])
+
+    self.assertEqual(destroy.status_code, 400)
+    self.assertEqual(restore.status_code, 400)
+    self.assertEqual(Course.objects.count(), 2)
@@ -0,0 +1,91 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse_lazy
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from unittest import skipIf
+from unittest.mock import patch
+from decimal import Decimal
+import gzip
+import json
+
+from courses.middleware import accepted_encodings, brotli
+from courses.models import Course
+from courses.renderers import FastJSONRenderer, orjson
+
+
+class FastJSONTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    self.data = {'id': 1, 'title': 'Introdução', 'tags': ['a', 'b'], 'price': Decimal('9.90'), 'nested': {1: None}}
+
+  def test_renderer_matches_drf_output(self):
+    self.assertEqual(json.loads(FastJSONRenderer().render(self.data)), json.loads(JSONRenderer().render(self.data)))
+
+  def test_renderer_falls_back_without_orjson(self):
+    with patch('courses.renderers.orjson', None):
+      self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+  def test_indent_is_rendered_by_drf(self):
+    rendered = FastJSONRenderer().render(self.data, 'application/json; indent=2')
+    self.assertEqual(rendered, JSONRenderer().render(self.data, 'application/json; indent=2'))
+
+  def test_parser_accepts_json_and_rejects_invalid_body(self):
+    url = reverse_lazy('courses-list')
+    ends_at = (timezone.now() + timezone.timedelta(days=1)).isoformat()
+
+    request = self.client.post(url, data=json.dumps({'title': 'Curso 1', 'description': 'Descrição', 'ends_at': ends_at}), content_type='application/json')
+    self.assertEqual(request.status_code, 201)
+
+    request = self.client.post(url, data='{"title": ', content_type='application/json')
+    self.assertEqual(request.status_code, 400)
+
+  @skipIf(orjson is None, 'orjson não instalado')
+  def test_renderer_uses_orjson(self):
+    self.assertEqual(FastJSONRenderer().render({'title': 'Introdução'}), '{"title":"Introdução"}'.encode())
+
+
+@override_settings(COMPRESSION_MIN_SIZE=200)
+class CompressionTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    ends_at = timezone.now() + timezone.timedelta(days=30)
+    Course.objects.bulk_create([Course(title=f'Curso {i}', description='Descrição ' * 20, ends_at=ends_at) for i in range(12)])
+    self.url = reverse_lazy('courses-list')
+
+  def test_accepted_encodings(self):
+    self.assertEqual(accepted_encodings('gzip, br;q=0.8, identity;q=0'), {'gzip': 1.0, 'br': 0.8, 'identity': 0.0})
+
+  def test_gzip_when_accepted(self):
+    plain = self.client.get(self.url)
+    compressed = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+
+    self.assertEqual(compressed['Content-Encoding'], 'gzip')
+    self.assertIn('Accept-Encoding', compressed['Vary'])
+    self.assertLess(len(compressed.content), len(plain.content))
+    self.assertEqual(gzip.decompress(compressed.content), plain.content)
+
+  def test_not_compressed_when_refused_or_small(self):
+    refused = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+    self.assertFalse(refused.has_header('Content-Encoding'))
+
+    with self.settings(COMPRESSION_MIN_SIZE=1024 * 1024):
+      small = self.client.get(self.url, {'page': 1, 'fields': 'id'}, HTTP_ACCEPT_ENCODING='gzip')
+    self.assertFalse(small.has_header('Content-Encoding'))
+
+  def test_weak_etag_still_validates(self):
+    compressed = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+    self.assertTrue(compressed['ETag'].startswith('W/'))
+
+    request = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag'])
+    self.assertEqual(request.status_code, 304)
+
+  @skipIf(brotli is None, 'brotli não instalado')
+  def test_brotli_when_preferred(self):
+    plain = self.client.get(self.url)
+    compressed = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0.5, br')
+
+    self.assertEqual(compressed['Content-Encoding'], 'br')
+    self.assertEqual(brotli.decompress(compressed.content), plain.content)
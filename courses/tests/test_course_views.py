@@ -1,35 +1,29 @@
 from django.utils import timezone
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse_lazy
 from unittest.mock import patch, Mock
 import json
+import csv
 
-from courses.models import Course
-from courses.views import CourseViewSet
+from courses.models import Course, Video
+from courses.youtube import resolve_video_duration
+from courses import duration_cache
 
 class CourseViewTestCase(TestCase):
 
   def setUp(self):
+    cache.clear()
+    duration_cache.clear()
     self.course1 = Course.objects.create(title="Curso 1", description="Descrição do curso 1", ends_at=timezone.now() + timezone.timedelta(days=30))
     self.course2 = Course.objects.create(
       title="Curso 2",
-      description="Descrição do curso 2",
+      description="Descrição do curso 2",
       ends_at=timezone.now() + timezone.timedelta(days=20),
-      video_urls=[
-        {
-          "id": "QH2-TGUlwu4",
-          "url": "https://www.youtube.com/watch?v=QH2-TGUlwu4",
-          "title": "Trailer do curso 2",
-          "duration": "0:4:30"
-        },
-        {
-          "id": "QH2-1d3fau4",
-          "url": "https://www.youtube.com/watch?v=QH2-TGUlwu4",
-          "title": "Trailer do curso 2 pt2",
-          "duration": "1:40:30"
-        }
-      ]
+      total_duration_seconds=6300
     )
+    Video.objects.create(course=self.course2, uid="QH2-TGUlwu4", url="https://www.youtube.com/watch?v=QH2-TGUlwu4", title="Trailer do curso 2", duration=270, position=0)
+    Video.objects.create(course=self.course2, uid="QH2-1d3fau4", url="https://www.youtube.com/watch?v=QH2-TGUlwu4", title="Trailer do curso 2 pt2", duration=6030, position=1)
     self.course3 = Course.objects.create(title="Curso 3", description="Descrição do curso 3", ends_at=timezone.now() + timezone.timedelta(days=10))
     self.course4 = Course.objects.create(title="Curso 4", description="Descrição do curso 4", ends_at=timezone.now() - timezone.timedelta(days=10))
 
@@ -40,6 +34,54 @@ class CourseViewTestCase(TestCase):
     self.assertEqual(len(request.data.get('results')), 3)
     self.assertEqual(Course.objects.count(), 4)
 
+  def test_list_courses_filtered_by_duration(self):
+    self.course3.add_duration(600)
+
+    short = self.client.get(reverse_lazy('courses-list'), {'min_duration': 1, 'max_duration': '0:30:0'})
+    long = self.client.get(reverse_lazy('courses-list'), {'min_duration': 3600})
+
+    self.assertEqual([c['id'] for c in short.data.get('results')], [self.course3.id])
+    self.assertEqual([c['id'] for c in long.data.get('results')], [self.course2.id])
+
+  def test_list_courses_with_invalid_duration_filter(self):
+    request = self.client.get(reverse_lazy('courses-list'), {'min_duration': 'abc'})
+
+    self.assertEqual(request.status_code, 400)
+
+  def test_list_courses_with_oversized_duration_filter(self):
+    for value in ('99999999999999999999999', str(2 ** 63), '999999999999:0:0'):
+      request = self.client.get(reverse_lazy('courses-list'), {'min_duration': value})
+      self.assertEqual(request.status_code, 400, value)
+
+    request = self.client.get(reverse_lazy('courses-list'), {'max_duration': str(2 ** 63 - 1)})
+    self.assertEqual(request.status_code, 200)
+
+  def test_list_courses_ordered_by_total_duration(self):
+    self.course3.add_duration(600)
+
+    request = self.client.get(reverse_lazy('courses-list'), {'ordering': '-total_duration'})
+
+    self.assertEqual([c['id'] for c in request.data.get('results')], [self.course2.id, self.course3.id, self.course1.id])
+
+  def test_list_courses_with_cursor(self):
+    for i in range(5, 20):
+      Course.objects.create(title=f"Curso {i}", description="Descrição", ends_at=timezone.now() + timezone.timedelta(days=5))
+
+    first = self.client.get(reverse_lazy('courses-list'), {'cursor': ''})
+    second = self.client.get(first.data.get('next'))
+
+    ids = [c['id'] for c in first.data.get('results')] + [c['id'] for c in second.data.get('results')]
+    expected = list(Course.objects.filter(ends_at__gte=timezone.now()).order_by('created_at', 'id').values_list('id', flat=True))
+    self.assertEqual(len(first.data.get('results')), 12)
+    self.assertNotIn('count', first.data)
+    self.assertEqual(ids, expected)
+    self.assertIsNone(second.data.get('next'))
+
+  def test_list_courses_with_invalid_cursor(self):
+    request = self.client.get(reverse_lazy('courses-list'), {'cursor': 'invalido'})
+
+    self.assertEqual(request.status_code, 404)
+
   def test_create_course_with_valid_data(self):
     request = self.client.post(reverse_lazy('courses-list'), data={
       'title': 'Curso 5',
@@ -110,9 +152,20 @@ class CourseViewTestCase(TestCase):
 
     self.assertEqual(request.status_code, 200)
     self.assertEqual(request.data.get('title'), 'Curso 1')
+    self.assertEqual(request.data.get('video_urls'), [])
     self.assertEqual(request.data.get('description'), 'Descrição do curso 1')
     self.assertEqual(request.data.get('ends_at'), self.course1.ends_at.astimezone(timezone.get_default_timezone()).isoformat())
 
+  def test_retrieve_course_with_videos(self):
+    request = self.client.get(reverse_lazy('courses-detail', kwargs={'pk': self.course2.id}))
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.data.get('total_duration'), '1:45:0')
+    self.assertEqual(request.data.get('video_urls'), [
+      {'id': 'QH2-TGUlwu4', 'title': 'Trailer do curso 2', 'url': 'https://www.youtube.com/watch?v=QH2-TGUlwu4', 'duration': '0:04:30'},
+      {'id': 'QH2-1d3fau4', 'title': 'Trailer do curso 2 pt2', 'url': 'https://www.youtube.com/watch?v=QH2-TGUlwu4', 'duration': '1:40:30'},
+    ])
+
   def test_update_course(self):
     data = json.dumps({
       'title': 'Curso 1 - Atualizado',
@@ -328,6 +381,36 @@ class CourseViewTestCase(TestCase):
     self.assertNotEqual(Course.objects.get(pk=self.course2.id).video_urls[0]['title'], 'Vídeo 2 - Atualizado')
     self.assertNotEqual(Course.objects.get(pk=self.course2.id).video_urls[0]['url'], 'https://www.youtube.com/watch?v=123456789')
 
+  @patch('requests.Session.get')
+  def test_update_video_title_keeps_duration_without_refetch(self, mock_get):
+    video_id = self.course2.video_urls[0]['id']
+    data = json.dumps({'title': 'Trailer renomeado', 'url': 'https://www.youtube.com/watch?v=QH2-TGUlwu4'})
+
+    # SELECT vídeo+curso, UPDATE condicional da versão e UPDATE só do título
+    # (entre SAVEPOINT e RELEASE) e SELECT dos vídeos para a resposta
+    with self.assertNumQueries(6):
+      request = self.client.put(
+        reverse_lazy('courses-update_video', kwargs={'course_id': self.course2.id, 'video_id': video_id}),
+        data=data,
+        content_type='application/json')
+
+    self.assertEqual(request.status_code, 200)
+    mock_get.assert_not_called()
+    self.assertEqual(request.data['video_urls'][0]['title'], 'Trailer renomeado')
+    self.assertEqual(request.data['video_urls'][0]['duration'], '0:04:30')
+    self.assertEqual(request.data['total_duration'], '1:45:0')
+
+  def test_update_video_of_deleted_course(self):
+    video_id = self.course2.video_urls[0]['id']
+    self.course2.delete()
+
+    request = self.client.put(
+      reverse_lazy('courses-update_video', kwargs={'course_id': self.course2.id, 'video_id': video_id}),
+      data=json.dumps({'title': 'Trailer', 'url': 'https://www.youtube.com/watch?v=QH2-TGUlwu4'}),
+      content_type='application/json')
+
+    self.assertEqual(request.status_code, 404)
+
   def test_destroy_course(self):
     request = self.client.delete(reverse_lazy('courses-detail', kwargs={'pk': self.course1.id}))
 
@@ -350,6 +433,7 @@ class CourseViewTestCase(TestCase):
 
     self.assertEqual(request.status_code, 200)
     self.assertEqual(len(Course.objects.get(pk=self.course2.id).video_urls), 1)
+    self.assertEqual(Course.objects.get(pk=self.course2.id).total_duration, '1:40:30')
 
   def test_destroy_video_course_with_invalid_video_id(self):
     request = self.client.delete(
@@ -375,34 +459,48 @@ class CourseViewTestCase(TestCase):
     self.assertEqual(request.status_code, 200)
     self.assertEqual(request['Content-Type'], 'text/csv')
 
-  @patch('requests.get')
+  def test_export_streams_all_courses_with_video_count(self):
+    self.course1.delete()
+
+    request = self.client.get(reverse_lazy('courses-export'))
+    rows = list(csv.reader(b''.join(request.streaming_content).decode().splitlines(), delimiter=';'))
+
+    self.assertTrue(request.streaming)
+    self.assertEqual(rows[0][0], 'ID')
+    self.assertEqual(len(rows), 5)
+    self.assertEqual(rows[1][0], str(self.course1.id))
+    self.assertEqual(rows[1][4], 'True')
+    self.assertEqual(rows[2][7], '2')
+    self.assertEqual(rows[3][7], '0')
+
+  @patch('requests.Session.get')
   def test_get_video_duration(self, mock_get):
     mock_response = Mock()
-    mock_response.content = '''
+    mock_response.iter_content.return_value = [b'''
     <html>
       <head>
         <meta itemprop="duration" content="PT1H30M10S">
       </head>
     </html>
-    '''
+    ''']
     mock_get.return_value = mock_response
     
     url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
     
-    view_set = CourseViewSet()
-    duration = view_set._get_video_duration(url)
+    with override_settings(VIDEO_DURATION_ASYNC=False):
+      duration = resolve_video_duration(url)
     
-    self.assertEqual(duration, "1:30:10")
+    self.assertEqual(duration, 5410)
 
-  @patch('requests.get')
+  @patch('requests.Session.get')
   def test_get_video_duration_not_found(self, mock_get):
     mock_response = Mock()
-    mock_response.content = ''
+    mock_response.iter_content.return_value = []
     mock_get.return_value = mock_response
     
     url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
     
-    view_set = CourseViewSet()
-    duration = view_set._get_video_duration(url)
+    with override_settings(VIDEO_DURATION_ASYNC=False):
+      duration = resolve_video_duration(url)
     
-    self.assertEqual(duration, "0:0:0")
\ No newline at end of file
+    self.assertEqual(duration, 0)
\ No newline at end of file
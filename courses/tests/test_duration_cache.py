@@ -0,0 +1,86 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import patch, Mock
+
+from courses.models import VideoDurationCache
+from courses.youtube import get_video_duration
+from courses import duration_cache, http
+
+
+def page_with_duration(duration=None):
+  meta = f'<meta itemprop="duration" content="{duration}">' if duration else ''
+  response = Mock()
+  response.iter_content.return_value = [f'<html><head>{meta}</head></html>'.encode()]
+  return response
+
+
+class DurationCacheTestCase(TestCase):
+
+  def setUp(self):
+    duration_cache.clear()
+    http.reset()
+
+  @patch('requests.Session.get')
+  def test_same_video_id_is_fetched_once(self, mock_get):
+    mock_get.return_value = page_with_duration('PT4M30S')
+
+    first = get_video_duration('https://www.youtube.com/watch?v=QH2-TGUlwu4')
+    second = get_video_duration('https://www.youtube.com/watch?v=QH2-TGUlwu4&t=10')
+
+    self.assertEqual(first, '0:04:30')
+    self.assertEqual(second, '0:04:30')
+    self.assertEqual(mock_get.call_count, 1)
+    self.assertEqual(duration_cache.stats()['misses'], 1)
+    self.assertEqual(duration_cache.stats()['memory_hits'], 1)
+
+  @patch('requests.Session.get')
+  def test_persistent_cache_survives_memory_eviction(self, mock_get):
+    mock_get.return_value = page_with_duration('PT4M30S')
+    get_video_duration('https://www.youtube.com/watch?v=QH2-TGUlwu4')
+
+    duration_cache.clear()
+    duration = get_video_duration('https://www.youtube.com/watch?v=QH2-TGUlwu4')
+
+    self.assertEqual(duration, '0:04:30')
+    self.assertEqual(mock_get.call_count, 1)
+    self.assertEqual(duration_cache.stats()['db_hits'], 1)
+
+  @patch('requests.Session.get')
+  def test_page_without_duration_is_negatively_cached(self, mock_get):
+    mock_get.return_value = page_with_duration()
+
+    get_video_duration('https://www.youtube.com/watch?v=QH2-TGUlwu4')
+    duration = get_video_duration('https://www.youtube.com/watch?v=QH2-TGUlwu4')
+
+    self.assertEqual(duration, '0:0:0')
+    self.assertEqual(mock_get.call_count, 1)
+    self.assertIsNone(VideoDurationCache.objects.get(video_id='QH2-TGUlwu4').duration)
+
+  @patch('requests.Session.get')
+  def test_expired_entry_is_fetched_again(self, mock_get):
+    mock_get.return_value = page_with_duration('PT4M30S')
+    VideoDurationCache.objects.create(video_id='QH2-TGUlwu4', duration='0:01:00', fetched_at=timezone.now() - timezone.timedelta(days=30))
+
+    duration = get_video_duration('https://www.youtube.com/watch?v=QH2-TGUlwu4')
+
+    self.assertEqual(duration, '0:04:30')
+    self.assertEqual(mock_get.call_count, 1)
+
+  @override_settings(VIDEO_DURATION_CACHE_SIZE=1)
+  @patch('requests.Session.get')
+  def test_lru_evicts_least_recently_used(self, mock_get):
+    mock_get.return_value = page_with_duration('PT1M')
+
+    get_video_duration('https://www.youtube.com/watch?v=aaaaaaaaaaa')
+    get_video_duration('https://www.youtube.com/watch?v=bbbbbbbbbbb')
+
+    self.assertEqual(duration_cache.stats()['size'], 1)
+
+  def test_purge_expired(self):
+    old = timezone.now() - timezone.timedelta(days=30)
+    VideoDurationCache.objects.create(video_id='aaaaaaaaaaa', duration='0:01:00', fetched_at=old)
+    VideoDurationCache.objects.create(video_id='bbbbbbbbbbb', duration=None, fetched_at=timezone.now() - timezone.timedelta(hours=2))
+    VideoDurationCache.objects.create(video_id='ccccccccccc', duration='0:01:00')
+
+    self.assertEqual(duration_cache.purge_expired(), 2)
+    self.assertEqual(list(VideoDurationCache.objects.values_list('video_id', flat=True)), ['ccccccccccc'])
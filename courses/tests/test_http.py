@@ -0,0 +1,111 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse_lazy
+from django.utils import timezone
+from unittest.mock import patch
+import requests
+
+from courses.models import Course
+from courses.youtube import fetch_video_duration
+from courses import duration_cache, http
+from courses.benchmark_stub import StubYouTubeServer
+
+
+@override_settings(YOUTUBE_HTTP_BACKOFF=0, YOUTUBE_HTTP_BREAKER_THRESHOLD=2, YOUTUBE_HTTP_BREAKER_RESET=30)
+class HTTPClientTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    duration_cache.clear()
+    http.reset()
+    self.addCleanup(http.reset)
+
+  def test_session_is_shared(self):
+    self.assertIs(http.get_session(), http.get_session())
+
+  @override_settings(YOUTUBE_HTTP_CONNECT_TIMEOUT=1, YOUTUBE_HTTP_READ_TIMEOUT=2)
+  @patch('requests.Session.get')
+  def test_requests_use_configured_timeouts(self, mock_get):
+    http.get('http://example.com')
+
+    self.assertEqual(mock_get.call_args.kwargs['timeout'], (1, 2))
+
+  def test_retries_server_errors(self):
+    with StubYouTubeServer({'dQw4w9WgXcQ': 'PT2M'}, fail_first=2) as stub:
+      with self.settings(YOUTUBE_WATCH_URL=stub.watch_url):
+        duration = fetch_video_duration('dQw4w9WgXcQ')
+
+    self.assertEqual(duration, '0:02:00')
+    self.assertEqual(len(stub.requests), 3)
+
+  @override_settings(YOUTUBE_HTTP_RETRIES=0)
+  @patch('requests.Session.get', side_effect=requests.ConnectionError('upstream down'))
+  def test_circuit_opens_after_consecutive_failures(self, mock_get):
+    for _ in range(2):
+      with self.assertRaises(requests.ConnectionError):
+        http.get('http://example.com')
+
+    with self.assertRaises(http.CircuitOpenError):
+      http.get('http://example.com')
+    self.assertEqual(mock_get.call_count, 2)
+
+  @patch('requests.Session.get', side_effect=requests.ConnectionError('upstream down'))
+  def test_circuit_half_opens_after_reset_timeout(self, mock_get):
+    with patch('time.monotonic', return_value=100):
+      for _ in range(2):
+        with self.assertRaises(requests.ConnectionError):
+          http.get('http://example.com')
+    self.assertTrue(http.breaker.is_open)
+
+    mock_get.side_effect = None
+    with patch('time.monotonic', return_value=131):
+      http.get('http://example.com')
+    self.assertFalse(http.breaker.is_open)
+
+  @patch('requests.Session.get', side_effect=requests.ConnectionError('upstream down'))
+  def test_half_open_circuit_lets_a_single_probe_through(self, mock_get):
+    with patch('time.monotonic', return_value=100):
+      for _ in range(2):
+        with self.assertRaises(requests.ConnectionError):
+          http.get('http://example.com')
+
+    with patch('time.monotonic', return_value=131):
+      # O teste ainda não terminou quando outras chamadas chegam
+      http.breaker.before_call()
+      with self.assertRaises(http.CircuitOpenError):
+        http.get('http://example.com')
+      http.breaker.record_failure()
+    self.assertEqual(mock_get.call_count, 2)
+
+    # O teste falhou: o circuito reabre por mais um reset_timeout inteiro
+    with patch('time.monotonic', return_value=150):
+      with self.assertRaises(http.CircuitOpenError):
+        http.get('http://example.com')
+    with patch('time.monotonic', return_value=162):
+      with self.assertRaises(requests.ConnectionError):
+        http.get('http://example.com')
+    self.assertEqual(mock_get.call_count, 3)
+
+  @override_settings(YOUTUBE_HTTP_RETRIES=0)
+  @patch('requests.Session.get', side_effect=ValueError('bug local'))
+  def test_non_network_errors_do_not_open_the_circuit(self, mock_get):
+    for _ in range(3):
+      with self.assertRaises(ValueError):
+        http.get('http://example.com')
+
+    self.assertFalse(http.breaker.is_open)
+    self.assertEqual(mock_get.call_count, 3)
+
+  @override_settings(VIDEO_DURATION_ASYNC=False)
+  @patch('requests.Session.get', side_effect=requests.ConnectionError('upstream down'))
+  def test_create_video_falls_back_to_empty_duration(self, mock_get):
+    course = Course.objects.create(title='Curso 1', ends_at=timezone.now() + timezone.timedelta(days=30))
+    url = reverse_lazy('courses-create_video', kwargs={'course_id': course.id})
+
+    for index in range(3):
+      request = self.client.post(url, data={'title': f'Vídeo {index}', 'url': f'https://www.youtube.com/watch?v=dQw4w9WgXc{index}'})
+      self.assertEqual(request.status_code, 201)
+
+    # O terceiro vídeo nem chega a chamar o YouTube: o circuito já está aberto
+    self.assertEqual(mock_get.call_count, 2)
+    self.assertEqual(Course.objects.get(pk=course.id).total_duration, '0:0:0')
@@ -0,0 +1,121 @@
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse_lazy
+from django.utils import timezone
+from io import StringIO
+from unittest.mock import patch
+import tempfile
+import json
+
+from courses.models import Course
+
+
+class ImportCoursesTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    self.ends_at = timezone.now() + timezone.timedelta(days=30)
+
+  def _export(self):
+    request = self.client.get(reverse_lazy('courses-export'))
+    return b''.join(request.streaming_content)
+
+  def test_import_exported_csv(self):
+    Course.objects.create(title="Curso 1", description="Descrição; com separador", ends_at=self.ends_at)
+    Course.objects.create(title="Curso 2", description="Descrição do curso 2", ends_at=self.ends_at).delete()
+    content = self._export()
+    Course.with_deleted.all().delete()
+
+    request = self.client.post(reverse_lazy('courses-import'), {'file': SimpleUploadedFile('courses.csv', content)})
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.data.get('imported'), 2)
+    self.assertEqual(request.data.get('rejected'), 0)
+    self.assertEqual(Course.objects.get().description, 'Descrição; com separador')
+    self.assertTrue(Course.with_deleted.get(title='Curso 2').is_deleted())
+
+  def test_import_reports_rejected_rows(self):
+    Course.objects.create(title="Curso 1", description="Descrição do curso 1", ends_at=self.ends_at)
+    lines = [
+      {'title': 'Curso 1', 'description': 'Duplicado', 'ends_at': self.ends_at.isoformat()},
+      {'title': 'Curso 3', 'ends_at': self.ends_at.isoformat()},
+      {'title': 'Curso 4', 'description': 'Descrição', 'ends_at': self.ends_at.isoformat()},
+    ]
+    content = ('\n'.join(json.dumps(line) for line in lines) + '\nnão é json\n').encode()
+
+    request = self.client.post(reverse_lazy('courses-import'), {'file': SimpleUploadedFile('courses.jsonl', content)})
+
+    self.assertEqual(request.data.get('imported'), 1)
+    self.assertEqual(request.data.get('rejected'), 3)
+    self.assertEqual([e['line'] for e in request.data.get('errors')], [2, 4, 1])
+    self.assertEqual(Course.objects.count(), 2)
+
+  def test_import_without_file(self):
+    request = self.client.post(reverse_lazy('courses-import'))
+
+    self.assertEqual(request.status_code, 400)
+
+  def test_import_csv_without_required_columns(self):
+    request = self.client.post(reverse_lazy('courses-import'), {'file': SimpleUploadedFile('courses.csv', b'ID;Nome\n1;Curso\n')})
+
+    self.assertEqual(request.status_code, 400)
+
+  def test_import_non_utf8_file(self):
+    content = 'Título;Descrição;Data de Término;Excluído em\nCurso;Descrição;2030-01-01T00:00:00Z;\n'.encode('latin-1')
+    request = self.client.post(reverse_lazy('courses-import'), {'file': SimpleUploadedFile('courses.csv', content)})
+
+    self.assertEqual(request.status_code, 400)
+    self.assertIn('UTF-8', request.data.get('detail'))
+
+  def test_import_malformed_csv(self):
+    content = f'Título;Descrição;Data de Término;Excluído em\nCurso;{"x" * 200000};2030-01-01T00:00:00Z;\n'.encode()
+    request = self.client.post(reverse_lazy('courses-import'), {'file': SimpleUploadedFile('courses.csv', content)})
+
+    self.assertEqual(request.status_code, 400)
+    self.assertIn('CSV inválido', request.data.get('detail'))
+
+  def test_import_rejects_invalid_deleted_at(self):
+    lines = [
+      {'title': 'Curso 1', 'description': 'Descrição', 'ends_at': self.ends_at.isoformat(), 'deleted_at': 123},
+      {'title': 'Curso 2', 'description': 'Descrição', 'ends_at': self.ends_at.isoformat(), 'deleted_at': '2024-13-45T00:00:00'},
+      {'title': 'Curso 3', 'description': 'Descrição', 'ends_at': self.ends_at.isoformat(), 'deleted_at': self.ends_at.isoformat()},
+    ]
+    content = '\n'.join(json.dumps(line) for line in lines).encode()
+
+    request = self.client.post(reverse_lazy('courses-import'), {'file': SimpleUploadedFile('courses.jsonl', content)})
+
+    self.assertEqual(request.data.get('imported'), 1)
+    self.assertEqual(request.data.get('errors'), [{'line': 1, 'errors': {'deleted_at': ['Data inválida.']}}, {'line': 2, 'errors': {'deleted_at': ['Data inválida.']}}])
+
+  def test_import_title_taken_after_check(self):
+    Course.objects.create(title="Curso 1", description="Descrição do curso 1", ends_at=self.ends_at)
+    lines = [
+      {'title': 'Curso 1', 'description': 'Duplicado', 'ends_at': self.ends_at.isoformat()},
+      {'title': 'Curso 2', 'description': 'Descrição', 'ends_at': self.ends_at.isoformat()},
+    ]
+    content = '\n'.join(json.dumps(line) for line in lines).encode()
+
+    # Simula outro escritor inserindo "Curso 1" depois da checagem de títulos
+    with patch('courses.bulk.title_holders', return_value={}):
+      request = self.client.post(reverse_lazy('courses-import'), {'file': SimpleUploadedFile('courses.jsonl', content)})
+
+    self.assertEqual(request.data.get('imported'), 1)
+    self.assertEqual(request.data.get('errors'), [{'line': 1, 'errors': {'title': ['Já existe um curso ativo com este título.']}}])
+    self.assertEqual(Course.objects.count(), 2)
+
+  def test_import_courses_command_in_batches(self):
+    for i in range(5):
+      Course.objects.create(title=f"Curso {i}", description="Descrição", ends_at=self.ends_at)
+    content = self._export()
+    Course.with_deleted.all().delete()
+
+    with tempfile.NamedTemporaryFile(suffix='.csv') as file:
+      file.write(content)
+      file.flush()
+      out = StringIO()
+      call_command('import_courses', file.name, '--batch-size', '2', stdout=out)
+
+    self.assertIn('5 curso(s) importado(s), 0 rejeitado(s)', out.getvalue())
+    self.assertEqual(Course.objects.count(), 5)
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from unittest import skipUnless
+
+from courses.archive import archivable
+from courses.models import Course
+
+
+@skipUnless(connection.vendor == 'sqlite', 'planos do EXPLAIN QUERY PLAN do SQLite')
+class CourseIndexTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    now = timezone.now()
+    Course.objects.bulk_create([
+      Course(title=f'Curso {i}', description='Descrição', ends_at=now + timezone.timedelta(days=i - 10), deleted_at=now if i % 4 == 0 else None)
+      for i in range(40)
+    ])
+
+  def _plan(self, sql, params=()):
+    with connection.cursor() as cursor:
+      cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+      return ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+  def _list_plans(self, params):
+    # Planos das consultas que a view de listagem realmente executa
+    with CaptureQueriesContext(connection) as context:
+      request = self.client.get(reverse('courses-list'), params)
+    self.assertEqual(request.status_code, 200)
+    return [self._plan(query['sql']) for query in context.captured_queries if 'courses_course' in query['sql']]
+
+  def test_list_uses_active_index(self):
+    plans = self._list_plans({'page': 1})
+
+    # COUNT da paginação pelo range de ends_at; a página já sai na ordem (created_at, id) do índice
+    self.assertEqual(len(plans), 2)
+    self.assertIn('course_expiry_idx', plans[0])
+    self.assertIn('course_active_idx', plans[1])
+    self.assertNotIn('TEMP B-TREE', plans[1])
+
+  def test_cursor_list_uses_active_index(self):
+    plans = self._list_plans({'cursor': ''})
+
+    self.assertEqual(len(plans), 1)
+    self.assertIn('course_active_idx', plans[0])
+    self.assertNotIn('TEMP B-TREE', plans[0])
+
+  def test_descending_list_reads_index_backwards(self):
+    plans = self._list_plans({'page': 1, 'ordering': '-created_at'})
+
+    self.assertIn('course_active_idx', plans[1])
+    self.assertNotIn('TEMP B-TREE', plans[1])
+
+  def test_deleted_courses_use_deleted_index(self):
+    queryset = Course.with_deleted.filter(deleted_at__isnull=False).order_by('-deleted_at')
+    sql, params = queryset.query.sql_with_params()
+
+    self.assertIn('course_deleted_idx', self._plan(sql, params))
+    self.assertEqual(queryset.count(), 10)
+
+  def test_archive_candidates_use_both_partial_indexes(self):
+    sql, params = archivable(timezone.now()).values('pk').query.sql_with_params()
+    plan = self._plan(sql, params)
+
+    self.assertIn('course_expiry_idx', plan)
+    self.assertIn('course_deleted_idx', plan)
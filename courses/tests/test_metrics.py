@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse_lazy
+from django.utils import timezone
+from unittest.mock import patch
+
+from courses.models import Course
+from courses import duration_cache, metrics
+
+
+def sample(body, name):
+  for line in body.splitlines():
+    if line.startswith(name + ' '):
+      return float(line.rsplit(' ', 1)[1])
+
+
+class MetricsTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    duration_cache.clear()
+    metrics.reset()
+    self.course = Course.objects.create(title="Curso 1", description="Descrição do curso 1", ends_at=timezone.now() + timezone.timedelta(days=30))
+
+  def test_metrics_endpoint_reports_requests_and_queries(self):
+    self.client.get(reverse_lazy('courses-list'))
+    self.client.get(reverse_lazy('courses-list'))
+
+    body = self.client.get(reverse_lazy('metrics')).content.decode()
+
+    self.assertIn('courses_requests_total{endpoint="courses-list",method="GET",status="200"} 2', body)
+    self.assertIn('courses_request_duration_seconds_count{endpoint="courses-list",method="GET"} 2', body)
+    self.assertIn('courses_request_duration_seconds_bucket{endpoint="courses-list",method="GET",le="+Inf"} 2', body)
+    self.assertGreater(sample(body, 'courses_db_queries_total{endpoint="courses-list",method="GET"}'), 0)
+    self.assertGreater(sample(body, 'courses_serialization_duration_seconds_total{endpoint="courses-list",method="GET"}'), 0)
+
+  @override_settings(VIDEO_DURATION_ASYNC=False)
+  @patch('requests.Session.get')
+  def test_outbound_http_time_is_recorded(self, mock_get):
+    mock_get.return_value.iter_content.return_value = [b'<meta itemprop="duration" content="PT1M">']
+
+    self.client.post(reverse_lazy('courses-create_video', kwargs={'course_id': self.course.id}), data={
+      'title': 'Vídeo 1',
+      'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    })
+
+    body = self.client.get(reverse_lazy('metrics')).content.decode()
+    self.assertGreater(sample(body, 'courses_http_duration_seconds_total{endpoint="courses-create_video",method="POST"}'), 0)
+    self.assertIn('courses_duration_cache_misses 1', body)
+
+  @override_settings(DEBUG=True)
+  def test_server_timing_header_in_debug(self):
+    request = self.client.get(reverse_lazy('courses-list'))
+
+    self.assertRegex(request['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", http;dur=[\d.]+, serialization;dur=[\d.]+, total;dur=[\d.]+$')
+
+  def test_no_server_timing_header_without_debug(self):
+    request = self.client.get(reverse_lazy('courses-list'))
+
+    self.assertFalse(request.has_header('Server-Timing'))
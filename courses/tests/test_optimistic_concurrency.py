@@ -0,0 +1,179 @@
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from unittest.mock import patch
+import json
+
+from courses.models import Course, Video, VideoDurationJob
+from courses import duration_cache
+
+
+original_bump_version = Course.bump_version
+
+
+def concurrent_writes(times):
+  # Simula outro escritor gravando entre a leitura e o UPDATE condicional nas primeiras tentativas
+  remaining = [times]
+
+  def bump_version(course, seconds=0):
+    if remaining[0]:
+      remaining[0] -= 1
+      Course.with_deleted.filter(pk=course.pk).update(version=F('version') + 1, total_duration_seconds=F('total_duration_seconds') + 5)
+    return original_bump_version(course, seconds)
+
+  return bump_version
+
+
+@override_settings(VIDEO_DURATION_ASYNC=True, COURSES_OPTIMISTIC_RETRY_BACKOFF=0)
+class OptimisticConcurrencyTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    duration_cache.clear()
+    self.course = Course.objects.create(title="Curso 1", description="Descrição do curso 1", ends_at=timezone.now() + timezone.timedelta(days=30), total_duration_seconds=270)
+    self.video = Video.objects.create(course=self.course, uid="QH2-TGUlwu4", url="https://www.youtube.com/watch?v=QH2-TGUlwu4", title="Trailer", duration=270)
+
+  def _etag(self):
+    return self.client.get(reverse('courses-detail', kwargs={'pk': self.course.pk}))['ETag']
+
+  def _update_video(self, title, **headers):
+    return self.client.put(
+      reverse('courses-update_video', kwargs={'course_id': self.course.pk, 'video_id': self.video.uid}),
+      data=json.dumps({'title': title, 'url': self.video.url}),
+      content_type='application/json',
+      headers=headers
+    )
+
+  def _update_video_url(self, url):
+    return self.client.put(
+      reverse('courses-update_video', kwargs={'course_id': self.course.pk, 'video_id': self.video.uid}),
+      data=json.dumps({'title': self.video.title, 'url': url}),
+      content_type='application/json'
+    )
+
+  def test_video_mutations_bump_version(self):
+    request = self.client.post(reverse('courses-create_video', kwargs={'course_id': self.course.pk}), data={'title': 'Vídeo 2', 'url': 'https://example.com/video.mp4'})
+    self._update_video('Trailer renomeado')
+
+    self.course.refresh_from_db()
+    self.assertEqual(request.status_code, 201)
+    self.assertEqual(self.course.version, 3)
+
+  def test_if_match_with_current_etag(self):
+    etag = self._etag()
+    request = self._update_video('Trailer renomeado', if_match=etag)
+
+    self.assertEqual(request.status_code, 200)
+    self.assertNotEqual(request['ETag'], etag)
+    # A ETag da resposta é a mesma que um GET devolveria
+    self.assertEqual(request['ETag'], self._etag())
+
+  def test_if_match_accepts_weak_etag_from_compressed_response(self):
+    request = self._update_video('Trailer renomeado', if_match=f'W/{self._etag()}')
+
+    self.assertEqual(request.status_code, 200)
+
+  def test_if_match_with_stale_etag(self):
+    etag = self._etag()
+    self._update_video('Primeira alteração')
+    request = self._update_video('Segunda alteração', if_match=etag)
+
+    self.assertEqual(request.status_code, 412)
+    self.assertEqual(Video.objects.get(pk=self.video.pk).title, 'Primeira alteração')
+
+  def test_if_match_on_course_update_and_destroy(self):
+    etag = self._etag()
+    self.client.patch(reverse('courses-detail', kwargs={'pk': self.course.pk}), data={'description': 'Nova descrição'}, content_type='application/json')
+
+    stale = self.client.patch(reverse('courses-detail', kwargs={'pk': self.course.pk}), data={'title': 'Curso antigo'}, content_type='application/json', headers={'If-Match': etag})
+    destroy = self.client.delete(reverse('courses-detail', kwargs={'pk': self.course.pk}), headers={'If-Match': etag})
+    any_version = self.client.patch(reverse('courses-detail', kwargs={'pk': self.course.pk}), data={'title': 'Curso novo'}, content_type='application/json', headers={'If-Match': '*'})
+
+    self.assertEqual(stale.status_code, 412)
+    self.assertEqual(destroy.status_code, 412)
+    self.assertEqual(any_version.status_code, 200)
+    self.assertEqual(Course.objects.get(pk=self.course.pk).title, 'Curso novo')
+
+  def test_create_video_retries_after_concurrent_write(self):
+    with patch.object(Course, 'bump_version', side_effect=concurrent_writes(1), autospec=True) as bump:
+      request = self.client.post(reverse('courses-create_video', kwargs={'course_id': self.course.pk}), data={'title': 'Vídeo 2', 'url': 'https://example.com/video.mp4'})
+
+    self.assertEqual(request.status_code, 201)
+    self.assertEqual(bump.call_count, 2)
+    self.assertEqual(list(Video.objects.filter(course=self.course).values_list('position', flat=True)), [0, 1])
+
+  def test_if_match_does_not_retry(self):
+    with patch.object(Course, 'bump_version', side_effect=concurrent_writes(100), autospec=True) as bump:
+      request = self._update_video('Trailer renomeado', if_match=self._etag())
+
+    self.assertEqual(request.status_code, 412)
+    self.assertEqual(bump.call_count, 1)
+
+  @override_settings(COURSES_OPTIMISTIC_RETRIES=2)
+  def test_conflict_after_retries(self):
+    with patch.object(Course, 'bump_version', side_effect=concurrent_writes(100), autospec=True):
+      request = self.client.delete(reverse('courses-destroy_video', kwargs={'course_id': self.course.pk, 'video_id': self.video.uid}))
+
+    self.assertEqual(request.status_code, 409)
+    self.assertTrue(Video.objects.filter(pk=self.video.pk).exists())
+
+  @override_settings(COURSES_OPTIMISTIC_RETRIES=1, VIDEO_DURATION_ASYNC=False)
+  def test_last_attempt_resolves_duration_outside_the_transaction(self):
+    depths = []
+    outer_depth = len(connection.savepoint_ids)
+
+    def resolve(url):
+      depths.append(len(connection.savepoint_ids))
+      return 60
+
+    with patch('courses.views.resolve_video_duration', side_effect=resolve):
+      request = self._update_video_url('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(depths, [outer_depth])
+    self.assertEqual(Video.objects.get(pk=self.video.pk).duration, 60)
+
+  def test_bulk_videos_and_jobs_are_written_together(self):
+    with patch('courses.concurrency.enqueue_duration_jobs', side_effect=DatabaseError('falhou')):
+      with self.assertRaises(DatabaseError):
+        self.client.post(
+          reverse('courses-create_videos', kwargs={'course_id': self.course.pk}),
+          data=json.dumps([{'title': 'Vídeo 2', 'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'}]),
+          content_type='application/json'
+        )
+
+    self.assertEqual(Video.objects.filter(course=self.course).count(), 1)
+    self.assertFalse(VideoDurationJob.objects.exists())
+
+  def test_stale_save_keeps_counters(self):
+    stale = Course.objects.get(pk=self.course.pk)
+    self.course.add_duration(30)
+
+    stale.description = 'Nova descrição'
+    stale.save()
+
+    self.course.refresh_from_db()
+    self.assertEqual(self.course.description, 'Nova descrição')
+    self.assertEqual(self.course.total_duration_seconds, 300)
+    self.assertEqual(self.course.version, 3)
+
+  async def test_async_update_video_with_stale_etag(self):
+    etag = (await self.async_client.get(reverse('async-courses-detail', kwargs={'pk': self.course.pk})))['ETag']
+    changed = await self.async_client.put(
+      reverse('async-courses-update_video', kwargs={'course_id': self.course.pk, 'video_id': self.video.uid}),
+      data={'title': 'Primeira alteração', 'url': self.video.url},
+      content_type='application/json',
+      headers={'If-Match': etag}
+    )
+    stale = await self.async_client.put(
+      reverse('async-courses-update_video', kwargs={'course_id': self.course.pk, 'video_id': self.video.uid}),
+      data={'title': 'Segunda alteração', 'url': self.video.url},
+      content_type='application/json',
+      headers={'If-Match': etag}
+    )
+
+    self.assertEqual(changed.status_code, 200)
+    self.assertEqual(stale.status_code, 412)
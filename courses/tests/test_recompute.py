@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from io import StringIO
+from unittest import skipUnless
+import os
+import subprocess
+import sys
+import tempfile
+
+from courses.models import Course, Video
+from courses.recompute import recompute_chunk
+
+
+class RecomputeDurationsTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    ends_at = timezone.now() + timezone.timedelta(days=30)
+    self.in_sync = Course.objects.create(title="Curso 1", description="Descrição", ends_at=ends_at, total_duration_seconds=300)
+    Video.objects.create(course=self.in_sync, title="Vídeo 1", url="https://example.com/1", duration=100)
+    Video.objects.create(course=self.in_sync, title="Vídeo 2", url="https://example.com/2", duration=200)
+    Video.objects.create(course=self.in_sync, title="Vídeo 3", url="https://example.com/3", duration=None)
+
+    self.drifted = Course.objects.create(title="Curso 2", description="Descrição", ends_at=ends_at, total_duration_seconds=999)
+    Video.objects.create(course=self.drifted, title="Vídeo 1", url="https://example.com/1", duration=60)
+
+    self.empty = Course.objects.create(title="Curso 3", description="Descrição", ends_at=ends_at, total_duration_seconds=10)
+    self.empty.delete()
+
+  def _call(self, *args):
+    out = StringIO()
+    call_command('recompute_durations', *args, stdout=out)
+    return out.getvalue()
+
+  def test_repairs_courses_out_of_sync(self):
+    output = self._call('--batch-size', '2')
+
+    self.assertIn('3 curso(s) verificado(s), 2 fora de sincronia corrigido(s)', output)
+    totals = dict(Course.with_deleted.values_list('pk', 'total_duration_seconds'))
+    self.assertEqual(totals, {self.in_sync.pk: 300, self.drifted.pk: 60, self.empty.pk: 0})
+
+  def test_dry_run_does_not_write(self):
+    output = self._call('--dry-run')
+
+    self.assertIn('2 fora de sincronia encontrado(s)', output)
+    self.assertEqual(Course.objects.get(pk=self.drifted.pk).total_duration_seconds, 999)
+
+  def test_chunk_uses_a_constant_number_of_queries(self):
+    # Um SELECT das divergências e um UPDATE, independente do tamanho do lote
+    with self.assertNumQueries(2):
+      self.assertEqual(recompute_chunk([self.in_sync.pk, self.drifted.pk, self.empty.pk]), (3, 2))
+
+
+SEED = '''
+from django.utils import timezone
+from courses.models import Course, Video
+ends_at = timezone.now() + timezone.timedelta(days=30)
+for i in range(6):
+  course = Course.objects.create(title=f"Curso {i}", description="Descrição", ends_at=ends_at, total_duration_seconds=999 if i % 2 else 60)
+  Video.objects.create(course=course, title="Vídeo", url="https://example.com/1", duration=60)
+'''
+
+
+@skipUnless(connection.vendor == 'sqlite', 'usa um arquivo SQLite descartável')
+class RecomputeWorkersTestCase(SimpleTestCase):
+
+  def _manage(self, env, *args):
+    result = subprocess.run([sys.executable, 'manage.py', *args], capture_output=True, text=True, env=env, cwd=settings.BASE_DIR, timeout=120)
+    self.assertEqual(result.returncode, 0, result.stderr)
+    return result.stdout
+
+  def test_workers_run_in_spawned_processes(self):
+    # Os processos do Pool não enxergam o banco de teste em memória: tudo roda num arquivo
+    with tempfile.TemporaryDirectory() as directory:
+      env = {**os.environ, 'SQLITE_PATH': os.path.join(directory, 'recompute.sqlite3'), 'DJANGO_SETTINGS_MODULE': 'api.settings'}
+      self._manage(env, 'migrate', '-v', '0')
+      self._manage(env, 'shell', '-c', SEED)
+      output = self._manage(env, 'recompute_durations', '--workers', '2', '--batch-size', '2')
+      again = self._manage(env, 'recompute_durations', '--workers', '2', '--dry-run')
+
+    self.assertIn('6 curso(s) verificado(s), 3 fora de sincronia corrigido(s)', output)
+    self.assertIn('0 fora de sincronia encontrado(s)', again)
@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse_lazy
+from django.utils import timezone
+import json
+
+from courses.models import Course, Video
+from courses import cache as response_cache
+
+
+class ResponseCacheTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    self.course = Course.objects.create(title="Curso 1", description="Descrição do curso 1", ends_at=timezone.now() + timezone.timedelta(days=30))
+    self.detail_url = reverse_lazy('courses-detail', kwargs={'pk': self.course.id})
+
+  def test_retrieve_is_served_from_cache(self):
+    self.client.get(self.detail_url)
+
+    with self.assertNumQueries(0):
+      request = self.client.get(self.detail_url)
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.data.get('title'), 'Curso 1')
+
+  def test_if_none_match_returns_not_modified(self):
+    first = self.client.get(self.detail_url)
+
+    request = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+    self.assertEqual(request.status_code, 304)
+    self.assertEqual(request['ETag'], first['ETag'])
+
+  def test_update_invalidates_retrieve(self):
+    first = self.client.get(self.detail_url)
+
+    self.client.patch(self.detail_url, data=json.dumps({'title': 'Curso 1 - Atualizado'}), content_type='application/json')
+    request = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.data.get('title'), 'Curso 1 - Atualizado')
+
+  def test_video_mutation_invalidates_retrieve(self):
+    self.client.get(self.detail_url)
+
+    self.client.post(reverse_lazy('courses-create_video', kwargs={'course_id': self.course.id}), data={
+      'title': 'Vídeo 1',
+      'url': 'https://www.youtube.com/watch?v=123456789',
+    })
+    request = self.client.get(self.detail_url)
+
+    self.assertEqual(len(request.data.get('video_urls')), 1)
+
+  def test_duration_update_invalidates_retrieve(self):
+    Video.objects.create(course=self.course, title='Vídeo 1', url='https://www.youtube.com/watch?v=123456789', duration=60)
+    self.client.get(self.detail_url)
+
+    self.course.add_duration(60)
+    request = self.client.get(self.detail_url)
+
+    self.assertEqual(request.data.get('total_duration'), '0:1:0')
+
+  def test_create_destroy_and_restore_invalidate_list(self):
+    self.assertEqual(self.client.get(reverse_lazy('courses-list')).data.get('count'), 1)
+
+    self.client.post(reverse_lazy('courses-list'), data={
+      'title': 'Curso 2',
+      'description': 'Descrição do curso 2',
+      'ends_at': timezone.now() + timezone.timedelta(days=5)
+    })
+    self.assertEqual(self.client.get(reverse_lazy('courses-list')).data.get('count'), 2)
+
+    self.client.delete(self.detail_url)
+    self.assertEqual(self.client.get(reverse_lazy('courses-list')).data.get('count'), 1)
+
+    Course.with_deleted.get(pk=self.course.id).restore()
+    self.assertEqual(self.client.get(reverse_lazy('courses-list')).data.get('count'), 2)
+
+  def test_evicted_generation_does_not_serve_old_pages(self):
+    self.client.get(reverse_lazy('courses-list'))
+    Course.objects.create(title="Curso 2", description="Descrição do curso 2", ends_at=timezone.now() + timezone.timedelta(days=5))
+
+    # A chave da geração foi despejada: a nova não pode reaproveitar páginas antigas
+    cache.delete(response_cache.LIST_GENERATION_KEY)
+    request = self.client.get(reverse_lazy('courses-list'))
+
+    self.assertEqual(request.data.get('count'), 2)
+
+  def test_check_requires_a_shared_cache(self):
+    self.assertEqual(response_cache.check_shared_cache(None), [])
+
+    with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+      errors = response_cache.check_shared_cache(None)
+
+    self.assertEqual([error.id for error in errors], ['courses.E001'])
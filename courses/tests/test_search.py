@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse_lazy
+from django.utils import timezone
+from unittest import skipUnless
+
+from courses import search
+from courses.models import Course
+
+
+class CourseSearchTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    ends_at = timezone.now() + timezone.timedelta(days=30)
+    self.python = Course.objects.create(title="Python para iniciantes", description="Introdução à programação", ends_at=ends_at)
+    self.django = Course.objects.create(title="Django na prática", description="APIs REST com Python e Django", ends_at=ends_at)
+    self.design = Course.objects.create(title="Design de interfaces", description="Criação de protótipos", ends_at=ends_at)
+    self.expired = Course.objects.create(title="Python avançado", description="Expirado", ends_at=timezone.now() - timezone.timedelta(days=1))
+    self.deleted = Course.objects.create(title="Python excluído", description="Excluído", ends_at=ends_at)
+    self.deleted.delete()
+
+  def _search(self, text, **params):
+    request = self.client.get(reverse_lazy('courses-list'), {'q': text, **params})
+    self.assertEqual(request.status_code, 200)
+    return [course['id'] for course in request.data.get('results')]
+
+  def test_ranks_title_matches_first_and_applies_list_filters(self):
+    self.assertEqual(self._search('python'), [self.python.id, self.django.id])
+
+  def test_matches_prefixes_and_ignores_accents(self):
+    self.assertEqual(self._search('introducao prog'), [self.python.id])
+    self.assertEqual(self._search('CRIACAO'), [self.design.id])
+
+  def test_explicit_ordering_overrides_rank(self):
+    self.assertEqual(self._search('python', ordering='-created_at'), [self.django.id, self.python.id])
+
+  def test_index_follows_updates_done_outside_the_orm_save(self):
+    Course.objects.filter(pk=self.design.pk).update(title="Design com Python")
+    Course.objects.bulk_create([Course(title="Python em lote", description="Importado", ends_at=self.python.ends_at)])
+    Course.with_deleted.filter(pk=self.django.pk).delete()
+
+    self.assertEqual(len(self._search('python')), 3)
+    self.assertNotIn(self.django.id, self._search('python'))
+    self.assertIn(self.design.id, self._search('python'))
+
+  def test_query_syntax_is_not_interpreted(self):
+    self.assertEqual(self._search('"python" -'), [self.python.id, self.django.id])
+    self.assertEqual(self._search('"*'), [])
+
+  @skipUnless(connection.vendor == 'sqlite', 'triggers do FTS5 do SQLite')
+  def test_triggers_survive_migrations(self):
+    # O banco de teste é criado pelas migrações, inclusive as que recriam courses_course
+    with connection.cursor() as cursor:
+      cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'courses_course'")
+      triggers = {row[0] for row in cursor.fetchall()}
+
+    self.assertEqual(triggers, {'courses_course_fts_ai', 'courses_course_fts_ad', 'courses_course_fts_au'})
+
+  @skipUnless(connection.vendor == 'sqlite', 'planos do EXPLAIN QUERY PLAN do SQLite')
+  def test_rank_comes_from_a_single_fts_join(self):
+    sql, params = search.search(Course.objects.all(), 'python').query.sql_with_params()
+    with connection.cursor() as cursor:
+      cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+      plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+    self.assertEqual(plan.count('courses_course_fts VIRTUAL TABLE'), 1)
+    self.assertNotIn('CORRELATED', plan)
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+from django.utils import timezone
+
+from courses.models import Course, Video
+from courses.serializers import CourseSerializer, serialize_course_list
+
+
+class SparseFieldsTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    ends_at = timezone.now() + timezone.timedelta(days=30)
+    self.course1 = Course.objects.create(title="Curso 1", description="Descrição do curso 1", ends_at=ends_at, total_duration_seconds=270)
+    Video.objects.create(course=self.course1, uid="QH2-TGUlwu4", url="https://www.youtube.com/watch?v=QH2-TGUlwu4", title="Trailer", duration=270)
+    self.course2 = Course.objects.create(title="Curso 2", description="Descrição do curso 2", ends_at=ends_at)
+
+  def test_compact_list_matches_model_serializer(self):
+    courses = list(Course.objects.order_by('id'))
+
+    self.assertEqual(serialize_course_list(courses, CourseSerializer.Meta.fields), CourseSerializer(courses, many=True).data)
+
+  def test_list_with_fields_narrows_the_query(self):
+    with CaptureQueriesContext(connection) as queries:
+      request = self.client.get(reverse_lazy('courses-list'), {'fields': 'id,title'})
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.data['results'][0], {'id': self.course1.id, 'title': 'Curso 1'})
+    select = [q['sql'] for q in queries if 'FROM "courses_course"' in q['sql'] and 'COUNT' not in q['sql']][0]
+    self.assertNotIn('"description"', select.split(' FROM ')[0])
+
+  def test_list_with_exclude_and_cursor(self):
+    request = self.client.get(reverse_lazy('courses-list'), {'exclude': 'description,ends_at', 'cursor': ''})
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.data['results'], [{'id': self.course1.id, 'title': 'Curso 1'}, {'id': self.course2.id, 'title': 'Curso 2'}])
+
+  def test_unknown_fields_are_rejected(self):
+    request = self.client.get(reverse_lazy('courses-list'), {'fields': 'id,video_urls'})
+    self.assertEqual(request.status_code, 400)
+
+    request = self.client.get(reverse_lazy('courses-detail', kwargs={'pk': self.course1.id}), {'exclude': 'nope'})
+    self.assertEqual(request.status_code, 400)
+
+  def test_retrieve_without_videos_skips_the_prefetch(self):
+    with self.assertNumQueries(1):
+      request = self.client.get(reverse_lazy('courses-detail', kwargs={'pk': self.course1.id}), {'exclude': 'video_urls,description'})
+
+    self.assertEqual(list(request.data), ['id', 'title', 'ends_at', 'total_duration'])
+    self.assertEqual(request.data['total_duration'], '0:4:30')
+
+  def test_sparse_detail_cache_is_invalidated_on_write(self):
+    url = reverse_lazy('courses-detail', kwargs={'pk': self.course1.id})
+    self.assertEqual(self.client.get(url, {'fields': 'title'}).data, {'title': 'Curso 1'})
+
+    self.client.patch(url, data={'title': 'Curso 1 - Atualizado'}, content_type='application/json')
+
+    self.assertEqual(self.client.get(url, {'fields': 'title'}).data, {'title': 'Curso 1 - Atualizado'})
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from unittest import skipUnless
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+
+@skipUnless(connection.vendor == 'sqlite', 'perfil específico do SQLite')
+class SQLiteProfileTestCase(TestCase):
+
+  def test_pragmas_are_applied_on_new_connections(self):
+    with connection.cursor() as cursor:
+      self.assertEqual(cursor.execute('PRAGMA synchronous').fetchone()[0], 1)
+      self.assertEqual(cursor.execute('PRAGMA cache_size').fetchone()[0], -64000)
+      self.assertEqual(cursor.execute('PRAGMA temp_store').fetchone()[0], 2)
+
+  def test_transactions_take_the_write_lock_upfront(self):
+    self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+    self.assertNotIn('transaction_mode', connection.get_connection_params())
+
+
+@skipUnless(connection.vendor == 'sqlite', 'perfil específico do SQLite')
+class SQLiteConcurrentWritesTestCase(SimpleTestCase):
+
+  def test_concurrent_writers_do_not_lock_or_lose_writes(self):
+    # O banco de teste em memória não tem WAL: usa um arquivo num subprocesso
+    with tempfile.TemporaryDirectory() as directory:
+      env = {name: value for name, value in os.environ.items() if not name.startswith('STRESS_')}
+      env.update(SQLITE_PATH=os.path.join(directory, 'stress.sqlite3'), DJANGO_SETTINGS_MODULE='api.settings')
+      result = subprocess.run(
+        [sys.executable, '-m', 'courses.tests.sqlite_stress'],
+        capture_output=True, text=True, env=env, cwd=settings.BASE_DIR, timeout=300
+      )
+
+    self.assertEqual(result.returncode, 0, result.stderr)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    self.assertEqual(report['journal_mode'], 'wal')
+    self.assertEqual(report['statuses'], [201])
+    self.assertEqual(report['videos'], 8 * 15 * 2)
+    # Posições atribuídas sob o UPDATE condicional da versão: nenhuma repetida
+    self.assertEqual(report['unique_positions'], report['videos'])
+    # Oito PUTs com a mesma ETag em If-Match ao mesmo tempo: um passa, o resto é 412
+    self.assertEqual(report['if_match_statuses'], {'200': 1, '412': 7})
+    self.assertEqual(report['pending_jobs'], 0)
+    # Um segundo por vídeo do YouTube (worker) + um add_duration(1) por rodada
+    self.assertEqual(report['total_duration_seconds'], 8 * 15 * 2)
@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from io import StringIO
+
+from courses.archive import archive_courses
+from courses.models import Course, CourseStats, Video
+
+
+class CourseStatsTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    now = timezone.now()
+    self.active = Course.objects.create(title="Curso 1", description="Descrição", ends_at=now + timezone.timedelta(days=30), total_duration_seconds=600)
+    Video.objects.create(course=self.active, title="Vídeo 1", url="https://example.com/1", duration=300)
+    Video.objects.create(course=self.active, title="Vídeo 2", url="https://example.com/2", duration=300)
+    self.expired = Course.objects.create(title="Curso 2", description="Descrição", ends_at=now - timezone.timedelta(days=1), total_duration_seconds=60)
+    Video.objects.create(course=self.expired, title="Vídeo 1", url="https://example.com/1", duration=60)
+    self.archived = Course.objects.create(title="Curso 3", description="Descrição", ends_at=now - timezone.timedelta(days=400), total_duration_seconds=30)
+    Video.objects.create(course=self.archived, title="Vídeo 1", url="https://example.com/1", duration=30)
+    self.deleted = Course.objects.create(title="Curso 4", description="Descrição", ends_at=now + timezone.timedelta(days=30), total_duration_seconds=900)
+    Video.objects.create(course=self.deleted, title="Vídeo 1", url="https://example.com/1", duration=900)
+    self.deleted.delete()
+    archive_courses(cutoff=now - timezone.timedelta(days=90))
+
+  def _call(self):
+    out = StringIO()
+    call_command('refresh_course_stats', stdout=out)
+    return out.getvalue()
+
+  def test_refresh_command(self):
+    output = self._call()
+
+    self.assertIn('1 ativo(s), 2 encerrado(s), 1 excluído(s), 4 vídeo(s)', output)
+    stats = CourseStats.objects.get()
+    self.assertEqual(stats.archived_courses, 1)
+    self.assertEqual(stats.total_duration_seconds, 690)
+    self.assertEqual(stats.videos_per_course, 1.33)
+
+  def test_endpoint_reads_the_summary_row(self):
+    self._call()
+    cache.clear()
+
+    with self.assertNumQueries(1):
+      request = self.client.get(reverse('courses-stats'))
+    with self.assertNumQueries(0):
+      self.client.get(reverse('courses-stats'))
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.data['active_courses'], 1)
+    self.assertEqual(request.data['expired_courses'], 2)
+    self.assertEqual(request.data['deleted_courses'], 1)
+    self.assertEqual(request.data['total_duration'], '0:11:30')
+    self.assertIn('refreshed_at', request.data)
+
+  def test_endpoint_computes_once_before_the_first_refresh(self):
+    request = self.client.get(reverse('courses-stats'))
+
+    self.assertEqual(request.status_code, 200)
+    self.assertEqual(request.data['total_videos'], 4)
+    self.assertEqual(CourseStats.objects.count(), 1)
+
+  def test_summary_changes_only_on_refresh(self):
+    self._call()
+    Course.objects.create(title="Curso 5", description="Descrição", ends_at=timezone.now() + timezone.timedelta(days=30))
+
+    self.assertEqual(self.client.get(reverse('courses-stats')).data['active_courses'], 1)
+    self._call()
+    self.assertEqual(self.client.get(reverse('courses-stats')).data['active_courses'], 2)
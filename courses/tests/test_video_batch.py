@@ -0,0 +1,67 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse_lazy
+from django.utils import timezone
+import json
+
+from courses.models import Course, Video, VideoDurationJob
+from courses import duration_cache, http
+from courses.benchmark_stub import StubYouTubeServer
+
+
+class VideoBatchTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    duration_cache.clear()
+    http.reset()
+    self.course = Course.objects.create(
+      title="Curso 1",
+      description="Descrição do curso 1",
+      ends_at=timezone.now() + timezone.timedelta(days=30),
+      total_duration_seconds=270
+    )
+    Video.objects.create(course=self.course, uid="QH2-1d3fau4", url="https://www.youtube.com/watch?v=QH2-TGUlwu4", title="Trailer", duration=270)
+    self.url = reverse_lazy('courses-create_videos', kwargs={'course_id': self.course.id})
+
+  def _send(self, data):
+    return self.client.post(self.url, data=json.dumps(data), content_type='application/json')
+
+  @override_settings(VIDEO_DURATION_ASYNC=False)
+  def test_resolves_each_video_id_once(self):
+    durations = {'dQw4w9WgXcQ': 'PT1H30M10S', 'aaaaaaaaaaa': 'PT2M', 'bbbbbbbbbbb': 'PT10S'}
+    with StubYouTubeServer(durations) as stub:
+      with self.settings(YOUTUBE_WATCH_URL=stub.watch_url):
+        request = self._send([
+          {'title': 'Vídeo 1', 'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'},
+          {'title': 'Vídeo 2', 'url': 'https://www.youtube.com/watch?v=aaaaaaaaaaa'},
+          {'title': 'Vídeo 1 de novo', 'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'},
+          {'title': 'Sem URL'},
+          {'title': 'Vídeo 3', 'url': 'https://www.youtube.com/watch?v=bbbbbbbbbbb'},
+        ])
+
+    self.assertEqual(request.status_code, 201)
+    self.assertEqual(sorted(stub.requests), ['aaaaaaaaaaa', 'bbbbbbbbbbb', 'dQw4w9WgXcQ'])
+    self.assertEqual([e['index'] for e in request.data.get('errors')], [3])
+    self.assertEqual([v['duration'] for v in request.data.get('created')], ['1:30:10', '0:02:00', '1:30:10', '0:00:10'])
+
+    course = Course.objects.get(pk=self.course.id)
+    self.assertEqual([v['title'] for v in course.video_urls], ['Trailer', 'Vídeo 1', 'Vídeo 2', 'Vídeo 1 de novo', 'Vídeo 3'])
+    self.assertEqual(course.total_duration, '3:7:0')
+
+  @override_settings(VIDEO_DURATION_ASYNC=True)
+  def test_async_mode_enqueues_jobs(self):
+    request = self._send([
+      {'title': 'Vídeo 1', 'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'},
+      {'title': 'Vídeo 2', 'url': 'https://example.com/video.mp4'},
+    ])
+
+    self.assertEqual(request.status_code, 201)
+    self.assertEqual([v['duration'] for v in request.data.get('created')], ['pending', '0:0:0'])
+    self.assertEqual(list(VideoDurationJob.objects.values_list('video_id', flat=True)), [request.data['created'][0]['id']])
+    self.assertEqual(Course.objects.get(pk=self.course.id).total_duration, '0:4:30')
+
+  def test_rejects_invalid_payload(self):
+    self.assertEqual(self._send({'title': 'Vídeo 1'}).status_code, 400)
+    self.assertEqual(self._send([{'title': 'Vídeo 1'}]).status_code, 400)
+    self.assertEqual(Video.objects.count(), 1)
@@ -0,0 +1,107 @@
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse_lazy
+from django.utils import timezone
+from unittest.mock import patch
+from io import StringIO
+import json
+
+from courses.models import Course, Video, VideoDurationJob
+from courses.jobs import process_pending_jobs
+from courses import duration_cache, http
+from courses.benchmark_stub import StubYouTubeServer
+
+
+@override_settings(VIDEO_DURATION_ASYNC=True)
+class VideoDurationJobTestCase(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    duration_cache.clear()
+    http.reset()
+    self.course = Course.objects.create(
+      title="Curso 1",
+      description="Descrição do curso 1",
+      ends_at=timezone.now() + timezone.timedelta(days=30),
+      total_duration_seconds=270
+    )
+    Video.objects.create(course=self.course, uid="QH2-1d3fau4", url="https://www.youtube.com/watch?v=QH2-TGUlwu4", title="Trailer", duration=270)
+
+  def _create_video(self, url):
+    return self.client.post(reverse_lazy('courses-create_video', kwargs={'course_id': self.course.id}), data={
+      'title': 'Vídeo 1',
+      'url': url,
+    })
+
+  @patch('requests.Session.get')
+  def test_create_video_is_stored_as_pending(self, mock_get):
+    request = self._create_video('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+
+    self.assertEqual(request.status_code, 201)
+    mock_get.assert_not_called()
+    course = Course.objects.get(pk=self.course.id)
+    self.assertEqual(course.video_urls[1]['duration'], 'pending')
+    self.assertEqual(course.total_duration, '0:4:30')
+    self.assertEqual(VideoDurationJob.objects.filter(status=VideoDurationJob.STATUS_PENDING).count(), 1)
+
+  def test_worker_resolves_duration_from_stub_server(self):
+    self._create_video('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+
+    with StubYouTubeServer({'dQw4w9WgXcQ': 'PT1H30M10S'}) as stub:
+      with override_settings(YOUTUBE_WATCH_URL=stub.watch_url):
+        out = StringIO()
+        call_command('process_video_jobs', '--once', stdout=out)
+
+    self.assertEqual(stub.requests, ['dQw4w9WgXcQ'])
+    self.assertIn('1 job(s)', out.getvalue())
+    course = Course.objects.get(pk=self.course.id)
+    self.assertEqual(course.video_urls[1]['duration'], '1:30:10')
+    self.assertEqual(course.total_duration, '1:34:40')
+    self.assertEqual(VideoDurationJob.objects.get().status, VideoDurationJob.STATUS_DONE)
+
+  def test_stale_job_does_not_override_updated_video(self):
+    self._create_video('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    video_id = Course.objects.get(pk=self.course.id).video_urls[1]['id']
+
+    self.client.put(
+      reverse_lazy('courses-update_video', kwargs={'course_id': self.course.id, 'video_id': video_id}),
+      data=json.dumps({'title': 'Vídeo 1', 'url': 'https://www.youtube.com/watch?v=aaaaaaaaaaa'}),
+      content_type='application/json'
+    )
+
+    with StubYouTubeServer({'dQw4w9WgXcQ': 'PT1H', 'aaaaaaaaaaa': 'PT2M'}) as stub:
+      with override_settings(YOUTUBE_WATCH_URL=stub.watch_url):
+        self.assertEqual(process_pending_jobs(), 2)
+
+    course = Course.objects.get(pk=self.course.id)
+    self.assertEqual(course.video_urls[1]['duration'], '0:02:00')
+    self.assertEqual(course.total_duration, '0:6:30')
+
+  def test_abandoned_running_job_is_reclaimed(self):
+    self._create_video('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    # Um worker pegou o job e morreu antes de terminar
+    VideoDurationJob.objects.update(status=VideoDurationJob.STATUS_RUNNING, attempts=1)
+
+    self.assertEqual(process_pending_jobs(), 0)
+
+    VideoDurationJob.objects.update(updated_at=timezone.now() - timezone.timedelta(minutes=10))
+    with StubYouTubeServer({'dQw4w9WgXcQ': 'PT2M'}) as stub:
+      with override_settings(YOUTUBE_WATCH_URL=stub.watch_url):
+        self.assertEqual(process_pending_jobs(), 1)
+
+    job = VideoDurationJob.objects.get()
+    self.assertEqual((job.status, job.attempts), (VideoDurationJob.STATUS_DONE, 2))
+    self.assertEqual(Course.objects.get(pk=self.course.id).total_duration, '0:6:30')
+
+  @override_settings(VIDEO_DURATION_JOB_MAX_ATTEMPTS=1)
+  @patch('requests.Session.get', side_effect=ConnectionError('upstream down'))
+  def test_failed_job_falls_back_to_empty_duration(self, mock_get):
+    self._create_video('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+
+    process_pending_jobs()
+
+    job = VideoDurationJob.objects.get()
+    self.assertEqual(job.status, VideoDurationJob.STATUS_FAILED)
+    self.assertEqual(job.last_error, 'upstream down')
+    self.assertEqual(Course.objects.get(pk=self.course.id).video_urls[1]['duration'], '0:0:0')
@@ -0,0 +1,71 @@
+from django.test import SimpleTestCase
+from unittest.mock import patch, Mock
+
+from courses.youtube import DurationScanner, fetch_video_duration
+from courses import duration_cache
+
+
+def scan(chunks):
+  scanner = DurationScanner()
+  for chunk in chunks:
+    duration = scanner.feed(chunk)
+    if scanner.found:
+      return duration
+  return scanner.finish()
+
+
+class DurationScannerTestCase(SimpleTestCase):
+
+  def test_finds_tag_split_across_chunks(self):
+    page = b'<html><head>' + b'x' * 5000 + b'<meta itemprop="duration" content="PT1H30M10S"></head>'
+    chunks = [page[i:i + 7] for i in range(0, len(page), 7)]
+
+    self.assertEqual(scan(chunks), '1:30:10')
+
+  def test_accepts_attribute_order_and_quoting_variants(self):
+    self.assertEqual(scan([b"<META content='PT4M30S' ITEMPROP=duration>"]), '0:04:30')
+
+  def test_invalid_duration_in_tag(self):
+    self.assertIsNone(scan([b'<meta itemprop="duration" content="nope">']))
+
+  def test_page_without_tag(self):
+    self.assertIsNone(scan([b'<html><head><title>x</title></head>', b'<body></body></html>']))
+
+  def test_falls_back_to_full_parser_when_tag_is_not_matched(self):
+    scanner = DurationScanner()
+    self.assertIsNone(scanner.feed(b'<html></html>'))
+    self.assertFalse(scanner.found)
+
+    with patch('courses.youtube.parse_duration_page', return_value='0:01:00') as parse_page:
+      self.assertEqual(scanner.finish(), '0:01:00')
+    parse_page.assert_called_once_with(b'<html></html>')
+
+
+class StreamingDownloadTestCase(SimpleTestCase):
+
+  def setUp(self):
+    duration_cache.clear()
+    patcher = patch('courses.duration_cache.store')
+    patcher.start()
+    self.addCleanup(patcher.stop)
+    patcher = patch('courses.duration_cache.lookup', return_value=duration_cache.MISS)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  @patch('requests.Session.get')
+  def test_stops_reading_once_duration_is_found(self, mock_get):
+    consumed = []
+
+    def chunks(chunk_size):
+      for chunk in [b'<head>', b'<meta itemprop="duration" content="PT2M">', b'<body>', b'</html>']:
+        consumed.append(chunk)
+        yield chunk
+
+    response = Mock()
+    response.iter_content.side_effect = chunks
+    mock_get.return_value = response
+
+    self.assertEqual(fetch_video_duration('dQw4w9WgXcQ'), '0:02:00')
+    self.assertEqual(len(consumed), 2)
+    self.assertTrue(mock_get.call_args.kwargs['stream'])
+    response.close.assert_called_once()
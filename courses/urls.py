@@ -2,15 +2,28 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from .views import CourseViewSet
+from . import async_views
 
 
 router = DefaultRouter()
 router.register(r'courses', CourseViewSet, basename='courses')
 
 urlpatterns = [
+  # Antes do router, para "bulk" e "stats" não serem interpretados como pk
+  path('courses/bulk/', CourseViewSet.as_view({'post': 'bulk_create', 'patch': 'bulk_update', 'delete': 'bulk_destroy'}), name='courses-bulk'),
+  path('courses/bulk/restore/', CourseViewSet.as_view({'post': 'bulk_restore'}), name='courses-bulk_restore'),
+  path('courses/stats/', CourseViewSet.as_view({'get': 'stats'}), name='courses-stats'),
   path('', include(router.urls)),
   path('courses/<int:course_id>/create_video/', CourseViewSet.as_view({'post': 'create_video'}), name='courses-create_video'),
+  path('courses/<int:course_id>/create_videos/', CourseViewSet.as_view({'post': 'create_videos'}), name='courses-create_videos'),
   path('courses/<int:course_id>/update_video/<str:video_id>/', CourseViewSet.as_view({'put': 'update_video'}), name='courses-update_video'),
   path('courses/<int:course_id>/destroy_video/<str:video_id>/', CourseViewSet.as_view({'delete': 'destroy_video'}), name='courses-destroy_video'),
   path('report/export/', CourseViewSet.as_view({'get': 'export'}), name='courses-export'),
+  path('report/import/', CourseViewSet.as_view({'post': 'import_courses'}), name='courses-import'),
+  # Variantes assíncronas, para implantação ASGI
+  path('async/courses/', async_views.course_list, name='async-courses-list'),
+  path('async/courses/<int:pk>/', async_views.course_detail, name='async-courses-detail'),
+  path('async/courses/<int:course_id>/create_video/', async_views.create_video, name='async-courses-create_video'),
+  path('async/courses/<int:course_id>/update_video/<str:video_id>/', async_views.update_video, name='async-courses-update_video'),
+  path('async/courses/<int:course_id>/destroy_video/<str:video_id>/', async_views.destroy_video, name='async-courses-destroy_video'),
 ]
\ No newline at end of file
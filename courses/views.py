@@ -1,22 +1,47 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django.utils.dateparse import parse_duration
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from bs4 import BeautifulSoup
+from django.utils.dateparse import parse_duration
+from django.conf import settings
 from datetime import date
-import requests
-import uuid
 import csv
-import re
 
-from .models import Course
-from .serializers import CourseSerializer, CourseRetrieveSerializer
+from .models import Course, Video
+from .serializers import CourseSerializer, CourseRetrieveSerializer, CourseStatsSerializer, columns_for, select_fields, serialize_course_list
+from .pagination import CourseCursorPagination
+from . import cache as response_cache
+from . import bulk
+from . import concurrency
+from . import csv_format
+from . import importer
+from . import metrics
+from . import search
+from . import stats
+from . import duration_cache
+from .durations import format_duration, to_seconds
+from .youtube import resolve_video_duration
+
+
+# Maior valor aceito nos filtros de duração (inteiro de 64 bits do banco)
+MAX_DURATION_SECONDS = 2 ** 63 - 1
+
+
+class Echo:
+  # Buffer que só devolve o que recebe, para o csv.writer alimentar o StreamingHttpResponse
+  def write(self, value):
+    return value
 
 
 class CourseViewSet(viewsets.ViewSet):
+  ordering_fields = {
+    'created_at': 'created_at',
+    'total_duration': 'total_duration_seconds',
+  }
 
   def get_serializer_class(self):
     if self.action == 'create_video':
@@ -30,14 +55,46 @@ class CourseViewSet(viewsets.ViewSet):
     return CourseSerializer
 
   def list(self, request, *args, **kwargs):
-    queryset = Course.objects.filter(ends_at__gte=timezone.now()).order_by('created_at')
+    return response_cache.cached_response(request, response_cache.list_key(request), lambda: self._list(request))
+
+
+  def _list(self, request):
+    try:
+      fields = select_fields(request.query_params, CourseSerializer.Meta.fields)
+    except ValueError as e:
+      return self._invalid_fields_response(e)
+
+    columns = columns_for(fields)
+    if 'cursor' in request.query_params:
+      # O cursor da próxima página é montado a partir do created_at do último curso
+      columns.append('created_at')
+    queryset = Course.objects.only(*columns).filter(ends_at__gte=timezone.now())
+
+    try:
+      queryset = self._filter_duration(queryset, request.query_params)
+    except ValueError:
+      return Response({'detail': 'min_duration/max_duration inválidos.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    search_text = request.query_params.get('q', '').strip()
+    if search_text:
+      queryset = search.search(queryset, search_text)
+
+    # ?cursor= ativa a paginação por chave, sempre ordenada por (created_at, id)
+    if 'cursor' in request.query_params:
+      if request.query_params.get('ordering', 'created_at') != 'created_at':
+        return Response({'detail': 'ordering não é suportado com cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+      paginator = CourseCursorPagination()
+    elif search_text and 'ordering' not in request.query_params:
+      # Busca sem ordenação explícita: mais relevantes primeiro
+      queryset = queryset.order_by('search_rank', 'id')
+      paginator = PageNumberPagination()
+    else:
+      queryset = queryset.order_by(*self._get_ordering(request.query_params))
+      paginator = PageNumberPagination()
 
-    paginator = PageNumberPagination()
     result_page = paginator.paginate_queryset(queryset, request)
 
-    serializer = self.get_serializer_class()(result_page, many=True)
-    
-    return paginator.get_paginated_response(serializer.data)
+    return paginator.get_paginated_response(serialize_course_list(result_page, fields))
 
   
   def create(self, request, *args, **kwargs):
@@ -56,23 +113,44 @@ class CourseViewSet(viewsets.ViewSet):
 
     course = Course.objects.get(pk=course_id)
 
-    video_data = {
-      'id': str(uuid.uuid4()),
-      'title': request.data.get('title'),
-      'url': request.data.get('url'),
-      'duration': self._get_video_duration(request.data.get('url'))
-    }
+    course, _ = concurrency.add_video(
+      course,
+      request.data.get('title'),
+      request.data.get('url'),
+      resolve_video_duration(request.data.get('url')),
+      concurrency.if_match_tags(request.headers)
+    )
+
+    return self._course_response(course, status.HTTP_201_CREATED)
 
-    course.video_urls.append(video_data)
-    course.total_duration = self._calc_total_duration(course.video_urls)
-    course.save()
-    serializer = self.get_serializer_class()(course)
-    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+  def create_videos(self, request, course_id=None, *args, **kwargs):
+    course = get_object_or_404(Course, pk=course_id)
+
+    try:
+      created, errors = bulk.bulk_create_videos(course, request.data, concurrency.if_match_tags(request.headers))
+    except bulk.BulkError as e:
+      return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response_status = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+    return Response({'created': created, 'errors': errors}, status=response_status)
 
 
   def retrieve(self, request, pk=None, *args, **kwargs):
-    queryset = Course.objects.get(pk=pk)
-    serialiser = self.get_serializer_class()(queryset)
+    try:
+      fields = select_fields(request.query_params, CourseRetrieveSerializer.Meta.fields)
+    except ValueError as e:
+      return self._invalid_fields_response(e)
+
+    key = response_cache.detail_key(pk, None if fields == CourseRetrieveSerializer.Meta.fields else fields)
+    return response_cache.cached_response(request, key, lambda: self._retrieve(pk, fields))
+
+
+  def _retrieve(self, pk, fields):
+    queryset = Course.objects.only(*columns_for(fields))
+    if 'video_urls' in fields:
+      queryset = queryset.prefetch_related('videos')
+    serialiser = self.get_serializer_class()(queryset.get(pk=pk), fields=fields)
     return Response(serialiser.data, status=status.HTTP_200_OK)
 
 
@@ -81,7 +159,7 @@ class CourseViewSet(viewsets.ViewSet):
     serializer = CourseSerializer(course, data=request.data)
 
     if serializer.is_valid():
-      serializer.save()
+      concurrency.save_course(serializer, concurrency.if_match_tags(request.headers))
       return Response(serializer.data, status=status.HTTP_200_OK)
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -95,7 +173,7 @@ class CourseViewSet(viewsets.ViewSet):
       return Response(status=status.HTTP_400_BAD_REQUEST)
 
     if serializer.is_valid():
-      serializer.save()
+      concurrency.save_course(serializer, concurrency.if_match_tags(request.headers))
       return Response(serializer.data, status=status.HTTP_200_OK)
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -105,82 +183,169 @@ class CourseViewSet(viewsets.ViewSet):
     if not request.data.get('title') or not request.data.get('url'):
       return Response(status=status.HTTP_400_BAD_REQUEST)
 
-    course = get_object_or_404(Course, pk=course_id)
-    
-    new_video_data = {
-      'id': video_id,
-      'title': request.data.get('title'),
-      'url': request.data.get('url'),
-      'duration': self._get_video_duration(request.data.get('url'))
-    }
-
-    video_urls_before_update = course.video_urls
-    course.video_urls = [v if v['id'] != video_id else new_video_data for v in course.video_urls]
-    
-    if course.video_urls == video_urls_before_update:
+    video = Video.objects.lookup(course_id, video_id).first()
+
+    if video is None:
       return Response(status=status.HTTP_404_NOT_FOUND)
-    
-    course.total_duration = self._calc_total_duration(course.video_urls)
-    course.save()
 
-    serializer = self.get_serializer_class()(course)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    course, _, _ = concurrency.change_video(
+      video,
+      request.data.get('title'),
+      request.data.get('url'),
+      resolve_video_duration,
+      concurrency.if_match_tags(request.headers)
+    )
+
+    return self._course_response(course, status.HTTP_200_OK)
 
 
   def destroy(self, request, pk=None, *args, **kwargs):
     course = get_object_or_404(Course, pk=pk)
-    course.delete()
+    concurrency.delete_course(course, concurrency.if_match_tags(request.headers))
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
   def destroy_video(self, request, course_id=None, video_id=None, *args, **kwargs):
-    course = get_object_or_404(Course, pk=course_id)
-
-    video_urls_before_delete = course.video_urls
-    course.video_urls = [v for v in course.video_urls if v['id'] != video_id]
+    video = Video.objects.lookup(course_id, video_id).first()
 
-    if course.video_urls == video_urls_before_delete:
+    if video is None:
       return Response(status=status.HTTP_404_NOT_FOUND)
 
-    course.total_duration = self._calc_total_duration(course.video_urls)
-    course.save()
+    course, video = concurrency.remove_video(video, concurrency.if_match_tags(request.headers))
+
+    return self._course_response(course, status.HTTP_200_OK)
+
+  def bulk_create(self, request, *args, **kwargs):
+    try:
+      created, errors = bulk.bulk_create_courses(request.data)
+    except bulk.BulkError as e:
+      return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response_status = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+    return Response({'created': created, 'errors': errors}, status=response_status)
+
+
+  def bulk_update(self, request, *args, **kwargs):
+    try:
+      updated, errors = bulk.bulk_update_courses(request.data)
+    except bulk.BulkError as e:
+      return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response_status = status.HTTP_200_OK if updated else status.HTTP_400_BAD_REQUEST
+    return Response({'updated': updated, 'errors': errors}, status=response_status)
+
+
+  def bulk_destroy(self, request, *args, **kwargs):
+    try:
+      deleted, errors = bulk.bulk_delete_courses(self._bulk_ids(request))
+    except bulk.BulkError as e:
+      return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'deleted': deleted, 'errors': errors}, status=status.HTTP_200_OK)
+
+
+  def bulk_restore(self, request, *args, **kwargs):
+    try:
+      restored, errors = bulk.bulk_restore_courses(self._bulk_ids(request))
+    except bulk.BulkError as e:
+      return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'restored': restored, 'errors': errors}, status=status.HTTP_200_OK)
+
+
+  def _bulk_ids(self, request):
+    # Corpo {"ids": [...]}; uma lista solta ou outro JSON cai na validação de ids (400)
+    return request.data.get('ids') if isinstance(request.data, dict) else None
 
-    serializer = self.get_serializer_class()(course)
-    return Response(serializer.data, status=status.HTTP_200_OK)
 
   def export(self, request, *args, **kwargs):
-    courses = Course.with_deleted.all()
-    response = HttpResponse(content_type='text/csv')
+    response = StreamingHttpResponse(self._export_rows(), content_type='text/csv')
     response['Content-Disposition'] = f'attachment; filename="courses-{date.today()}.csv"'
+    return response
 
-    writer = csv.writer(response, delimiter=';')
-    writer.writerow(['ID', 'Título', 'Descrição', 'Data de Término', 'Excluído', 'Excluído em', 'Criado em', 'Vídeos', 'Duração total'])
 
-    for course in courses:
-      writer.writerow([course.id, course.title, course.description, course.ends_at, course.is_deleted(), course.deleted_at, course.created_at, len(course.video_urls), course.total_duration])
+  def stats(self, request, *args, **kwargs):
+    # Resumo pré-calculado (manage.py refresh_course_stats): não varre a tabela de cursos
+    return Response(CourseStatsSerializer(stats.get_stats()).data, status=status.HTTP_200_OK)
 
-    return response
+
+  def import_courses(self, request, *args, **kwargs):
+    upload = request.FILES.get('file')
+    if upload is None:
+      return Response({'detail': 'Envie o arquivo no campo "file".'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+      fmt = importer.detect_format(upload.name, request.data.get('format'))
+      report = importer.CourseImporter().run_file(upload.file, fmt)
+    except importer.CourseImportError as e:
+      return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(report, status=status.HTTP_200_OK)
+
+
+  def _export_rows(self):
+    writer = csv.writer(Echo(), delimiter=csv_format.DELIMITER)
+    yield writer.writerow(csv_format.HEADERS)
+
+    # Só as colunas necessárias; a contagem de vídeos é feita no banco e os
+    # cursos arquivados entram na mesma consulta (UNION ALL)
+    video_count = Video.objects.filter(course=OuterRef('pk')).order_by().values('course').annotate(count=Count('id')).values('count')
+    rows = (
+      Course.with_deleted
+      .annotate(video_count=Coalesce(Subquery(video_count), 0))
+      .including_archived('id', 'title', 'description', 'ends_at', 'deleted_at', 'created_at', 'video_count', 'total_duration_seconds')
+      .order_by('row_id')
+      .iterator(chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 2000))
+    )
+
+    for course_id, title, description, ends_at, deleted_at, created_at, video_count, total_duration_seconds in rows:
+      yield writer.writerow([course_id, title, description, ends_at, deleted_at is not None, deleted_at, created_at, video_count, format_duration(total_duration_seconds)])
+
+
+  def _filter_duration(self, queryset, params):
+    # Aceita segundos ("600") ou o formato legado "H:M:S" ("0:10:0")
+    if params.get('min_duration'):
+      queryset = queryset.filter(total_duration_seconds__gte=self._parse_duration_param(params['min_duration']))
+    if params.get('max_duration'):
+      queryset = queryset.filter(total_duration_seconds__lte=self._parse_duration_param(params['max_duration']))
+    return queryset
+
+
+  def _parse_duration_param(self, value):
+    if value.isdigit():
+      seconds = int(value)
+    else:
+      try:
+        parsed = parse_duration(value)
+      except OverflowError:
+        parsed = None
+      if parsed is None:
+        raise ValueError(value)
+      seconds = to_seconds(value)
+    # Fora do inteiro de 64 bits o SQLite levanta OverflowError (500)
+    if seconds > MAX_DURATION_SECONDS:
+      raise ValueError(value)
+    return seconds
+
+
+  def _invalid_fields_response(self, error):
+    return Response({'detail': f'Campos inválidos: {", ".join(error.args[0])}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+  def _get_ordering(self, params):
+    ordering = params.get('ordering', 'created_at')
+    field = self.ordering_fields.get(ordering.lstrip('-'), 'created_at')
+    if ordering.startswith('-'):
+      return ['-' + field, '-id']
+    return [field, 'id']
+
+
+  def _course_response(self, course, response_status):
+    # A ETag devolvida serve de If-Match para a próxima alteração
+    data = self.get_serializer_class()(course).data
+    return Response(data, status=response_status, headers={'ETag': response_cache.make_etag(data)})
 
 
-  def _get_video_duration(self, url):
-    match = re.search(r'(https?://www\.youtube\.com/watch\?v=([a-zA-Z0-9_-]{11}))', url)
-    if match:
-        page = requests.get(match.group(0))
-        soup = BeautifulSoup(page.content, 'html.parser')
-        duration_tag = soup.find('meta', {'itemprop': 'duration'})
-        if duration_tag:
-            duration = parse_duration(duration_tag['content'])
-            return str(duration)
-    return "0:0:0"
-
-
-  def _calc_total_duration(self, video_urls):
-      hours, minutes, seconds = 0, 0, 0
-      for video in video_urls:
-          h, m, s = map(int, video['duration'].split(':'))
-          seconds += s
-          minutes += m + seconds // 60
-          hours += h + minutes // 60
-          seconds %= 60
-          minutes %= 60
-      return f'{hours}:{minutes}:{seconds}'
\ No newline at end of file
+def metrics_view(request):
+  gauges = {f'courses_duration_cache_{name}': value for name, value in duration_cache.stats().items()}
+  return HttpResponse(metrics.render_prometheus(gauges), content_type='text/plain; version=0.0.4; charset=utf-8')
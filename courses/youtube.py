@@ -0,0 +1,214 @@
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.utils.dateparse import parse_duration
+from bs4 import BeautifulSoup
+import contextvars
+import requests
+import asyncio
+import weakref
+import httpx
+import re
+
+from . import duration_cache
+from . import http
+from . import metrics
+from .durations import to_seconds
+
+
+VIDEO_URL_REGEX = re.compile(r'(https?://www\.youtube\.com/watch\?v=([a-zA-Z0-9_-]{11}))')
+DEFAULT_WATCH_URL = 'https://www.youtube.com/watch?v={video_id}'
+EMPTY_DURATION = '0:0:0'
+DURATION_META_REGEX = re.compile(rb'<meta\b[^>]*?\bitemprop\s*=\s*["\']?duration\b[^>]*>', re.IGNORECASE)
+CONTENT_ATTR_REGEX = re.compile(rb'\bcontent\s*=\s*(["\']?)([^"\'\s>]*)\1', re.IGNORECASE)
+SCAN_CHUNK_SIZE = 16 * 1024
+SCAN_OVERLAP = 1024
+DEFAULT_BATCH_MAX_WORKERS = 8
+DEFAULT_ASYNC_MAX_CONNECTIONS = 20
+DEFAULT_ASYNC_TIMEOUT = 10
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_video_id(url):
+  match = VIDEO_URL_REGEX.search(url or '')
+  return match.group(2) if match else None
+
+
+def get_watch_url(video_id):
+  # Configurável para que testes e workers possam apontar para um servidor local
+  return getattr(settings, 'YOUTUBE_WATCH_URL', DEFAULT_WATCH_URL).format(video_id=video_id)
+
+
+def parse_duration_page(content):
+  soup = BeautifulSoup(content, 'html.parser')
+  duration_tag = soup.find('meta', {'itemprop': 'duration'})
+  if duration_tag:
+    duration = parse_duration(duration_tag['content'])
+    return str(duration)
+  return None
+
+
+class DurationScanner:
+  # Procura a meta itemprop=duration à medida que os pedaços da página chegam,
+  # sem montar o DOM. Se a tag não aparecer (marcação inesperada), cai no
+  # parser completo com o que foi baixado.
+
+  def __init__(self):
+    self.buffer = bytearray()
+    self.searched = 0
+    self.found = False
+
+  def feed(self, chunk):
+    self.buffer += chunk
+    match = DURATION_META_REGEX.search(self.buffer, max(0, self.searched - SCAN_OVERLAP))
+    self.searched = len(self.buffer)
+    if match is None:
+      return None
+
+    self.found = True
+    content = CONTENT_ATTR_REGEX.search(match.group(0))
+    duration = parse_duration(content.group(2).decode('utf-8', 'replace')) if content else None
+    return str(duration) if duration is not None else None
+
+  def finish(self):
+    return parse_duration_page(bytes(self.buffer))
+
+
+def _download_video_duration(video_id):
+  scanner = DurationScanner()
+  with metrics.timer('http'):
+    page = http.get(get_watch_url(video_id), stream=True)
+    try:
+      for chunk in page.iter_content(chunk_size=SCAN_CHUNK_SIZE):
+        duration = scanner.feed(chunk)
+        if scanner.found:
+          return duration
+    except requests.RequestException:
+      # Timeout de leitura no meio da página também conta para o circuito
+      http.breaker.record_failure()
+      raise
+    finally:
+      page.close()
+  return scanner.finish()
+
+
+def fetch_video_duration(video_id):
+  duration = duration_cache.lookup(video_id)
+  if duration is duration_cache.MISS:
+    duration = _download_video_duration(video_id)
+    duration_cache.store(video_id, duration)
+  return duration or EMPTY_DURATION
+
+
+def fetch_video_durations(video_ids):
+  # O cache é consultado/gravado nesta thread (acesso ao banco); as threads do
+  # pool só baixam as páginas, uma vez por ID mesmo que ele se repita
+  durations = {}
+  missing = []
+  for video_id in dict.fromkeys(video_ids):
+    duration = duration_cache.lookup(video_id)
+    if duration is duration_cache.MISS:
+      missing.append(video_id)
+    else:
+      durations[video_id] = duration or EMPTY_DURATION
+
+  if not missing:
+    return durations
+
+  max_workers = min(len(missing), getattr(settings, 'VIDEO_BATCH_MAX_WORKERS', DEFAULT_BATCH_MAX_WORKERS))
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    futures = {
+      video_id: executor.submit(contextvars.copy_context().run, _download_video_duration, video_id)
+      for video_id in missing
+    }
+
+  for video_id, future in futures.items():
+    try:
+      duration = future.result()
+    except requests.RequestException:
+      # Um vídeo com falha não derruba o lote; ele fica com duração zerada
+      durations[video_id] = EMPTY_DURATION
+      continue
+    duration_cache.store(video_id, duration)
+    durations[video_id] = duration or EMPTY_DURATION
+  return durations
+
+
+def get_video_duration(url):
+  video_id = get_video_id(url)
+  if video_id:
+    return fetch_video_duration(video_id)
+  return EMPTY_DURATION
+
+
+def resolve_video_duration(url):
+  # Duração (em segundos) a gravar num vídeo novo ou com URL nova. No modo
+  # assíncrono fica nula até o worker (manage.py process_video_jobs) buscá-la
+  if getattr(settings, 'VIDEO_DURATION_ASYNC', False) and get_video_id(url):
+    return None
+  try:
+    return to_seconds(get_video_duration(url))
+  except requests.RequestException:
+    # YouTube fora do ar (ou circuito aberto): não segura a requisição
+    return to_seconds(EMPTY_DURATION)
+
+
+def get_async_client():
+  # Um cliente (e pool de conexões) por event loop: conexões não podem ser
+  # compartilhadas entre loops diferentes
+  loop = asyncio.get_running_loop()
+  client = _async_clients.get(loop)
+  if client is None:
+    client = httpx.AsyncClient(
+      limits=httpx.Limits(
+        max_connections=getattr(settings, 'YOUTUBE_ASYNC_MAX_CONNECTIONS', DEFAULT_ASYNC_MAX_CONNECTIONS),
+        max_keepalive_connections=getattr(settings, 'YOUTUBE_ASYNC_MAX_CONNECTIONS', DEFAULT_ASYNC_MAX_CONNECTIONS),
+      ),
+      timeout=getattr(settings, 'YOUTUBE_ASYNC_TIMEOUT', DEFAULT_ASYNC_TIMEOUT),
+      follow_redirects=True,
+    )
+    _async_clients[loop] = client
+  return client
+
+
+async def _adownload_video_duration(video_id):
+  scanner = DurationScanner()
+  with metrics.timer('http'):
+    page = await http.astream(get_async_client(), get_watch_url(video_id))
+    try:
+      async for chunk in page.aiter_bytes(SCAN_CHUNK_SIZE):
+        duration = scanner.feed(chunk)
+        if scanner.found:
+          return duration
+    except httpx.HTTPError:
+      http.breaker.record_failure()
+      raise
+    finally:
+      await page.aclose()
+  return scanner.finish()
+
+
+async def afetch_video_duration(video_id):
+  duration = await sync_to_async(duration_cache.lookup)(video_id)
+  if duration is duration_cache.MISS:
+    duration = await _adownload_video_duration(video_id)
+    await sync_to_async(duration_cache.store)(video_id, duration)
+  return duration or EMPTY_DURATION
+
+
+async def aget_video_duration(url):
+  video_id = get_video_id(url)
+  if video_id:
+    return await afetch_video_duration(video_id)
+  return EMPTY_DURATION
+
+
+async def aresolve_video_duration(url):
+  # Versão assíncrona de resolve_video_duration, para async_views
+  if getattr(settings, 'VIDEO_DURATION_ASYNC', False) and get_video_id(url):
+    return None
+  try:
+    return to_seconds(await aget_video_duration(url))
+  except (httpx.HTTPError, requests.RequestException):
+    return to_seconds(EMPTY_DURATION)